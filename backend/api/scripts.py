@@ -1,8 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
-from typing import List
 from datetime import datetime
+import json
 import uuid
-import asyncio
 from loguru import logger
 
 from models.schemas import (
@@ -14,39 +13,53 @@ from models.schemas import (
     ResponseModel
 )
 from services.script_service import script_service
+from services.executor import ExecutorBusyError
+from services.job_store import CANCELLABLE, PAUSABLE, RESUMABLE, JOB_CANCELLED, JOB_PAUSED, JOB_QUEUED
+from services.job_worker import batch_worker, job_store
+from services.progress import ProgressCoalescer, StoreProgressPoller
+from services.connection_manager import ConnectionManager
+from core.config import settings
 
 router = APIRouter()
 
 
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: dict[str, List[WebSocket]] = {}
+async def _snapshot_frame(batch_id: str) -> str:
+    job = await job_store.get_job(batch_id)
+    if job is None:
+        message = {"type": "error", "data": {"detail": "批次不存在"}}
+    else:
+        message = {"type": "snapshot", "data": job}
+    return json.dumps(message, ensure_ascii=False, default=str)
 
-    async def connect(self, websocket: WebSocket, batch_id: str):
-        await websocket.accept()
-        if batch_id not in self.active_connections:
-            self.active_connections[batch_id] = []
-        self.active_connections[batch_id].append(websocket)
 
-    def disconnect(self, websocket: WebSocket, batch_id: str):
-        if batch_id in self.active_connections:
-            self.active_connections[batch_id].remove(websocket)
-            if not self.active_connections[batch_id]:
-                del self.active_connections[batch_id]
+manager = ConnectionManager(
+    _snapshot_frame,
+    queue_size=settings.WS_SEND_QUEUE_SIZE,
+    send_timeout=settings.WS_SEND_TIMEOUT,
+    slow_consumer_policy=settings.WS_SLOW_CONSUMER_POLICY
+)
+
+# Progress events carry only the episode that changed; events within the
+# window are merged into one frame per batch
+progress_coalescer = ProgressCoalescer(manager.broadcast, settings.PROGRESS_COALESCE_MS / 1000)
+manager.on_batch_idle = progress_coalescer.discard
 
-    async def broadcast(self, batch_id: str, message: dict):
-        if batch_id in self.active_connections:
-            for connection in self.active_connections[batch_id]:
-                try:
-                    await connection.send_json(message)
-                except:
-                    pass
 
+async def _publish_progress(batch_id: str, message_type: str, summary: dict, delta: dict):
+    if manager.has_subscribers(batch_id):
+        progress_coalescer.publish(batch_id, message_type, summary, delta)
 
-manager = ConnectionManager()
 
+batch_worker.add_listener(_publish_progress)
 
-batch_tasks: dict[str, dict] = {}
+# Jobs run by other processes only reach this process through the shared store
+progress_poller = StoreProgressPoller(
+    job_store,
+    progress_coalescer.publish,
+    manager.subscribed_batches,
+    batch_worker.active_jobs,
+    settings.PROGRESS_POLL_INTERVAL
+)
 
 
 @router.post("/generate", response_model=ResponseModel)
@@ -54,11 +67,12 @@ async def generate_script(request: ScriptGenerateRequest):
     logger.info(f"Generating script for episode {request.episode}")
     
     try:
-        script_content = await _generate_single_script(
+        result = await script_service.generate_single_result(
             request.episode,
             request.creativity_level,
             request.enable_validation
         )
+        script_content = result.content
         
         word_count = len(script_content)
         
@@ -71,7 +85,7 @@ async def generate_script(request: ScriptGenerateRequest):
             characters=[],
             scenes=[],
             status="completed",
-            validation_result={"is_valid": True, "issues": []},
+            validation_result=result.validation or {"is_valid": True, "issues": []},
             created_at=datetime.now(),
             updated_at=datetime.now()
         )
@@ -81,6 +95,9 @@ async def generate_script(request: ScriptGenerateRequest):
             message="生成成功",
             data=script.dict()
         )
+    except ExecutorBusyError as e:
+        logger.warning(f"Rejecting script generation: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error generating script: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -90,53 +107,105 @@ async def generate_script(request: ScriptGenerateRequest):
 async def generate_batch_scripts(request: ScriptBatchGenerateRequest):
     logger.info(f"Generating batch scripts from episode {request.start_episode} to {request.end_episode}")
     
-    batch_id = f"batch_{uuid.uuid4().hex[:8]}"
+    if request.end_episode < request.start_episode:
+        raise HTTPException(status_code=400, detail="结束集数不能小于开始集数")
     
-    batch_tasks[batch_id] = {
-        "batch_id": batch_id,
-        "total_episodes": request.end_episode - request.start_episode + 1,
-        "completed_episodes": 0,
-        "progress": 0,
-        "current_episode": request.start_episode,
-        "status": "processing",
-        "episodes": []
-    }
+    batch_id = f"batch_{uuid.uuid4().hex[:8]}"
     
-    asyncio.create_task(
-        _process_batch_generation(
-            batch_id,
-            request.start_episode,
-            request.end_episode,
-            request.creativity_level,
-            request.enable_validation
-        )
+    job = await job_store.create_job(
+        batch_id,
+        request.start_episode,
+        request.end_episode,
+        {
+            "creativity_level": request.creativity_level,
+            "enable_validation": request.enable_validation
+        }
     )
+    batch_worker.notify()
     
     return ResponseModel(
         code=200,
         message="批量生成任务已创建",
-        data=batch_tasks[batch_id]
+        data=job
+    )
+
+
+@router.get("/batches", response_model=ResponseModel)
+async def list_batches(limit: int = 50):
+    return ResponseModel(
+        code=200,
+        data=await job_store.list_jobs(limit)
     )
 
 
 @router.get("/progress/{batch_id}", response_model=ResponseModel)
 async def get_batch_progress(batch_id: str):
-    if batch_id not in batch_tasks:
+    job = await job_store.get_job(batch_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="批次不存在")
     
     return ResponseModel(
         code=200,
-        data=batch_tasks[batch_id]
+        data=job
     )
 
 
+async def _change_batch_status(batch_id: str, status: str, from_statuses: tuple, message: str) -> ResponseModel:
+    if await job_store.get_status(batch_id) is None:
+        raise HTTPException(status_code=404, detail="批次不存在")
+    if not await job_store.set_status(batch_id, status, from_statuses):
+        current_status = await job_store.get_status(batch_id)
+        raise HTTPException(status_code=409, detail=f"批次当前状态为 {current_status}，无法执行该操作")
+    
+    logger.info(f"Batch {batch_id} -> {status}")
+    return ResponseModel(
+        code=200,
+        message=message,
+        data=await job_store.get_job(batch_id)
+    )
+
+
+@router.post("/batches/{batch_id}/cancel", response_model=ResponseModel)
+async def cancel_batch(batch_id: str):
+    return await _change_batch_status(batch_id, JOB_CANCELLED, CANCELLABLE, "批次已取消")
+
+
+@router.post("/batches/{batch_id}/pause", response_model=ResponseModel)
+async def pause_batch(batch_id: str):
+    return await _change_batch_status(batch_id, JOB_PAUSED, PAUSABLE, "批次已暂停")
+
+
+@router.post("/batches/{batch_id}/resume", response_model=ResponseModel)
+async def resume_batch(batch_id: str):
+    response = await _change_batch_status(batch_id, JOB_QUEUED, RESUMABLE, "批次已恢复")
+    batch_worker.notify()
+    return response
+
+
+def _is_snapshot_request(text: str) -> bool:
+    if text.strip() == "snapshot":
+        return True
+    try:
+        message = json.loads(text)
+    except ValueError:
+        return False
+    return isinstance(message, dict) and message.get("type") == "snapshot"
+
+
 @router.websocket("/progress/ws/{batch_id}")
 async def websocket_progress(websocket: WebSocket, batch_id: str):
+    # A full snapshot on connect (and on request: "snapshot" or {"type": "snapshot"}),
+    # then progress frames with only the changed episodes
+    # All sends go through the connection's queue and writer task
     await manager.connect(websocket, batch_id)
     try:
+        manager.send_snapshot(websocket)
         while True:
-            await websocket.receive_text()
+            if _is_snapshot_request(await websocket.receive_text()):
+                manager.send_snapshot(websocket)
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket, batch_id)
 
 
@@ -207,52 +276,3 @@ async def get_script_history(episode: int):
     return {
         "history": []
     }
-
-
-async def _generate_single_script(episode: int, creativity_level: float, enable_validation: bool) -> str:
-    return await script_service.generate_single_script(episode, creativity_level, enable_validation)
-
-
-async def _process_batch_generation(
-    batch_id: str,
-    start_episode: int,
-    end_episode: int,
-    creativity_level: float,
-    enable_validation: bool
-):
-    task = batch_tasks[batch_id]
-    
-    for episode in range(start_episode, end_episode + 1):
-        task["current_episode"] = episode
-        
-        try:
-            script_content = await _generate_single_script(episode, creativity_level, enable_validation)
-            word_count = len(script_content)
-            
-            episode_data = {
-                "episode": episode,
-                "status": "completed",
-                "word_count": word_count
-            }
-            task["episodes"].append(episode_data)
-            task["completed_episodes"] += 1
-            task["progress"] = (task["completed_episodes"] / task["total_episodes"]) * 100
-            
-            await manager.broadcast(batch_id, {
-                "type": "progress",
-                "data": task
-            })
-            
-        except Exception as e:
-            logger.error(f"Error generating episode {episode}: {e}")
-            task["episodes"].append({
-                "episode": episode,
-                "status": "failed",
-                "error": str(e)
-            })
-    
-    task["status"] = "completed"
-    await manager.broadcast(batch_id, {
-        "type": "completed",
-        "data": task
-    })
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from loguru import logger
 import time
-import psutil
 
 from models.schemas import ResponseModel
+from services.script_service import script_service
+from services.system_monitor import system_sampler
+from core.config import settings
 
 router = APIRouter()
 
@@ -41,24 +43,38 @@ async def reset_config():
 
 
 @router.get("/status", response_model=ResponseModel)
-async def get_system_status():
+async def get_system_status(history: int = Query(0, ge=0, le=settings.SYSTEM_SAMPLE_HISTORY)):
     logger.info("Getting system status")
     
-    uptime = int(time.time() - start_time)
-    memory = psutil.virtual_memory()
-    cpu = psutil.cpu_percent(interval=1)
-    disk = psutil.disk_usage('/')
+    # Answered from the background sampler's buffer; never waits on psutil
+    sample = system_sampler.latest()
+    executor = script_service.executor_metrics()
+    
+    data = {
+        "status": "warming_up" if sample.get("warming_up") else "healthy",
+        "uptime": int(time.time() - start_time),
+        "memory_usage": sample["memory_usage"],
+        "cpu_usage": sample["cpu_usage"],
+        "disk_usage": sample["disk_usage"],
+        "active_tasks": executor["running"] + executor["queue_depth"],
+        "sampled_at": sample["timestamp"],
+        "generation_executor": executor
+    }
+    if history:
+        # Oldest first, for sparkline charts
+        data["history"] = system_sampler.history(history)
     
     return ResponseModel(
         code=200,
-        data={
-            "status": "healthy",
-            "uptime": uptime,
-            "memory_usage": round(memory.used / (1024 ** 3), 2),
-            "cpu_usage": cpu,
-            "disk_usage": round(disk.percent, 2),
-            "active_tasks": 0
-        }
+        data=data
+    )
+
+
+@router.get("/executor", response_model=ResponseModel)
+async def get_executor_metrics():
+    return ResponseModel(
+        code=200,
+        data=script_service.executor_metrics()
     )
 
 
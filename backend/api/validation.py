@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException
 from loguru import logger
 
 from models.schemas import ValidationRequest, ValidationResult, ResponseModel
+from services.script_service import script_service
 
 router = APIRouter()
 
@@ -10,10 +11,12 @@ router = APIRouter()
 async def validate_consistency(request: ValidationRequest):
     logger.info(f"Validating consistency for episode {request.episode}")
     
+    validation_result = await script_service.validate_script(request.episode, request.content)
+    
     result = ValidationResult(
-        is_valid=True,
-        issues=[],
-        warnings=[],
+        is_valid=validation_result["is_valid"],
+        issues=validation_result["issues"],
+        warnings=validation_result.get("warnings", []),
         details={
             "character_consistency": {
                 "is_valid": True,
@@ -27,6 +27,30 @@ class Settings(BaseSettings):
     CREATIVITY_LEVEL_MIN: float = 0.0
     CREATIVITY_LEVEL_MAX: float = 1.0
     
+    GENERATION_EXECUTOR: str = "thread"  # thread or process
+    GENERATION_MAX_WORKERS: int = 2
+    GENERATION_MAX_QUEUE: int = 32
+    
+    JOB_QUEUE_BACKEND: str = "sqlite"  # sqlite or redis (uses REDIS_URL)
+    JOB_DATABASE_PATH: str = "./backend/data/jobs.db"
+    JOB_MAX_CONCURRENT: int = 2
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF: float = 2.0  # seconds, doubled after every failed attempt
+    JOB_LEASE_SECONDS: float = 60.0
+    JOB_POLL_INTERVAL: float = 1.0
+    
+    PROGRESS_COALESCE_MS: int = 200
+    # Seconds between shared-store polls for subscribed batches run by other
+    # processes (other uvicorn workers or standalone workers); 0 disables it
+    PROGRESS_POLL_INTERVAL: float = 1.0
+    
+    WS_SEND_QUEUE_SIZE: int = 32
+    WS_SEND_TIMEOUT: float = 5.0
+    WS_SLOW_CONSUMER_POLICY: str = "snapshot"  # snapshot (drop backlog, resend snapshot) or disconnect
+    
+    SYSTEM_SAMPLE_INTERVAL: float = 2.0  # seconds between system status samples
+    SYSTEM_SAMPLE_HISTORY: int = 150  # samples kept for /api/system/status?history=N
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -8,14 +8,24 @@ from loguru import logger
 from core.config import settings
 from core.database import init_db
 from api import scripts, documents, validation, system
+from services.script_service import script_service
+from services.job_worker import batch_worker
+from services.system_monitor import system_sampler
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting up...")
     await init_db()
+    await batch_worker.start()
+    await scripts.progress_poller.start()
+    await system_sampler.start()
     yield
     logger.info("Shutting down...")
+    await system_sampler.stop()
+    await scripts.progress_poller.stop()
+    await batch_worker.stop()
+    script_service.shutdown()
 
 
 app = FastAPI(
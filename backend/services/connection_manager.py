@@ -0,0 +1,157 @@
+import asyncio
+import json
+from typing import Awaitable, Callable, Optional
+
+from fastapi import WebSocket
+from loguru import logger
+
+
+# What to do when a client's send queue is full
+SLOW_CONSUMER_SNAPSHOT = "snapshot"      # drop the backlog, send one fresh snapshot instead
+SLOW_CONSUMER_DISCONNECT = "disconnect"  # close the connection
+
+# Queue marker: build the snapshot when the writer gets to it, so it is current
+_SNAPSHOT = object()
+
+
+class ClientConnection:
+    def __init__(self, websocket: WebSocket, batch_id: str, queue_size: int):
+        self.websocket = websocket
+        self.batch_id = batch_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.dropped = 0
+        self.closed = False
+
+    def offer(self, item) -> bool:
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def replace_backlog(self, item):
+        # Downsample: everything still queued is superseded by one snapshot
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(item)
+
+
+class ConnectionManager:
+    def __init__(
+        self,
+        snapshot_provider: Optional[Callable[[str], Awaitable[str]]] = None,
+        queue_size: int = 32,
+        send_timeout: float = 5.0,
+        slow_consumer_policy: str = SLOW_CONSUMER_SNAPSHOT
+    ):
+        self.snapshot_provider = snapshot_provider
+        self.queue_size = max(1, queue_size)
+        self.send_timeout = send_timeout
+        self.slow_consumer_policy = slow_consumer_policy
+        # batch_id -> {id(websocket): client}
+        self.active_connections: dict[str, dict[int, ClientConnection]] = {}
+        self._by_socket: dict[int, ClientConnection] = {}
+        self.on_batch_idle: Optional[Callable[[str], None]] = None
+        
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.snapshots_sent = 0
+        self.evicted = 0
+
+    async def connect(self, websocket: WebSocket, batch_id: str):
+        await websocket.accept()
+        client = ClientConnection(websocket, batch_id, self.queue_size)
+        self.active_connections.setdefault(batch_id, {})[id(websocket)] = client
+        self._by_socket[id(websocket)] = client
+        client.writer = asyncio.create_task(self._write(client))
+
+    def disconnect(self, websocket: WebSocket, batch_id: str):
+        client = self._by_socket.get(id(websocket))
+        if client is not None:
+            self._remove(client)
+
+    def has_subscribers(self, batch_id: str) -> bool:
+        return batch_id in self.active_connections
+
+    def subscribed_batches(self) -> list:
+        return list(self.active_connections)
+
+    def send_snapshot(self, websocket: WebSocket):
+        client = self._by_socket.get(id(websocket))
+        if client is not None and not client.closed:
+            self._enqueue(client, _SNAPSHOT)
+
+    async def broadcast(self, batch_id: str, message: dict):
+        clients = self.active_connections.get(batch_id)
+        if not clients:
+            return
+        # Serialize once; each client's writer task sends at its own pace
+        text = json.dumps(message, ensure_ascii=False, default=str)
+        for client in list(clients.values()):
+            self._enqueue(client, text)
+
+    def _enqueue(self, client: ClientConnection, item):
+        if client.offer(item):
+            return
+        self.frames_dropped += 1
+        if self.slow_consumer_policy == SLOW_CONSUMER_DISCONNECT or self.snapshot_provider is None:
+            logger.warning(f"Disconnecting slow websocket client of batch {client.batch_id}")
+            self._evict(client, code=1013)
+        else:
+            client.replace_backlog(_SNAPSHOT)
+
+    async def _write(self, client: ClientConnection):
+        try:
+            while True:
+                item = await client.queue.get()
+                if item is _SNAPSHOT:
+                    item = await self.snapshot_provider(client.batch_id)
+                    self.snapshots_sent += 1
+                await asyncio.wait_for(client.websocket.send_text(item), timeout=self.send_timeout)
+                self.frames_sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Dead or stuck socket: evict it instead of failing every broadcast
+            logger.info(f"Evicting websocket client of batch {client.batch_id}: {e!r}")
+            self._evict(client)
+
+    def _evict(self, client: ClientConnection, code: int = 1011):
+        if client.closed:
+            return
+        self.evicted += 1
+        self._remove(client)
+        asyncio.create_task(self._close(client.websocket, code))
+
+    async def _close(self, websocket: WebSocket, code: int):
+        try:
+            await asyncio.wait_for(websocket.close(code=code), timeout=self.send_timeout)
+        except Exception:
+            pass
+
+    def _remove(self, client: ClientConnection):
+        if client.closed:
+            return
+        client.closed = True
+        self._by_socket.pop(id(client.websocket), None)
+        if client.writer is not None and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+        clients = self.active_connections.get(client.batch_id)
+        if clients is not None and clients.pop(id(client.websocket), None) is not None:
+            if not clients:
+                del self.active_connections[client.batch_id]
+                if self.on_batch_idle is not None:
+                    self.on_batch_idle(client.batch_id)
+
+    def metrics(self) -> dict:
+        return {
+            "clients": len(self._by_socket),
+            "batches": len(self.active_connections),
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "snapshots_sent": self.snapshots_sent,
+            "evicted": self.evicted,
+            "slow_consumer_policy": self.slow_consumer_policy
+        }
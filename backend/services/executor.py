@@ -0,0 +1,139 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from loguru import logger
+
+
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+
+
+class ExecutorBusyError(RuntimeError):
+    pass
+
+
+def _timed_call(func: Callable, *args) -> tuple:
+    started_at = time.time()
+    start = time.perf_counter()
+    result = func(*args)
+    return started_at, time.perf_counter() - start, result
+
+
+class GenerationExecutor:
+    def __init__(
+        self,
+        kind: str = EXECUTOR_THREAD,
+        max_workers: int = 2,
+        max_queue: int = 32,
+        initializer: Optional[Callable] = None,
+        initargs: tuple = ()
+    ):
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        
+        if kind == EXECUTOR_PROCESS:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=initializer,
+                initargs=initargs
+            )
+        else:
+            self.kind = EXECUTOR_THREAD
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="generation",
+                initializer=initializer,
+                initargs=initargs
+            )
+        
+        self.pending = 0
+        self.max_pending_seen = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+        
+        logger.info(
+            f"GenerationExecutor started: kind={self.kind}, "
+            f"max_workers={self.max_workers}, max_queue={self.max_queue}"
+        )
+
+    @property
+    def running(self) -> int:
+        return min(self.pending, self.max_workers)
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.pending - self.max_workers)
+
+    async def run(self, func: Callable, *args) -> Any:
+        if self.queued >= self.max_queue and self.pending >= self.max_workers:
+            self.rejected += 1
+            raise ExecutorBusyError(
+                f"Generation queue is full ({self.queued} queued, {self.running} running)"
+            )
+        
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        self.submitted += 1
+        self.max_pending_seen = max(self.max_pending_seen, self.pending)
+        enqueued_at = time.time()
+        future = self._executor.submit(_timed_call, func, *args)
+        # Count the work as pending until the worker finishes it, even if the
+        # awaiting request or job is cancelled first
+        future.add_done_callback(
+            lambda done: self._call_in_loop(loop, self._finished, done, enqueued_at)
+        )
+        _, _, result = await asyncio.wrap_future(future)
+        return result
+
+    @staticmethod
+    def _call_in_loop(loop: asyncio.AbstractEventLoop, callback: Callable, *args):
+        # Done callbacks run on the worker (or process manager) thread
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # Event loop already closed during shutdown
+            pass
+
+    def _finished(self, future, enqueued_at: float):
+        self.pending -= 1
+        if future.cancelled():
+            # Cancelled before a worker picked it up
+            self.cancelled += 1
+            return
+        if future.exception() is not None:
+            self.failed += 1
+            return
+        started_at, elapsed, _ = future.result()
+        self.completed += 1
+        self.total_wait += max(0.0, started_at - enqueued_at)
+        self.total_run += elapsed
+
+    def metrics(self) -> dict:
+        finished = self.completed or 1
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queue_depth": self.queued,
+            "max_pending_seen": self.max_pending_seen,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "avg_wait_ms": round(self.total_wait / finished * 1000, 2),
+            "avg_run_ms": round(self.total_run / finished * 1000, 2)
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+        logger.info("GenerationExecutor stopped")
@@ -0,0 +1,623 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_PAUSED = "paused"
+JOB_CANCELLED = "cancelled"
+JOB_COMPLETED = "completed"
+
+EPISODE_PENDING = "pending"
+EPISODE_COMPLETED = "completed"
+EPISODE_FAILED = "failed"
+
+# Status transitions allowed from the API
+CANCELLABLE = (JOB_QUEUED, JOB_RUNNING, JOB_PAUSED)
+PAUSABLE = (JOB_QUEUED, JOB_RUNNING)
+RESUMABLE = (JOB_PAUSED,)
+
+
+def _job_summary(job: dict, completed: int, failed: int) -> dict:
+    total = job["end_episode"] - job["start_episode"] + 1
+    return {
+        "batch_id": job["job_id"],
+        "start_episode": job["start_episode"],
+        "end_episode": job["end_episode"],
+        "total_episodes": total,
+        "completed_episodes": completed,
+        "failed_episodes": failed,
+        "progress": (completed / total) * 100 if total else 0,
+        "current_episode": job["current_episode"],
+        "status": job["status"],
+        "options": job["options"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"]
+    }
+
+
+def _job_dict(job: dict, episodes: list) -> dict:
+    completed = sum(1 for item in episodes if item["status"] == EPISODE_COMPLETED)
+    failed = sum(1 for item in episodes if item["status"] == EPISODE_FAILED)
+    result = _job_summary(job, completed, failed)
+    result["episodes"] = [item for item in episodes if item["status"] != EPISODE_PENDING]
+    return result
+
+
+# Several uvicorn workers can share one database file (WAL mode)
+class SqliteJobStore:
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                start_episode INTEGER NOT NULL,
+                end_episode INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                options TEXT NOT NULL,
+                current_episode INTEGER NOT NULL,
+                owner TEXT,
+                lease_expires REAL NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+            CREATE TABLE IF NOT EXISTS job_episodes (
+                job_id TEXT NOT NULL,
+                episode INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                error TEXT,
+                word_count INTEGER,
+                is_valid INTEGER,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (job_id, episode)
+            ) WITHOUT ROWID;
+        """)
+
+    def _transaction(self, func, *args):
+        # BEGIN IMMEDIATE takes the write lock up front, so claims from
+        # different processes are serialized by SQLite itself
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(*args)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def _read(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def create_job(self, job_id: str, start_episode: int, end_episode: int, options: dict) -> dict:
+        now = time.time()
+
+        def insert():
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, start_episode, end_episode, status, options, current_episode, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, start_episode, end_episode, JOB_QUEUED, json.dumps(options), start_episode, now, now)
+            )
+            self._conn.executemany(
+                "INSERT INTO job_episodes (job_id, episode, status, updated_at) VALUES (?, ?, ?, ?)",
+                [(job_id, episode, EPISODE_PENDING, now) for episode in range(start_episode, end_episode + 1)]
+            )
+        
+        self._transaction(insert)
+        return self.get_job(job_id)
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        rows = self._read("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+        if not rows:
+            return None
+        job = rows[0]
+        job["options"] = json.loads(job["options"])
+        episodes = self._read(
+            "SELECT episode, status, attempts, error, word_count, is_valid FROM job_episodes "
+            "WHERE job_id = ? ORDER BY episode",
+            (job_id,)
+        )
+        for item in episodes:
+            if item["is_valid"] is not None:
+                item["is_valid"] = bool(item["is_valid"])
+        return _job_dict(job, episodes)
+    
+    # Job fields and episode counts without the per-episode list
+    def get_summary(self, job_id: str) -> Optional[dict]:
+        rows = self._read("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+        if not rows:
+            return None
+        job = rows[0]
+        job["options"] = json.loads(job["options"])
+        counts = {
+            row["status"]: row["count"]
+            for row in self._read(
+                "SELECT status, COUNT(*) AS count FROM job_episodes WHERE job_id = ? GROUP BY status",
+                (job_id,)
+            )
+        }
+        return _job_summary(job, counts.get(EPISODE_COMPLETED, 0), counts.get(EPISODE_FAILED, 0))
+
+    def list_jobs(self, limit: int = 50) -> list:
+        rows = self._read("SELECT job_id FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [self.get_job(row["job_id"]) for row in rows]
+
+    def get_status(self, job_id: str) -> Optional[str]:
+        rows = self._read("SELECT status FROM jobs WHERE job_id = ?", (job_id,))
+        return rows[0]["status"] if rows else None
+
+    def set_status(self, job_id: str, status: str, from_statuses: tuple) -> bool:
+        placeholders = ", ".join("?" for _ in from_statuses)
+
+        def update():
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ? AND status IN ({placeholders})",
+                (status, time.time(), job_id) + tuple(from_statuses)
+            )
+            return cursor.rowcount > 0
+        
+        return self._transaction(update)
+
+    def count_running(self) -> int:
+        rows = self._read(
+            "SELECT COUNT(*) AS running FROM jobs WHERE status = ? AND lease_expires > ?",
+            (JOB_RUNNING, time.time())
+        )
+        return rows[0]["running"]
+
+    def claim_job(self, owner: str, lease_seconds: float, max_running: int) -> Optional[str]:
+        def claim():
+            now = time.time()
+            running = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND lease_expires > ?", (JOB_RUNNING, now)
+            ).fetchone()[0]
+            if running >= max_running:
+                return None
+            # Queued jobs, or running jobs whose worker died (lease expired)
+            row = self._conn.execute(
+                "SELECT job_id FROM jobs WHERE status = ? OR (status = ? AND lease_expires <= ?) "
+                "ORDER BY created_at LIMIT 1",
+                (JOB_QUEUED, JOB_RUNNING, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, lease_expires = ?, updated_at = ? WHERE job_id = ?",
+                (JOB_RUNNING, owner, now + lease_seconds, now, row["job_id"])
+            )
+            return row["job_id"]
+        
+        return self._transaction(claim)
+
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        def renew():
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE job_id = ? AND owner = ? AND status = ?",
+                (time.time() + lease_seconds, job_id, owner, JOB_RUNNING)
+            )
+            return cursor.rowcount > 0
+        
+        return self._transaction(renew)
+
+    def release(self, job_id: str, owner: str, status: Optional[str] = None):
+        def update():
+            if status is None:
+                self._conn.execute(
+                    "UPDATE jobs SET owner = NULL, lease_expires = 0 WHERE job_id = ? AND owner = ?",
+                    (job_id, owner)
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE jobs SET owner = NULL, lease_expires = 0, status = ?, updated_at = ? "
+                    "WHERE job_id = ? AND owner = ? AND status = ?",
+                    (status, time.time(), job_id, owner, JOB_RUNNING)
+                )
+        
+        self._transaction(update)
+    
+    # Returns (episode, attempts) of the next due episode, (None, retry_at) when
+    # only episodes waiting for a retry are left, or (None, None) when the job is done
+    def next_episode(self, job_id: str) -> tuple:
+        now = time.time()
+        rows = self._read(
+            "SELECT episode, attempts, next_attempt_at FROM job_episodes "
+            "WHERE job_id = ? AND status = ? ORDER BY episode",
+            (job_id, EPISODE_PENDING)
+        )
+        if not rows:
+            return None, None
+        due = [row for row in rows if row["next_attempt_at"] <= now]
+        if due:
+            return due[0]["episode"], due[0]["attempts"]
+        return None, min(row["next_attempt_at"] for row in rows)
+
+    def complete_episode(self, job_id: str, episode: int, word_count: int, is_valid: Optional[bool]):
+        def update():
+            now = time.time()
+            self._conn.execute(
+                "UPDATE job_episodes SET status = ?, attempts = attempts + 1, error = NULL, word_count = ?, "
+                "is_valid = ?, updated_at = ? WHERE job_id = ? AND episode = ?",
+                (EPISODE_COMPLETED, word_count, None if is_valid is None else int(is_valid), now, job_id, episode)
+            )
+            self._conn.execute(
+                "UPDATE jobs SET current_episode = ?, updated_at = ? WHERE job_id = ?", (episode, now, job_id)
+            )
+        
+        self._transaction(update)
+    
+    # Records a failed attempt. Returns True when the episode will be retried
+    def fail_episode(self, job_id: str, episode: int, error: str, max_attempts: int, backoff: float) -> bool:
+        def update():
+            now = time.time()
+            attempts = self._conn.execute(
+                "SELECT attempts FROM job_episodes WHERE job_id = ? AND episode = ?", (job_id, episode)
+            ).fetchone()[0] + 1
+            retry = attempts < max_attempts
+            self._conn.execute(
+                "UPDATE job_episodes SET status = ?, attempts = ?, next_attempt_at = ?, error = ?, updated_at = ? "
+                "WHERE job_id = ? AND episode = ?",
+                (
+                    EPISODE_PENDING if retry else EPISODE_FAILED,
+                    attempts,
+                    now + backoff * (2 ** (attempts - 1)) if retry else 0,
+                    error,
+                    now,
+                    job_id,
+                    episode
+                )
+            )
+            self._conn.execute(
+                "UPDATE jobs SET current_episode = ?, updated_at = ? WHERE job_id = ?", (episode, now, job_id)
+            )
+            return retry
+        
+        return self._transaction(update)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Works with any Redis-compatible client (redis-py, or fakeredis for local runs).
+# Status changes, claims and episode updates are serialized by a short-lived
+# lock key, so several uvicorn workers can share one Redis. Besides the job
+# hashes there are per-status indexes, so polling never loads every job:
+#   jobs    zset of all job ids by creation time (listing)
+#   queued  zset of queued job ids by creation time (claim order)
+#   running zset of running job ids by lease expiry (count, reclaim)
+class RedisJobStore:
+    def __init__(self, client, prefix: str = "scriptjobs:"):
+        self.client = client
+        self.prefix = prefix
+        if self.client.set(self._key("indexed"), 1, nx=True):
+            self._rebuild_indexes()
+
+    def _key(self, *parts) -> str:
+        return self.prefix + ":".join(str(part) for part in parts)
+
+    def _locked(self, func, *args):
+        lock_key = self._key("lock")
+        token = os.urandom(8).hex()
+        deadline = time.time() + 10
+        while not self.client.set(lock_key, token, nx=True, px=5000):
+            if time.time() > deadline:
+                raise TimeoutError("Timed out waiting for the job store lock")
+            time.sleep(0.01)
+        try:
+            return func(*args)
+        finally:
+            if self._decode(self.client.get(lock_key)) == token:
+                self.client.delete(lock_key)
+
+    @staticmethod
+    def _decode(value):
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def _rebuild_indexes(self):
+        # One-off scan for data written before the status indexes existed
+        def rebuild():
+            pipe = self.client.pipeline()
+            for job_id in self.client.zrange(self._key("jobs"), 0, -1):
+                job = self._load_job(self._decode(job_id))
+                if job is not None:
+                    self._index_status(pipe, job["job_id"], job["status"], job["created_at"], job["lease_expires"])
+            pipe.execute()
+        
+        self._locked(rebuild)
+
+    def _index_status(self, pipe, job_id: str, status: str, created_at: float, lease_expires: float):
+        pipe.zrem(self._key("queued"), job_id)
+        pipe.zrem(self._key("running"), job_id)
+        if status == JOB_QUEUED:
+            pipe.zadd(self._key("queued"), {job_id: created_at})
+        elif status == JOB_RUNNING:
+            pipe.zadd(self._key("running"), {job_id: lease_expires})
+
+    def _load_job(self, job_id: str) -> Optional[dict]:
+        raw = self.client.hgetall(self._key("job", job_id))
+        if not raw:
+            return None
+        job = {self._decode(key): self._decode(value) for key, value in raw.items()}
+        for field in ("start_episode", "end_episode", "current_episode"):
+            job[field] = int(job[field])
+        for field in ("lease_expires", "created_at", "updated_at"):
+            job[field] = float(job[field])
+        job["options"] = json.loads(job["options"])
+        job["owner"] = job.get("owner") or None
+        return job
+
+    def _load_episodes(self, job_id: str) -> list:
+        raw = self.client.hgetall(self._key("job", job_id, "episodes"))
+        episodes = [json.loads(self._decode(value)) for value in raw.values()]
+        return sorted(episodes, key=lambda item: item["episode"])
+
+    def _save_episode(self, pipe, job_id: str, item: dict):
+        pipe.hset(self._key("job", job_id, "episodes"), str(item["episode"]), json.dumps(item))
+
+    def _update_job(self, pipe, job_id: str, **fields):
+        fields["updated_at"] = time.time()
+        pipe.hset(self._key("job", job_id), mapping={
+            key: "" if value is None else value for key, value in fields.items()
+        })
+
+    def create_job(self, job_id: str, start_episode: int, end_episode: int, options: dict) -> dict:
+        now = time.time()
+        pipe = self.client.pipeline()
+        pipe.hset(self._key("job", job_id), mapping={
+            "job_id": job_id,
+            "start_episode": start_episode,
+            "end_episode": end_episode,
+            "status": JOB_QUEUED,
+            "options": json.dumps(options),
+            "current_episode": start_episode,
+            "owner": "",
+            "lease_expires": 0,
+            "created_at": now,
+            "updated_at": now
+        })
+        pipe.hset(self._key("job", job_id, "episodes"), mapping={
+            str(episode): json.dumps({
+                "episode": episode,
+                "status": EPISODE_PENDING,
+                "attempts": 0,
+                "next_attempt_at": 0,
+                "error": None,
+                "word_count": None,
+                "is_valid": None
+            })
+            for episode in range(start_episode, end_episode + 1)
+        })
+        pipe.zadd(self._key("jobs"), {job_id: now})
+        pipe.zadd(self._key("queued"), {job_id: now})
+        pipe.execute()
+        return self.get_job(job_id)
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        job = self._load_job(job_id)
+        if job is None:
+            return None
+        episodes = [
+            {key: item[key] for key in ("episode", "status", "attempts", "error", "word_count", "is_valid")}
+            for item in self._load_episodes(job_id)
+        ]
+        return _job_dict(job, episodes)
+
+    def get_summary(self, job_id: str) -> Optional[dict]:
+        job = self._load_job(job_id)
+        if job is None:
+            return None
+        statuses = [item["status"] for item in self._load_episodes(job_id)]
+        return _job_summary(job, statuses.count(EPISODE_COMPLETED), statuses.count(EPISODE_FAILED))
+
+    def list_jobs(self, limit: int = 50) -> list:
+        job_ids = self.client.zrevrange(self._key("jobs"), 0, limit - 1)
+        return [self.get_job(self._decode(job_id)) for job_id in job_ids]
+
+    def get_status(self, job_id: str) -> Optional[str]:
+        return self._decode(self.client.hget(self._key("job", job_id), "status"))
+
+    def set_status(self, job_id: str, status: str, from_statuses: tuple) -> bool:
+        def update():
+            job = self._load_job(job_id)
+            if job is None or job["status"] not in from_statuses:
+                return False
+            pipe = self.client.pipeline()
+            self._update_job(pipe, job_id, status=status)
+            self._index_status(pipe, job_id, status, job["created_at"], job["lease_expires"])
+            pipe.execute()
+            return True
+        
+        return self._locked(update)
+
+    def count_running(self) -> int:
+        return self.client.zcount(self._key("running"), f"({time.time()}", "+inf")
+
+    def claim_job(self, owner: str, lease_seconds: float, max_running: int) -> Optional[str]:
+        def claim():
+            now = time.time()
+            if self.client.zcount(self._key("running"), f"({now}", "+inf") >= max_running:
+                return None
+            # Oldest queued job, or a running job whose worker died (lease expired)
+            candidates = []
+            for job_id, created_at in self.client.zrange(self._key("queued"), 0, 0, withscores=True):
+                candidates.append((created_at, self._decode(job_id)))
+            for job_id in self.client.zrangebyscore(self._key("running"), "-inf", now, start=0, num=1):
+                job_id = self._decode(job_id)
+                created_at = self.client.hget(self._key("job", job_id), "created_at")
+                candidates.append((float(self._decode(created_at) or 0), job_id))
+            if not candidates:
+                return None
+            
+            _, job_id = min(candidates)
+            lease_expires = now + lease_seconds
+            pipe = self.client.pipeline()
+            self._update_job(pipe, job_id, status=JOB_RUNNING, owner=owner, lease_expires=lease_expires)
+            pipe.zrem(self._key("queued"), job_id)
+            pipe.zadd(self._key("running"), {job_id: lease_expires})
+            pipe.execute()
+            return job_id
+        
+        return self._locked(claim)
+
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        def renew():
+            job = self._load_job(job_id)
+            if job is None or job["owner"] != owner or job["status"] != JOB_RUNNING:
+                return False
+            lease_expires = time.time() + lease_seconds
+            pipe = self.client.pipeline()
+            pipe.hset(self._key("job", job_id), "lease_expires", lease_expires)
+            pipe.zadd(self._key("running"), {job_id: lease_expires})
+            pipe.execute()
+            return True
+        
+        return self._locked(renew)
+
+    def release(self, job_id: str, owner: str, status: Optional[str] = None):
+        def update():
+            job = self._load_job(job_id)
+            if job is None or job["owner"] != owner:
+                return
+            pipe = self.client.pipeline()
+            if status is None:
+                pipe.hset(self._key("job", job_id), mapping={"owner": "", "lease_expires": 0})
+                if job["status"] == JOB_RUNNING:
+                    # Immediately claimable by any worker
+                    pipe.zadd(self._key("running"), {job_id: 0})
+            elif job["status"] == JOB_RUNNING:
+                self._update_job(pipe, job_id, owner=None, lease_expires=0, status=status)
+                self._index_status(pipe, job_id, status, job["created_at"], 0)
+            pipe.execute()
+        
+        self._locked(update)
+
+    def next_episode(self, job_id: str) -> tuple:
+        now = time.time()
+        pending = [item for item in self._load_episodes(job_id) if item["status"] == EPISODE_PENDING]
+        if not pending:
+            return None, None
+        due = [item for item in pending if item["next_attempt_at"] <= now]
+        if due:
+            return due[0]["episode"], due[0]["attempts"]
+        return None, min(item["next_attempt_at"] for item in pending)
+
+    def _load_episode(self, job_id: str, episode: int) -> dict:
+        return json.loads(self._decode(self.client.hget(self._key("job", job_id, "episodes"), str(episode))))
+
+    def complete_episode(self, job_id: str, episode: int, word_count: int, is_valid: Optional[bool]):
+        def update():
+            item = self._load_episode(job_id, episode)
+            item.update(
+                status=EPISODE_COMPLETED,
+                attempts=item["attempts"] + 1,
+                error=None,
+                word_count=word_count,
+                is_valid=is_valid
+            )
+            pipe = self.client.pipeline()
+            self._save_episode(pipe, job_id, item)
+            self._update_job(pipe, job_id, current_episode=episode)
+            pipe.execute()
+        
+        self._locked(update)
+
+    def fail_episode(self, job_id: str, episode: int, error: str, max_attempts: int, backoff: float) -> bool:
+        def update():
+            item = self._load_episode(job_id, episode)
+            attempts = item["attempts"] + 1
+            retry = attempts < max_attempts
+            item.update(
+                status=EPISODE_PENDING if retry else EPISODE_FAILED,
+                attempts=attempts,
+                next_attempt_at=time.time() + backoff * (2 ** (attempts - 1)) if retry else 0,
+                error=error
+            )
+            pipe = self.client.pipeline()
+            self._save_episode(pipe, job_id, item)
+            self._update_job(pipe, job_id, current_episode=episode)
+            pipe.execute()
+            return retry
+        
+        return self._locked(update)
+
+    def close(self):
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            close()
+
+
+# Async facade used by the API and the worker. Store calls can block (SQLite
+# busy timeout, Redis lock wait), so each one runs in a worker thread instead
+# of on the event loop.
+class AsyncJobStore:
+    def __init__(self, store):
+        self.store = store
+
+    async def _call(self, method: str, *args):
+        return await asyncio.to_thread(getattr(self.store, method), *args)
+
+    async def create_job(self, job_id: str, start_episode: int, end_episode: int, options: dict) -> dict:
+        return await self._call("create_job", job_id, start_episode, end_episode, options)
+
+    async def get_job(self, job_id: str) -> Optional[dict]:
+        return await self._call("get_job", job_id)
+
+    async def get_summary(self, job_id: str) -> Optional[dict]:
+        return await self._call("get_summary", job_id)
+
+    async def list_jobs(self, limit: int = 50) -> list:
+        return await self._call("list_jobs", limit)
+
+    async def get_status(self, job_id: str) -> Optional[str]:
+        return await self._call("get_status", job_id)
+
+    async def set_status(self, job_id: str, status: str, from_statuses: tuple) -> bool:
+        return await self._call("set_status", job_id, status, from_statuses)
+
+    async def count_running(self) -> int:
+        return await self._call("count_running")
+
+    async def claim_job(self, owner: str, lease_seconds: float, max_running: int) -> Optional[str]:
+        return await self._call("claim_job", owner, lease_seconds, max_running)
+
+    async def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        return await self._call("renew_lease", job_id, owner, lease_seconds)
+
+    async def release(self, job_id: str, owner: str, status: Optional[str] = None):
+        await self._call("release", job_id, owner, status)
+
+    async def next_episode(self, job_id: str) -> tuple:
+        return await self._call("next_episode", job_id)
+
+    async def complete_episode(self, job_id: str, episode: int, word_count: int, is_valid: Optional[bool]):
+        await self._call("complete_episode", job_id, episode, word_count, is_valid)
+
+    async def fail_episode(self, job_id: str, episode: int, error: str, max_attempts: int, backoff: float) -> bool:
+        return await self._call("fail_episode", job_id, episode, error, max_attempts, backoff)
+
+    async def close(self):
+        await self._call("close")
+
+
+def create_job_store(backend: str, database_path: str, redis_url: str):
+    if backend == "redis":
+        import redis
+        return RedisJobStore(redis.Redis.from_url(redis_url))
+    return SqliteJobStore(database_path)
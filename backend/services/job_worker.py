@@ -0,0 +1,239 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable, List, Optional
+
+from loguru import logger
+
+from core.config import settings
+from services.executor import ExecutorBusyError
+from services.job_store import (
+    AsyncJobStore,
+    create_job_store,
+    JOB_RUNNING,
+    JOB_COMPLETED,
+    EPISODE_PENDING,
+    EPISODE_COMPLETED,
+    EPISODE_FAILED
+)
+from services.script_service import script_service
+
+
+# listener(job_id, message_type, summary, episode_delta); summary has the job
+# fields and counts, episode_delta only the episode that just changed (or None)
+ProgressListener = Callable[[str, str, dict, Optional[dict]], Awaitable[None]]
+
+
+class BatchJobWorker:
+    def __init__(
+        self,
+        store,
+        service,
+        max_concurrent: int = 2,
+        max_attempts: int = 3,
+        retry_backoff: float = 2.0,
+        lease_seconds: float = 60.0,
+        poll_interval: float = 1.0
+    ):
+        self.store = store
+        self.service = service
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        # Identifies this process in job leases; several uvicorn workers
+        # (or standalone worker processes) can share the same store
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.listeners: List[ProgressListener] = []
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._loop_task = None
+        self._wakeup = None
+
+    def add_listener(self, listener: ProgressListener):
+        self.listeners.append(listener)
+
+    def active_jobs(self) -> List[str]:
+        return [job_id for job_id, task in self._tasks.items() if not task.done()]
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self):
+        if self._loop_task is None:
+            self._wakeup = asyncio.Event()
+            self._loop_task = asyncio.create_task(self._run())
+            logger.info(f"BatchJobWorker started: owner={self.owner}")
+
+    async def stop(self):
+        if self._loop_task is None:
+            return
+        self._loop_task.cancel()
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(self._loop_task, *tasks, return_exceptions=True)
+        self._loop_task = None
+        logger.info("BatchJobWorker stopped")
+
+    async def run_forever(self):
+        await self.start()
+        try:
+            await self._loop_task
+        finally:
+            await self.stop()
+
+    async def _run(self):
+        while True:
+            try:
+                self._tasks = {job_id: task for job_id, task in self._tasks.items() if not task.done()}
+                job_id = None
+                if len(self._tasks) < self.max_concurrent:
+                    job_id = await self.store.claim_job(self.owner, self.lease_seconds, self.max_concurrent)
+                if job_id is not None:
+                    logger.info(f"Claimed batch job {job_id}")
+                    self._tasks[job_id] = asyncio.create_task(self._run_job(job_id))
+                    continue
+            except Exception:
+                # A locked database or a Redis lock timeout must not stop the
+                # worker for good: back off for one poll interval and try again
+                logger.exception("Error claiming batch job")
+            
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_job(self, job_id: str):
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, asyncio.current_task()))
+        try:
+            options = (await self.store.get_job(job_id))["options"]
+            while True:
+                status = await self.store.get_status(job_id)
+                if status != JOB_RUNNING:
+                    # Paused or cancelled from the API; completed episodes stay checkpointed
+                    logger.info(f"Batch job {job_id} stopped: {status}")
+                    await self.store.release(job_id, self.owner)
+                    await self._publish(job_id, status)
+                    return
+                
+                episode, retry_at = await self.store.next_episode(job_id)
+                if episode is None:
+                    if retry_at is None:
+                        await self.store.release(job_id, self.owner, JOB_COMPLETED)
+                        logger.info(f"Batch job {job_id} completed")
+                        await self._publish(job_id, "completed")
+                        return
+                    # Only episodes waiting for a retry are left
+                    await asyncio.sleep(min(max(0.0, retry_at - time.time()), self.poll_interval))
+                    continue
+                
+                if not await self.store.renew_lease(job_id, self.owner, self.lease_seconds):
+                    logger.warning(f"Lost lease on batch job {job_id}")
+                    return
+                
+                try:
+                    result = await self.service.generate_single_result(
+                        episode,
+                        options.get("creativity_level", 0.3),
+                        options.get("enable_validation", True)
+                    )
+                    is_valid = result.validation["is_valid"] if result.validation else None
+                    await self.store.complete_episode(job_id, episode, len(result.content), is_valid)
+                    delta = {
+                        "episode": episode,
+                        "status": EPISODE_COMPLETED,
+                        "word_count": len(result.content),
+                        "is_valid": is_valid
+                    }
+                except ExecutorBusyError as e:
+                    # Saturated executor, not a failed episode: leave it pending
+                    # without using up an attempt and try again shortly
+                    logger.info(f"Requeueing episode {episode} of batch job {job_id}: {e}")
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                except Exception as e:
+                    retry = await self.store.fail_episode(
+                        job_id, episode, str(e), self.max_attempts, self.retry_backoff
+                    )
+                    logger.error(
+                        f"Error generating episode {episode} of batch job {job_id}"
+                        f"{' (will retry)' if retry else ''}: {e}"
+                    )
+                    delta = {
+                        "episode": episode,
+                        "status": EPISODE_PENDING if retry else EPISODE_FAILED,
+                        "error": str(e)
+                    }
+                
+                await self._publish(job_id, "progress", delta)
+        except asyncio.CancelledError:
+            # Shutting down: give the job back so another worker can resume it
+            # (a no-op when the heartbeat cancelled us after losing the lease)
+            await self.store.release(job_id, self.owner)
+            raise
+        except Exception:
+            # A store error (locked database, Redis timeout) must not leave the
+            # job leased to a task that is gone: release it so a worker can
+            # claim it again once the store recovers
+            logger.exception(f"Error running batch job {job_id}")
+            try:
+                await self.store.release(job_id, self.owner)
+            except Exception:
+                # The lease expires on its own and the job is reclaimed then
+                logger.exception(f"Error releasing batch job {job_id}")
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: str, job_task: asyncio.Task):
+        # Keep the lease alive while an episode runs longer than the lease
+        # itself; if another worker has taken the job over, stop working on it
+        interval = self.lease_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if await self.store.renew_lease(job_id, self.owner, self.lease_seconds):
+                    continue
+                if await self.store.get_status(job_id) != JOB_RUNNING:
+                    # Paused or cancelled: the job loop stops after this episode
+                    return
+            except Exception:
+                logger.exception(f"Error renewing lease on batch job {job_id}")
+                continue
+            logger.warning(f"Lost lease on batch job {job_id}, stopping it")
+            job_task.cancel()
+            return
+
+    async def _publish(self, job_id: str, message_type: str, delta: Optional[dict] = None):
+        if not self.listeners:
+            return
+        summary = await self.store.get_summary(job_id)
+        for listener in self.listeners:
+            try:
+                await listener(job_id, message_type, summary, delta)
+            except Exception as e:
+                logger.error(f"Error publishing progress for batch job {job_id}: {e}")
+
+
+job_store = AsyncJobStore(
+    create_job_store(settings.JOB_QUEUE_BACKEND, settings.JOB_DATABASE_PATH, settings.REDIS_URL)
+)
+
+batch_worker = BatchJobWorker(
+    job_store,
+    script_service,
+    max_concurrent=settings.JOB_MAX_CONCURRENT,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retry_backoff=settings.JOB_RETRY_BACKOFF,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    poll_interval=settings.JOB_POLL_INTERVAL
+)
+
+
+if __name__ == "__main__":
+    # Standalone worker process: python -m services.job_worker (from backend/)
+    asyncio.run(batch_worker.run_forever())
@@ -0,0 +1,168 @@
+import asyncio
+from typing import Awaitable, Callable, Iterable, Optional
+
+from loguru import logger
+
+from services.job_store import EPISODE_COMPLETED, JOB_CANCELLED, JOB_COMPLETED, JOB_PAUSED
+
+
+class ProgressCoalescer:
+    def __init__(self, send: Callable[[str, dict], Awaitable[None]], window: float = 0.2):
+        self.send = send
+        self.window = window
+        self._pending: dict[str, dict] = {}
+        self._timers: dict[str, asyncio.Task] = {}
+        self.events_in = 0
+        self.frames_out = 0
+
+    def publish(self, batch_id: str, message_type: str, summary: dict, delta: Optional[dict] = None):
+        self.events_in += 1
+        pending = self._pending.get(batch_id)
+        if pending is None:
+            pending = {"type": "progress", "summary": summary, "episodes": {}, "events": 0}
+            self._pending[batch_id] = pending
+        # A terminal event (completed / paused / cancelled) wins over plain progress
+        if message_type != "progress":
+            pending["type"] = message_type
+        pending["summary"] = summary
+        pending["events"] += 1
+        if delta is not None:
+            # Later changes to the same episode replace earlier ones
+            pending["episodes"][delta["episode"]] = delta
+        
+        if batch_id not in self._timers:
+            if self.window <= 0:
+                self._timers[batch_id] = asyncio.create_task(self.flush(batch_id))
+            else:
+                self._timers[batch_id] = asyncio.create_task(self._flush_later(batch_id))
+
+    async def _flush_later(self, batch_id: str):
+        await asyncio.sleep(self.window)
+        await self.flush(batch_id)
+
+    async def flush(self, batch_id: str):
+        self._timers.pop(batch_id, None)
+        pending = self._pending.pop(batch_id, None)
+        if pending is None:
+            return
+        
+        data = dict(pending["summary"] or {})
+        data["episodes"] = [pending["episodes"][episode] for episode in sorted(pending["episodes"])]
+        self.frames_out += 1
+        try:
+            await self.send(batch_id, {
+                "type": pending["type"],
+                "coalesced": pending["events"],
+                "data": data
+            })
+        except Exception as e:
+            logger.error(f"Error sending progress for batch {batch_id}: {e}")
+
+    def discard(self, batch_id: str):
+        self._pending.pop(batch_id, None)
+        timer = self._timers.pop(batch_id, None)
+        if timer is not None:
+            timer.cancel()
+
+    def metrics(self) -> dict:
+        return {
+            "window_ms": round(self.window * 1000),
+            "events_in": self.events_in,
+            "frames_out": self.frames_out,
+            "pending_batches": len(self._pending)
+        }
+
+
+# Worker listeners only fire in the process that runs the job, but a websocket
+# can be connected to any uvicorn worker. For every subscribed batch that is not
+# running in this process, poll the shared store (SQLite or Redis) and publish
+# what changed since the last poll, in the same shape the worker publishes.
+class StoreProgressPoller:
+    def __init__(
+        self,
+        store,
+        publish: Callable[[str, str, dict, Optional[dict]], None],
+        subscribed_batches: Callable[[], Iterable[str]],
+        local_batches: Callable[[], Iterable[str]],
+        interval: float = 1.0
+    ):
+        self.store = store
+        self.publish = publish
+        self.subscribed_batches = subscribed_batches
+        self.local_batches = local_batches
+        self.interval = interval
+        # batch_id -> (updated_at, status, {episode: item}) as of the last poll
+        self._seen: dict[str, tuple] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.events_out = 0
+
+    async def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"StoreProgressPoller started: interval={self.interval}s")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("StoreProgressPoller stopped")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except Exception:
+                logger.exception("Error polling batch progress")
+
+    async def poll(self):
+        local = set(self.local_batches())
+        batches = [batch_id for batch_id in self.subscribed_batches() if batch_id not in local]
+        for batch_id in list(self._seen):
+            if batch_id not in batches:
+                del self._seen[batch_id]
+        
+        for batch_id in batches:
+            job = await self.store.get_job(batch_id)
+            if job is None:
+                continue
+            self.polls += 1
+            episodes = {item["episode"]: item for item in job.pop("episodes")}
+            seen = self._seen.get(batch_id)
+            self._seen[batch_id] = (job["updated_at"], job["status"], episodes)
+            # The first poll only records a baseline: the client got a snapshot on connect
+            if seen is None or seen[0] == job["updated_at"]:
+                continue
+            
+            message_type = "progress"
+            if job["status"] != seen[1] and job["status"] in (JOB_COMPLETED, JOB_PAUSED, JOB_CANCELLED):
+                message_type = job["status"]
+            deltas = [
+                _episode_delta(item) for episode, item in episodes.items()
+                if seen[2].get(episode) != item
+            ]
+            for delta in deltas or [None]:
+                self.publish(batch_id, message_type, job, delta)
+                self.events_out += 1
+
+    def metrics(self) -> dict:
+        return {
+            "interval_s": self.interval,
+            "watched_batches": len(self._seen),
+            "polls": self.polls,
+            "events_out": self.events_out
+        }
+
+
+def _episode_delta(item: dict) -> dict:
+    if item["status"] == EPISODE_COMPLETED:
+        return {
+            "episode": item["episode"],
+            "status": item["status"],
+            "word_count": item["word_count"],
+            "is_valid": item["is_valid"]
+        }
+    return {"episode": item["episode"], "status": item["status"], "error": item["error"]}
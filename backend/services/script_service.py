@@ -1,24 +1,62 @@
 import sys
 import os
+import threading
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../src'))
 
-from generator.smart_episode_generator import SmartEpisodeGenerator
-from generator.first_episode import FirstEpisodeGenerator
-from generator.second_episode import SecondEpisodeGenerator
+from generator.generator_pool import GeneratorPool
+from generator.generation_result import GenerationResult, ResultCache
 from generator.consistency_validator import ConsistencyValidator
 from generator.state_tracker import StateTracker
 from utils.config_manager import ConfigManager
 from data.data_manager import DataManager
 from loguru import logger
 
+from core.config import settings
+from services.executor import GenerationExecutor
+
+
+# Per-worker generation state. Generator pools and validators are not
+# thread-safe, so every executor thread (or process) builds its own.
+_worker_state = threading.local()
+
+
+def _init_worker(config_manager: ConfigManager, data_manager: DataManager):
+    # The pool opens the tracker at the previous episode's checkpoint before each
+    # generation, so a worker never loads the full state history just to read it
+    state_tracker = StateTracker(data_manager, config_manager)
+    _worker_state.data_manager = data_manager
+    _worker_state.validator = ConsistencyValidator(state_tracker)
+    _worker_state.generator_pool = GeneratorPool(config_manager, data_manager, state_tracker)
+
+
+def _generate_in_worker(episode: int, enable_validation: bool) -> GenerationResult:
+    outline = _worker_state.data_manager.get_outline(episode)
+    if not outline:
+        raise ValueError(f"Outline for episode {episode} not found")
+    
+    result = _worker_state.generator_pool.generate_result(episode, outline, enable_validation)
+    if enable_validation:
+        result.validate(_worker_state.validator)
+    return result
+
+
+def _validate_in_worker(episode: int, content: str) -> dict:
+    return _worker_state.validator.validate(episode, content)
+
 
 class ScriptGenerationService:
     def __init__(self):
         self.config_manager = ConfigManager()
         self.data_manager = DataManager()
-        self.state_tracker = StateTracker(self.data_manager)
-        self.validator = ConsistencyValidator(self.state_tracker)
+        self.result_cache = ResultCache()
+        self.executor = GenerationExecutor(
+            settings.GENERATION_EXECUTOR,
+            settings.GENERATION_MAX_WORKERS,
+            settings.GENERATION_MAX_QUEUE,
+            initializer=_init_worker,
+            initargs=(self.config_manager, self.data_manager)
+        )
         
         logger.info("ScriptGenerationService initialized")
 
@@ -28,29 +66,27 @@ class ScriptGenerationService:
         creativity_level: float = 0.3,
         enable_validation: bool = True
     ) -> str:
+        result = await self.generate_single_result(episode, creativity_level, enable_validation)
+        return result.content
+
+    async def generate_single_result(
+        self,
+        episode: int,
+        creativity_level: float = 0.3,
+        enable_validation: bool = True
+    ) -> GenerationResult:
         logger.info(f"Generating script for episode {episode}")
         
         try:
-            if episode == 1:
-                generator = FirstEpisodeGenerator(self.config_manager, self.data_manager)
-            elif episode == 2:
-                generator = SecondEpisodeGenerator(self.config_manager, self.data_manager)
-            else:
-                generator = SmartEpisodeGenerator(self.config_manager, self.data_manager)
+            result = self.result_cache.put(
+                await self.executor.run(_generate_in_worker, episode, enable_validation)
+            )
             
-            outline = self.data_manager.get_outline(episode)
-            if not outline:
-                raise ValueError(f"Outline for episode {episode} not found")
-            
-            script_content = generator.generate(episode, outline)
-            
-            if enable_validation:
-                validation_result = self.validator.validate(episode, script_content)
-                if not validation_result["is_valid"]:
-                    logger.warning(f"Validation issues found for episode {episode}: {validation_result['issues']}")
+            if enable_validation and not result.validation["is_valid"]:
+                logger.warning(f"Validation issues found for episode {episode}: {result.validation['issues']}")
             
             logger.info(f"Script generated successfully for episode {episode}")
-            return script_content
+            return result
             
         except Exception as e:
             logger.error(f"Error generating script for episode {episode}: {e}")
@@ -60,12 +96,22 @@ class ScriptGenerationService:
         logger.info(f"Validating script for episode {episode}")
         
         try:
-            validation_result = self.validator.validate(episode, content)
+            result = self.result_cache.lookup(episode, content)
+            if result.is_validated:
+                logger.info(f"Reusing cached validation for episode {episode}")
+            else:
+                result.validation = await self.executor.run(_validate_in_worker, episode, content)
             logger.info(f"Validation completed for episode {episode}")
-            return validation_result
+            return result.validation
         except Exception as e:
             logger.error(f"Error validating script for episode {episode}: {e}")
             raise
 
+    def executor_metrics(self) -> dict:
+        return self.executor.metrics()
+
+    def shutdown(self):
+        self.executor.shutdown()
+
 
 script_service = ScriptGenerationService()
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from collections import deque
+from typing import Callable, List, Optional
+
+import psutil
+from loguru import logger
+
+from core.config import settings
+from services.script_service import script_service
+
+
+def _active_tasks() -> int:
+    executor = script_service.executor_metrics()
+    return executor["running"] + executor["queue_depth"]
+
+
+class SystemSampler:
+    def __init__(
+        self,
+        active_tasks_provider: Callable[[], int],
+        interval: float = 2.0,
+        history_size: int = 150,
+        disk_path: str = "/"
+    ):
+        self.active_tasks_provider = active_tasks_provider
+        self.interval = max(0.1, interval)
+        self.disk_path = disk_path
+        # Fixed-size ring buffer: the oldest sample falls off when it is full
+        self.samples: deque = deque(maxlen=max(1, history_size))
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"SystemSampler started: interval={self.interval}s, history={self.samples.maxlen}")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("SystemSampler stopped")
+
+    async def _run(self):
+        # The first cpu_percent(None) call only primes the counters; the first
+        # real sample is taken one interval later
+        try:
+            await asyncio.to_thread(psutil.cpu_percent, None)
+        except Exception as e:
+            logger.error(f"Error priming CPU counters: {e}")
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                # psutil calls can hit the filesystem, keep them off the event loop
+                sample = await asyncio.to_thread(self._read_system)
+                sample["active_tasks"] = self.active_tasks_provider()
+                self.samples.append(sample)
+            except Exception as e:
+                logger.error(f"Error sampling system status: {e}")
+
+    def _read_system(self) -> dict:
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        return {
+            "timestamp": time.time(),
+            # CPU usage since the previous sample, without blocking for an interval
+            "cpu_usage": psutil.cpu_percent(interval=None),
+            "memory_usage": round(memory.used / (1024 ** 3), 2),
+            "memory_percent": memory.percent,
+            "disk_usage": round(disk.percent, 2)
+        }
+
+    def latest(self) -> dict:
+        if self.samples:
+            return self.samples[-1]
+        # No sample yet (first interval after startup): never read psutil inline
+        return {
+            "timestamp": None,
+            "cpu_usage": None,
+            "memory_usage": None,
+            "memory_percent": None,
+            "disk_usage": None,
+            "active_tasks": self.active_tasks_provider(),
+            "warming_up": True
+        }
+
+    def history(self, limit: int) -> List[dict]:
+        if limit <= 0:
+            return []
+        return list(self.samples)[-limit:]
+
+
+system_sampler = SystemSampler(
+    _active_tasks,
+    interval=settings.SYSTEM_SAMPLE_INTERVAL,
+    history_size=settings.SYSTEM_SAMPLE_HISTORY
+)
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Keep the module-level job store out of the working tree
+os.environ.setdefault("JOB_DATABASE_PATH", os.path.join(tempfile.mkdtemp(prefix="jobs-"), "jobs.db"))
@@ -0,0 +1,143 @@
+import pytest
+
+from services import job_store
+from services.job_store import (
+    CANCELLABLE,
+    EPISODE_COMPLETED,
+    EPISODE_FAILED,
+    EPISODE_PENDING,
+    JOB_CANCELLED,
+    JOB_COMPLETED,
+    JOB_PAUSED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    PAUSABLE,
+    RESUMABLE,
+    RedisJobStore,
+    SqliteJobStore
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    # Only the store sees the fake clock; Redis lock keys still expire in real time
+    monkeypatch.setattr(job_store, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def store(request, tmp_path, clock):
+    if request.param == "sqlite":
+        store = SqliteJobStore(str(tmp_path / "jobs.db"))
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        store = RedisJobStore(fakeredis.FakeRedis())
+    yield store
+    store.close()
+
+
+def _create(store, clock, job_id: str, start_episode: int = 1, end_episode: int = 2):
+    clock.advance(1)
+    return store.create_job(job_id, start_episode, end_episode, {"creativity_level": 0.3})
+
+
+def test_claims_oldest_queued_job_up_to_max_running(store, clock):
+    for job_id in ("job-a", "job-b", "job-c"):
+        _create(store, clock, job_id)
+    
+    assert store.claim_job("w1", 30, max_running=2) == "job-a"
+    assert store.claim_job("w2", 30, max_running=2) == "job-b"
+    assert store.claim_job("w3", 30, max_running=2) is None
+    assert store.count_running() == 2
+    assert store.get_status("job-c") == JOB_QUEUED
+    
+    store.release("job-a", "w1", JOB_COMPLETED)
+    assert store.claim_job("w3", 30, max_running=2) == "job-c"
+    assert store.claim_job("w3", 30, max_running=5) is None
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(store, clock):
+    _create(store, clock, "job-a")
+    assert store.claim_job("w1", 30, max_running=1) == "job-a"
+    assert store.renew_lease("job-a", "w1", 30)
+    
+    clock.advance(31)
+    assert store.count_running() == 0
+    assert store.claim_job("w2", 30, max_running=1) == "job-a"
+    # The old owner has lost the job and cannot renew or release it
+    assert not store.renew_lease("job-a", "w1", 30)
+    store.release("job-a", "w1", JOB_COMPLETED)
+    assert store.get_status("job-a") == JOB_RUNNING
+    
+    # Releasing without a status makes the job claimable straight away
+    store.release("job-a", "w2")
+    assert store.claim_job("w3", 30, max_running=1) == "job-a"
+
+
+def test_pause_resume_and_cancel_transitions(store, clock):
+    _create(store, clock, "job-a")
+    
+    assert store.set_status("job-a", JOB_PAUSED, PAUSABLE)
+    assert store.claim_job("w1", 30, max_running=1) is None
+    assert not store.set_status("job-a", JOB_PAUSED, PAUSABLE)
+    
+    assert store.set_status("job-a", JOB_QUEUED, RESUMABLE)
+    assert not store.set_status("job-a", JOB_QUEUED, RESUMABLE)
+    assert store.claim_job("w1", 30, max_running=1) == "job-a"
+    
+    assert store.set_status("job-a", JOB_CANCELLED, CANCELLABLE)
+    assert not store.set_status("job-a", JOB_CANCELLED, CANCELLABLE)
+    assert store.count_running() == 0
+    # A worker finishing after the cancel must not overwrite it
+    store.release("job-a", "w1", JOB_COMPLETED)
+    assert store.get_status("job-a") == JOB_CANCELLED
+    assert store.claim_job("w2", 30, max_running=1) is None
+
+
+def test_failed_episode_backs_off_then_fails_after_max_attempts(store, clock):
+    _create(store, clock, "job-a", 1, 2)
+    
+    assert store.next_episode("job-a") == (1, 0)
+    assert store.fail_episode("job-a", 1, "boom", max_attempts=3, backoff=2.0)
+    # Episode 1 waits for its retry, episode 2 goes first
+    assert store.next_episode("job-a") == (2, 0)
+    store.complete_episode("job-a", 2, 1200, True)
+    assert store.next_episode("job-a") == (None, clock.now + 2.0)
+    
+    clock.advance(2)
+    assert store.next_episode("job-a") == (1, 1)
+    assert store.fail_episode("job-a", 1, "boom", max_attempts=3, backoff=2.0)
+    assert store.next_episode("job-a") == (None, clock.now + 4.0)
+    
+    clock.advance(4)
+    assert store.next_episode("job-a") == (1, 2)
+    assert not store.fail_episode("job-a", 1, "still broken", max_attempts=3, backoff=2.0)
+    assert store.next_episode("job-a") == (None, None)
+    
+    summary = store.get_summary("job-a")
+    assert summary["completed_episodes"] == 1
+    assert summary["failed_episodes"] == 1
+    assert summary["current_episode"] == 1
+    episodes = {item["episode"]: item for item in store.get_job("job-a")["episodes"]}
+    assert episodes[1]["status"] == EPISODE_FAILED
+    assert episodes[1]["attempts"] == 3
+    assert episodes[1]["error"] == "still broken"
+    assert episodes[2]["status"] == EPISODE_COMPLETED
+    assert episodes[2]["word_count"] == 1200
+    assert episodes[2]["is_valid"] is True
+    assert EPISODE_PENDING not in {item["status"] for item in episodes.values()}
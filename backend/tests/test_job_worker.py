@@ -0,0 +1,186 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+pytest.importorskip("loguru")
+pytest.importorskip("pydantic_settings")
+
+from services.executor import ExecutorBusyError
+from services.job_store import JOB_COMPLETED, JOB_RUNNING
+from services.job_worker import BatchJobWorker
+
+
+class FlakyStore:
+    def __init__(self, errors: int = 1):
+        self.errors = errors
+        self.jobs = ["job-1"]
+        self.claimed = []
+        self.released = []
+
+    async def claim_job(self, owner: str, lease_seconds: float, max_running: int):
+        if self.errors:
+            self.errors -= 1
+            raise sqlite3.OperationalError("database is locked")
+        if not self.jobs:
+            return None
+        job_id = self.jobs.pop(0)
+        self.claimed.append(job_id)
+        return job_id
+
+    async def get_job(self, job_id: str) -> dict:
+        return {"options": {}}
+
+    async def get_summary(self, job_id: str) -> dict:
+        return {"batch_id": job_id}
+
+    async def get_status(self, job_id: str) -> str:
+        return JOB_RUNNING
+
+    async def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        return True
+
+    async def next_episode(self, job_id: str) -> tuple:
+        return None, None
+
+    async def release(self, job_id: str, owner: str, status=None):
+        self.released.append((job_id, status))
+
+
+async def _run_until(worker: BatchJobWorker, condition, timeout: float = 2.0):
+    await worker.start()
+    try:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not condition() and loop.time() < deadline:
+            await asyncio.sleep(0.01)
+    finally:
+        await worker.stop()
+
+
+def test_worker_keeps_claiming_after_store_error():
+    store = FlakyStore(errors=1)
+    worker = BatchJobWorker(store, service=None, poll_interval=0.01)
+    
+    asyncio.run(_run_until(worker, lambda: store.released))
+    
+    assert store.errors == 0
+    assert store.claimed == ["job-1"]
+    assert store.released == [("job-1", JOB_COMPLETED)]
+
+
+class OneJobStore(FlakyStore):
+    def __init__(self, episodes: int = 2):
+        super().__init__(errors=0)
+        self.pending = list(range(1, episodes + 1))
+        self.completed = []
+        self.failed = []
+        self.lease_lost = False
+
+    async def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        return not self.lease_lost
+
+    async def next_episode(self, job_id: str) -> tuple:
+        if not self.pending:
+            return None, None
+        return self.pending[0], 0
+
+    async def complete_episode(self, job_id: str, episode: int, word_count: int, is_valid):
+        self.pending.remove(episode)
+        self.completed.append(episode)
+
+    async def fail_episode(self, job_id: str, episode: int, error: str, max_attempts: int, backoff: float) -> bool:
+        self.failed.append(episode)
+        return True
+
+
+class Result:
+    content = "剧本"
+    validation = None
+
+
+class BusyOnceService:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_single_result(self, episode: int, creativity_level: float, enable_validation: bool):
+        self.calls += 1
+        if self.calls == 1:
+            raise ExecutorBusyError("Generation queue is full")
+        return Result()
+
+
+class SlowService:
+    def __init__(self):
+        self.started = asyncio.Event()
+
+    async def generate_single_result(self, episode: int, creativity_level: float, enable_validation: bool):
+        self.started.set()
+        await asyncio.sleep(10)
+        return Result()
+
+
+def test_busy_executor_requeues_without_using_an_attempt():
+    store = OneJobStore(episodes=2)
+    worker = BatchJobWorker(store, BusyOnceService(), poll_interval=0.01)
+    
+    asyncio.run(_run_until(worker, lambda: store.released))
+    
+    assert store.failed == []
+    assert store.completed == [1, 2]
+    assert store.released == [("job-1", JOB_COMPLETED)]
+
+
+def test_heartbeat_stops_job_after_losing_the_lease():
+    store = OneJobStore(episodes=1)
+    service = SlowService()
+    worker = BatchJobWorker(store, service, lease_seconds=0.06, poll_interval=0.01)
+
+    async def scenario():
+        await worker.start()
+        try:
+            await asyncio.wait_for(service.started.wait(), timeout=1)
+            task = worker._tasks["job-1"]
+            store.lease_lost = True
+            await asyncio.wait_for(asyncio.gather(task, return_exceptions=True), timeout=1)
+            return task
+        finally:
+            await worker.stop()
+    
+    task = asyncio.run(scenario())
+    
+    assert task.cancelled()
+    assert store.completed == []
+
+
+class LockedCompleteStore(OneJobStore):
+    async def complete_episode(self, job_id: str, episode: int, word_count: int, is_valid):
+        raise sqlite3.OperationalError("database is locked")
+
+    async def fail_episode(self, job_id: str, episode: int, error: str, max_attempts: int, backoff: float) -> bool:
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_store_error_in_job_releases_the_lease():
+    store = LockedCompleteStore(episodes=1)
+    worker = BatchJobWorker(store, BusyOnceService(), poll_interval=0.01)
+    worker.service.calls = 1
+
+    async def scenario():
+        await worker.start()
+        try:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + 2
+            while not store.released and loop.time() < deadline:
+                await asyncio.sleep(0.01)
+            task = worker._tasks["job-1"]
+            await asyncio.wait_for(asyncio.gather(task, return_exceptions=True), timeout=1)
+            return task
+        finally:
+            await worker.stop()
+    
+    task = asyncio.run(scenario())
+    
+    assert task.exception() is None
+    assert store.released == [("job-1", None)]
+    assert store.completed == []
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("loguru")
+
+from services.job_store import (
+    AsyncJobStore,
+    CANCELLABLE,
+    EPISODE_COMPLETED,
+    EPISODE_FAILED,
+    JOB_CANCELLED,
+    SqliteJobStore
+)
+from services.progress import StoreProgressPoller
+
+
+def test_poller_publishes_changes_made_by_other_processes(tmp_path):
+    # A second store on the same file stands in for another uvicorn worker
+    other = SqliteJobStore(str(tmp_path / "jobs.db"))
+    store = AsyncJobStore(SqliteJobStore(str(tmp_path / "jobs.db")))
+    other.create_job("job-a", 1, 3, {})
+    other.create_job("job-b", 1, 3, {})
+    published = []
+    subscribed = ["job-a", "job-b"]
+    local = ["job-b"]
+    poller = StoreProgressPoller(
+        store,
+        lambda batch_id, message_type, summary, delta: published.append((batch_id, message_type, summary, delta)),
+        lambda: subscribed,
+        lambda: local
+    )
+
+    async def scenario():
+        await poller.poll()
+        assert published == []
+        
+        other.complete_episode("job-a", 1, 1500, True)
+        other.fail_episode("job-a", 2, "boom", 1, 0.0)
+        other.complete_episode("job-b", 1, 1500, True)
+        await poller.poll()
+        changes = list(published)
+        
+        published.clear()
+        await poller.poll()
+        unchanged = list(published)
+        
+        other.set_status("job-a", JOB_CANCELLED, CANCELLABLE)
+        await poller.poll()
+        return changes, unchanged
+    
+    changes, unchanged = asyncio.run(scenario())
+    
+    # job-b runs in this process: its worker publishes it directly
+    assert [(batch_id, message_type) for batch_id, message_type, _, _ in changes] == [
+        ("job-a", "progress"),
+        ("job-a", "progress")
+    ]
+    assert [delta for _, _, _, delta in changes] == [
+        {"episode": 1, "status": EPISODE_COMPLETED, "word_count": 1500, "is_valid": True},
+        {"episode": 2, "status": EPISODE_FAILED, "error": "boom"}
+    ]
+    assert changes[-1][2]["completed_episodes"] == 1
+    assert "episodes" not in changes[-1][2]
+    assert unchanged == []
+    assert published == [("job-a", JOB_CANCELLED, published[0][2], None)]
@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("psutil")
+pytest.importorskip("loguru")
+pytest.importorskip("pydantic_settings")
+
+from services.system_monitor import SystemSampler
+
+
+def test_sampler_warms_up_then_fills_ring_buffer():
+    sampler = SystemSampler(lambda: 3, interval=0.1, history_size=3)
+    
+    async def scenario():
+        await sampler.start()
+        try:
+            warming = sampler.latest()
+            await asyncio.sleep(0.65)
+            return warming, sampler.latest(), sampler.history(10)
+        finally:
+            await sampler.stop()
+    
+    warming, latest, history = asyncio.run(scenario())
+    
+    assert warming["warming_up"] and warming["cpu_usage"] is None
+    assert warming["active_tasks"] == 3
+    assert "warming_up" not in latest
+    assert latest["cpu_usage"] is not None
+    assert len(history) == 3
+    assert history[-1] is latest
+    assert [sample["timestamp"] for sample in history] == sorted(sample["timestamp"] for sample in history)
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("loguru")
+pytest.importorskip("pydantic_settings")
+
+from main import app
+from api import scripts
+from services.connection_manager import SLOW_CONSUMER_DISCONNECT, SLOW_CONSUMER_SNAPSHOT
+from services.job_worker import job_store
+
+FAST_CLIENTS = 3000
+SLOW_CLIENTS = 10
+EVENTS = 40
+EVENT_INTERVAL = 0.05
+COALESCE_WINDOW = 0.1
+SLOW_SEND_DELAY = 1.0
+# Generous bounds so a loaded CI runner does not flake: on one core a broadcast
+# to 3000 clients takes ~10ms (under 0.2s with a GC pause), p99 latency ~0.4s
+MAX_BROADCAST_SECONDS = 0.5
+MAX_P99_LATENCY = COALESCE_WINDOW + 2.0
+
+
+# A websocket client speaking ASGI directly to the app, in-process
+class SimulatedClient:
+    def __init__(self, batch_id: str, send_delay: float = 0.0):
+        self.scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "path": f"/api/scripts/progress/ws/{batch_id}",
+            "raw_path": f"/api/scripts/progress/ws/{batch_id}".encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [],
+            "subprotocols": [],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80)
+        }
+        self.send_delay = send_delay
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.incoming.put_nowait({"type": "websocket.connect"})
+        self.frames = []
+        self.close_code = None
+        self.task = None
+
+    async def receive(self) -> dict:
+        return await self.incoming.get()
+
+    async def send(self, message: dict):
+        if message["type"] == "websocket.send":
+            if self.send_delay:
+                await asyncio.sleep(self.send_delay)
+            self.frames.append((time.perf_counter(), json.loads(message["text"])))
+        elif message["type"] == "websocket.close":
+            self.close_code = message.get("code", 1000)
+
+    def start(self):
+        self.task = asyncio.create_task(app(self.scope, self.receive, self.send))
+
+    async def disconnect(self):
+        self.incoming.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(asyncio.gather(self.task, return_exceptions=True), timeout=5)
+
+    def progress_frames(self) -> list:
+        return [(received_at, frame) for received_at, frame in self.frames if frame["type"] == "progress"]
+
+    def snapshot_count(self) -> int:
+        return sum(1 for _, frame in self.frames if frame["type"] == "snapshot")
+
+
+async def _wait_for(condition, timeout: float):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        if loop.time() > deadline:
+            raise AssertionError("timed out waiting for websocket clients")
+        await asyncio.sleep(0.02)
+
+
+def _received_episodes(client: SimulatedClient) -> list:
+    return sorted(
+        delta["episode"]
+        for _, frame in client.progress_frames()
+        for delta in frame["data"]["episodes"]
+    )
+
+
+async def _run_load(batch_id: str) -> tuple:
+    await job_store.create_job(batch_id, 1, EVENTS, {})
+    fast = [SimulatedClient(batch_id) for _ in range(FAST_CLIENTS)]
+    slow = [SimulatedClient(batch_id, SLOW_SEND_DELAY) for _ in range(SLOW_CLIENTS)]
+    for client in fast + slow:
+        client.start()
+    # Every client gets a snapshot on connect
+    await _wait_for(lambda: all(client.frames for client in fast), timeout=60)
+    
+    # Time the fan-out the coalescer triggers when it flushes a frame
+    broadcast_times = []
+    broadcast = scripts.progress_coalescer.send
+
+    async def timed_broadcast(target: str, message: dict):
+        started = time.perf_counter()
+        await broadcast(target, message)
+        broadcast_times.append(time.perf_counter() - started)
+    
+    scripts.progress_coalescer.send = timed_broadcast
+    frames_before = scripts.progress_coalescer.frames_out
+    # Events go through the same path as the job worker's listener: the
+    # coalescer merges them per window, then broadcasts one frame per batch
+    published_at = {}
+    try:
+        for seq in range(EVENTS):
+            published_at[seq] = time.perf_counter()
+            await scripts._publish_progress(
+                batch_id,
+                "progress",
+                {"batch_id": batch_id, "seq": seq, "completed_episodes": seq + 1},
+                {"episode": seq + 1, "status": "completed", "word_count": 1000, "is_valid": True}
+            )
+            await asyncio.sleep(EVENT_INTERVAL)
+        await _wait_for(lambda: all(len(_received_episodes(client)) == EVENTS for client in fast), timeout=30)
+    finally:
+        scripts.progress_coalescer.send = broadcast
+    
+    frames = scripts.progress_coalescer.frames_out - frames_before
+    # A frame carries the summary of the newest event merged into it
+    latencies = sorted(
+        received_at - published_at[frame["data"]["seq"]]
+        for client in fast
+        for received_at, frame in client.progress_frames()
+    )
+    metrics = scripts.manager.metrics()
+    for client in fast + slow:
+        await client.disconnect()
+    return fast, slow, frames, broadcast_times, latencies, metrics
+
+
+@pytest.mark.parametrize("policy", [SLOW_CONSUMER_SNAPSHOT, SLOW_CONSUMER_DISCONNECT])
+def test_broadcast_to_many_websocket_clients(policy, monkeypatch):
+    monkeypatch.setattr(scripts.manager, "slow_consumer_policy", policy)
+    monkeypatch.setattr(scripts.manager, "queue_size", 8)
+    monkeypatch.setattr(scripts.manager, "send_timeout", 2.0)
+    monkeypatch.setattr(scripts.progress_coalescer, "window", COALESCE_WINDOW)
+    
+    fast, slow, frames, broadcast_times, latencies, metrics = asyncio.run(_run_load(f"load_{policy}"))
+    
+    # Coalescing merged the events into fewer frames than events
+    assert 1 < frames < EVENTS
+    assert len(broadcast_times) == frames
+    # Broadcast only enqueues: slow subscribers never hold it up
+    assert max(broadcast_times) < MAX_BROADCAST_SECONDS
+    # Fast clients get every frame, in order, and every episode exactly once
+    for client in fast:
+        seqs = [frame["data"]["seq"] for _, frame in client.progress_frames()]
+        assert len(seqs) == frames
+        assert seqs == sorted(seqs) and seqs[-1] == EVENTS - 1
+        assert _received_episodes(client) == list(range(1, EVENTS + 1))
+        assert client.close_code is None
+    assert latencies[int(len(latencies) * 0.99)] < MAX_P99_LATENCY
+    
+    if policy == SLOW_CONSUMER_SNAPSHOT:
+        # Slow clients stay connected; their backlog is replaced by a fresh snapshot
+        for client in slow:
+            assert client.close_code is None
+            assert client.snapshot_count() >= 2
+            assert len(client.progress_frames()) < frames
+        assert metrics["snapshots_sent"] >= FAST_CLIENTS + 2 * SLOW_CLIENTS
+    else:
+        for client in slow:
+            assert client.close_code == 1013
+        assert metrics["evicted"] >= SLOW_CLIENTS
+    assert metrics["clients"] == FAST_CLIENTS + (SLOW_CLIENTS if policy == SLOW_CONSUMER_SNAPSHOT else 0)
@@ -8,10 +8,39 @@ data模块
 - 存储解析后的数据
 - 提供数据访问接口
 - 确保数据一致性
+- 缓存文档解析结果
+- 人物、场景、剧情大纲的紧凑记录类型
+- 人物、场景别名索引
+- 状态跟踪器的状态存储和每集状态检查点
+- 剧本构建清单（增量生成）
+- 剧本文件写入（跳过未变化的内容、原子替换）
 """
 
 from .data_manager import DataManager
+from .corpus_cache import CorpusCache
+from .alias_index import AliasIndex
+from .state_store import JsonStateStore, SqliteStateStore, create_state_store
+from .state_checkpoint import StateCheckpoint, CheckpointStore
+from .build_manifest import BuildManifest, DependencyRecorder
+from .script_writer import ScriptWriter
+from .records import Record, CharacterStage, Character, Scene, EventLogic, EpisodeOutline
 
 __all__ = [
-    "DataManager"
+    "DataManager",
+    "CorpusCache",
+    "AliasIndex",
+    "JsonStateStore",
+    "SqliteStateStore",
+    "create_state_store",
+    "StateCheckpoint",
+    "CheckpointStore",
+    "BuildManifest",
+    "DependencyRecorder",
+    "ScriptWriter",
+    "Record",
+    "CharacterStage",
+    "Character",
+    "Scene",
+    "EventLogic",
+    "EpisodeOutline"
 ]
@@ -0,0 +1,185 @@
+# 别名索引
+# 根据人物、场景文档生成人物别名和场景关键词索引，用于在大纲文本中识别人物和场景
+
+import re
+
+from utils.keyword_matcher import KeywordMatcher
+
+# 人物名称中分隔本名与称号的符号（如「镇北王-陆无敌」）
+NAME_SEPARATOR_PATTERN = re.compile(r'[-－—]+')
+
+# 场景名称中分隔地点层级的符号（如「镇北王府·世子寝殿」，文档中也使用「・」）
+LOCATION_SEPARATOR_PATTERN = re.compile(r'[·・•]')
+
+# 标准场景名使用的分隔符
+LOCATION_SEPARATOR = '·'
+
+# 别名最短长度（单字别名误判太多）
+MIN_ALIAS_LENGTH = 2
+
+# 文档中无法推导的常用称呼，优先于文档生成的别名
+DEFAULT_CHARACTER_ALIASES = {
+    "陆长乐": ["陆长乐", "二姐", "姐姐"],
+    "镇北王": ["镇北王", "父王", "陆无敌"],
+    "太子": ["太子", "朱峰"],
+    "皇后": ["皇后", "苏云纤"],
+    "百晓通": ["百晓通", "百晓堂"],
+    "六剑奴": ["六剑奴", "剑奴"],
+    "李梦邪": ["李梦邪", "七杀楼"],
+    "陈蒹葭": ["陈蒹葭", "蒹葭"],
+    "白泽": ["白泽", "神兽"],
+    "蒙面女子": ["蒙面女子"]
+}
+
+DEFAULT_SCENE_ALIASES = {
+    "镇北王府·世子寝殿": ["寝殿", "世子寝殿", "房间", "王府"],
+    "镇北王府·正厅": ["正厅", "大厅"],
+    "镇北王府·后花园": ["后花园", "花园"],
+    "长安·醉仙楼": ["醉仙楼", "酒楼"],
+    "长安·百晓堂": ["百晓堂", "情报堂"],
+    "长安·街道": ["街道", "长安"],
+    "皇宫": ["皇宫", "宫廷"],
+    "皇宫·御书房": ["御书房"],
+    "北荒·边境": ["北荒", "边境"],
+    "皇家狩猎场": ["狩猎场", "狩猎"]
+}
+
+
+class AliasIndex:
+    """
+    别名索引
+    
+    保存人物标准名到别名列表、场景标准名到关键词列表的映射。
+    匹配器在第一次查询时构建，之后每次查询只扫描文本一遍，
+    耗时与人物、场景数量无关。
+    """
+    
+    def __init__(self, character_aliases=None, scene_aliases=None):
+        """
+        初始化别名索引
+        
+        Args:
+            character_aliases (dict, optional): 人物标准名到别名列表的映射
+            scene_aliases (dict, optional): 场景标准名到关键词列表的映射
+        """
+        self.character_aliases = character_aliases if character_aliases is not None else DEFAULT_CHARACTER_ALIASES
+        self.scene_aliases = scene_aliases if scene_aliases is not None else DEFAULT_SCENE_ALIASES
+        self._character_matcher = None
+        self._scene_matcher = None
+    
+    def __getstate__(self):
+        # 缓存中只保存别名表，匹配器在加载后按需重建
+        return {
+            "character_aliases": self.character_aliases,
+            "scene_aliases": self.scene_aliases
+        }
+    
+    def __setstate__(self, state):
+        self.__init__(state["character_aliases"], state["scene_aliases"])
+    
+    @classmethod
+    def build(cls, characters, scenes):
+        """
+        根据解析后的人物、场景数据生成别名索引
+        
+        人物别名包括完整名称、按「-」拆分的本名和称号、各阶段身份；
+        场景关键词包括完整名称（两种分隔符）和按「·」拆分的末级地点。
+        同一别名对应多个人物（或场景）时视为有歧义而丢弃，
+        默认称呼表中的别名始终保留。
+        
+        Args:
+            characters (dict): 人物数据
+            scenes (dict): 场景数据
+            
+        Returns:
+            AliasIndex: 别名索引
+        """
+        character_candidates = {}
+        for name, character in characters.items():
+            parts = [part for part in NAME_SEPARATOR_PATTERN.split(name) if part]
+            canonical = parts[0] if parts else name
+            aliases = [canonical, name] + parts[1:]
+            for stage in character.get("stages", {}).values():
+                aliases.append(stage.get("identity", ""))
+            character_candidates[canonical] = aliases
+        
+        scene_candidates = {}
+        for name in scenes:
+            segments = [segment.strip() for segment in LOCATION_SEPARATOR_PATTERN.split(name) if segment.strip()]
+            canonical = LOCATION_SEPARATOR.join(segments) if segments else name
+            aliases = [canonical, name]
+            if len(segments) > 1:
+                aliases.append(segments[-1])
+            scene_candidates[canonical] = aliases
+        
+        return cls(
+            _merge_aliases(DEFAULT_CHARACTER_ALIASES, character_candidates),
+            _merge_aliases(DEFAULT_SCENE_ALIASES, scene_candidates)
+        )
+    
+    def find_characters(self, text):
+        """
+        找出文本中出现的人物（标准名），按首次出现顺序排列
+        
+        重叠的别名只取最长的一个（如「镇北王世子」不会同时识别出「镇北王」）。
+        
+        Args:
+            text (str): 文本
+            
+        Returns:
+            list: 人物标准名列表
+        """
+        if self._character_matcher is None:
+            self._character_matcher = KeywordMatcher(self.character_aliases)
+        return self._character_matcher.find_values(text, longest=True)
+    
+    def find_scenes(self, text):
+        """
+        找出文本中出现的场景（标准名），按首次出现顺序排列
+        
+        Args:
+            text (str): 文本
+            
+        Returns:
+            list: 场景标准名列表
+        """
+        if self._scene_matcher is None:
+            self._scene_matcher = KeywordMatcher(self.scene_aliases)
+        return self._scene_matcher.find_values(text, longest=True)
+
+
+def _merge_aliases(defaults, candidates):
+    """
+    合并默认称呼表和文档生成的别名，丢弃有歧义的别名
+    
+    Args:
+        defaults (dict): 默认称呼表
+        candidates (dict): 文档生成的候选别名
+        
+    Returns:
+        dict: 标准名到别名列表的映射
+    """
+    owners = {}
+    for canonical, aliases in candidates.items():
+        for alias in aliases:
+            owners.setdefault(alias, set()).add(canonical)
+    
+    # 默认称呼表中的别名及其对应的标准名（如「苏云纤」对应「皇后」）
+    reserved = {}
+    for canonical, aliases in defaults.items():
+        for alias in aliases:
+            reserved.setdefault(alias, canonical)
+    merged = {canonical: list(aliases) for canonical, aliases in defaults.items()}
+    
+    for canonical, aliases in candidates.items():
+        # 文档中的名称已是默认称呼表中某人物（或场景）的别名时，归入该标准名
+        result = merged.setdefault(reserved.get(canonical, canonical), [])
+        for alias in aliases:
+            if len(alias) < MIN_ALIAS_LENGTH or alias in reserved or alias in result:
+                continue
+            # 有歧义的别名只保留给与之同名的人物（或场景）
+            if len(owners[alias]) > 1 and alias != canonical:
+                continue
+            result.append(alias)
+    
+    return merged
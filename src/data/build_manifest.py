@@ -0,0 +1,314 @@
+# 构建清单
+# 记录每集剧本生成时用到的人物、场景、设定条目和大纲字段及其内容哈希，
+# 增量生成时只重新生成输入有变化的剧集
+
+import hashlib
+import json
+import os
+from collections.abc import Mapping
+
+# 清单格式版本，格式变化时旧清单全部失效
+MANIFEST_VERSION = 1
+
+# 依赖类型
+DEP_CHARACTER = "character"  # 人物，名称为人物名
+DEP_SCENE = "scene"          # 场景，名称为场景名
+DEP_SETTING = "setting"      # 设定条目，名称为设定键
+DEP_OUTLINE = "outline"      # 大纲字段，名称为「集数.字段」
+DEP_ALIASES = "aliases"      # 人物、场景别名索引，名称为空
+
+# 依赖整个数据集合（遍历或取长度）时使用的名称
+ALL_ENTRIES = "*"
+
+
+def _to_plain(value):
+    """将记录、元组等转换为可JSON序列化的普通值"""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if isinstance(value, Mapping):
+        return {str(key): _to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_plain(item) for item in value]
+    return value
+
+
+def content_hash(value):
+    """
+    计算值的内容哈希
+    
+    Args:
+        value: 任意可转换为JSON的值（记录、字典、列表、字符串等）
+        
+    Returns:
+        str: 哈希值，值为None时返回None
+    """
+    if value is None:
+        return None
+    text = json.dumps(_to_plain(value), ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def text_hash(text):
+    """
+    计算文本的内容哈希
+    
+    Args:
+        text (str): 文本
+        
+    Returns:
+        str: 哈希值
+    """
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def code_fingerprint(source_dir=None):
+    """
+    计算生成代码的指纹（src 下所有 .py 文件内容的哈希），代码变化时所有剧集失效
+    
+    Args:
+        source_dir (str, optional): 源代码目录，默认为 src
+        
+    Returns:
+        str: 指纹
+    """
+    if source_dir is None:
+        source_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = hashlib.sha1()
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for filename in sorted(files):
+            if not filename.endswith(".py"):
+                continue
+            path = os.path.join(root, filename)
+            digest.update(os.path.relpath(path, source_dir).encode('utf-8'))
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def dependency_key(kind, name=""):
+    """
+    依赖键
+    
+    Args:
+        kind (str): 依赖类型
+        name (str): 名称
+        
+    Returns:
+        str: 「类型:名称」
+    """
+    return f"{kind}:{name}"
+
+
+class DependencyRecorder:
+    """
+    依赖记录器
+    
+    生成剧本期间挂到 DataManager 上（只对当前线程生效），记录生成器读取过的人物、场景、设定条目和大纲字段
+    （包括查询了但不存在的条目：之后新增该条目也会影响生成结果）。
+    """
+    
+    def __init__(self):
+        # 依赖键 -> 读取到的值
+        self.values = {}
+    
+    def record(self, kind, name, value):
+        """
+        记录一次读取
+        
+        Args:
+            kind (str): 依赖类型
+            name (str): 名称
+            value: 读取到的值（不存在时为None）
+        """
+        self.values.setdefault(dependency_key(kind, name), value)
+    
+    def wrap(self, kind, mapping, prefix=""):
+        """
+        包装数据集合，读取其中的条目时自动记录
+        
+        Args:
+            kind (str): 依赖类型
+            mapping (Mapping): 数据集合
+            prefix (str): 名称前缀（大纲字段为「集数.」）
+            
+        Returns:
+            RecordingMapping: 记录读取的只读映射
+        """
+        return RecordingMapping(self, kind, mapping, prefix)
+    
+    def hashes(self):
+        """
+        计算各依赖的内容哈希
+        
+        Returns:
+            dict: 依赖键 -> 哈希值（条目不存在时为None）
+        """
+        return {key: content_hash(value) for key, value in self.values.items()}
+
+
+class RecordingMapping(Mapping):
+    """
+    记录读取的只读映射
+    
+    按键读取、判断是否存在时记录该条目；遍历或取长度时记录整个集合。
+    """
+    
+    def __init__(self, recorder, kind, mapping, prefix=""):
+        self._recorder = recorder
+        self._kind = kind
+        self._mapping = mapping
+        self._prefix = prefix
+    
+    def _record(self, key):
+        self._recorder.record(self._kind, f"{self._prefix}{key}", self._mapping.get(key))
+    
+    def __getitem__(self, key):
+        self._record(key)
+        return self._mapping[key]
+    
+    def __contains__(self, key):
+        self._record(key)
+        return key in self._mapping
+    
+    def __iter__(self):
+        self._recorder.record(self._kind, f"{self._prefix}{ALL_ENTRIES}", self._mapping)
+        return iter(self._mapping)
+    
+    def __len__(self):
+        self._recorder.record(self._kind, f"{self._prefix}{ALL_ENTRIES}", self._mapping)
+        return len(self._mapping)
+
+
+class BuildManifest:
+    """
+    构建清单
+    
+    按集数记录生成结果的哈希、生成代码的指纹，以及各依赖的内容哈希。
+    某集的依赖、代码指纹均未变化，且输出文件仍是上次生成的内容时，该集无需重新生成。
+    输出文件是否仍是某个内容由剧本文件写入器（ScriptWriter 的哈希清单）判断，
+    清单只记录生成结果的哈希，不再单独读取、校验文件。
+    """
+    
+    def __init__(self, manifest_file="data/build_manifest.json"):
+        """
+        初始化构建清单
+        
+        Args:
+            manifest_file (str): 清单文件路径
+        """
+        self.manifest_file = manifest_file
+        self.episodes = {}
+        self.dirty = False
+        # 本次运行中已计算的当前依赖哈希（解析结果在一次运行中不变）
+        self._current_hashes = {}
+        self._load()
+    
+    def _load(self):
+        """加载清单文件，格式版本不一致时丢弃"""
+        if not os.path.exists(self.manifest_file):
+            return
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get("version") == MANIFEST_VERSION:
+                self.episodes = manifest.get("episodes", {})
+        except Exception as e:
+            print(f"加载构建清单失败: {e}")
+            self.episodes = {}
+    
+    def save(self):
+        """保存清单文件（仅在有更新时写入，先写临时文件再替换）"""
+        if not self.dirty:
+            return
+        try:
+            manifest_dir = os.path.dirname(self.manifest_file)
+            if manifest_dir:
+                os.makedirs(manifest_dir, exist_ok=True)
+            temp_file = f"{self.manifest_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "version": MANIFEST_VERSION,
+                    "episodes": self.episodes
+                }, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(temp_file, self.manifest_file)
+            self.dirty = False
+        except Exception as e:
+            print(f"保存构建清单失败: {e}")
+    
+    def record(self, episode, dependencies, content, code):
+        """
+        记录一集的生成结果
+        
+        Args:
+            episode (int): 集数
+            dependencies (dict): 依赖键 -> 哈希值
+            content (str): 剧本内容
+            code (str): 生成代码指纹
+        """
+        self.episodes[str(episode)] = {
+            "output": text_hash(content),
+            "code": code,
+            "dependencies": dependencies
+        }
+        self.dirty = True
+    
+    def stale_reason(self, episode, data_manager, code, output_unchanged):
+        """
+        判断一集是否需要重新生成
+        
+        Args:
+            episode (int): 集数
+            data_manager (DataManager): 数据管理器（当前的解析结果）
+            code (str): 当前生成代码指纹
+            output_unchanged (callable): 参数为内容哈希，判断剧本文件是否仍是该内容
+                （如 ScriptWriter.is_unchanged）
+            
+        Returns:
+            str: 需要重新生成的原因，无需重新生成时返回None
+        """
+        entry = self.episodes.get(str(episode))
+        if entry is None:
+            return "没有构建记录"
+        if entry.get("code") != code:
+            return "生成代码有变化"
+        if not output_unchanged(entry.get("output")):
+            return "剧本文件不存在或被修改"
+        
+        for key, recorded_hash in entry.get("dependencies", {}).items():
+            if key not in self._current_hashes:
+                self._current_hashes[key] = content_hash(resolve_dependency(data_manager, key))
+            if self._current_hashes[key] != recorded_hash:
+                return f"依赖有变化：{key}"
+        return None
+
+
+def resolve_dependency(data_manager, key):
+    """
+    按依赖键从当前数据中取值
+    
+    Args:
+        data_manager (DataManager): 数据管理器
+        key (str): 依赖键
+        
+    Returns:
+        当前的值，不存在时返回None
+    """
+    kind, _, name = key.partition(":")
+    data = data_manager.data
+    if kind == DEP_CHARACTER:
+        return data["characters"] if name == ALL_ENTRIES else data["characters"].get(name)
+    if kind == DEP_SCENE:
+        return data["scenes"] if name == ALL_ENTRIES else data["scenes"].get(name)
+    if kind == DEP_SETTING:
+        return data["settings"] if name == ALL_ENTRIES else data["settings"].get(name)
+    if kind == DEP_OUTLINE:
+        episode, _, field = name.partition(".")
+        outline = data["outlines"].get(int(episode))
+        if outline is None or field == ALL_ENTRIES:
+            return outline
+        return outline.get(field)
+    if kind == DEP_ALIASES:
+        alias_index = data_manager.get_alias_index()
+        return {"characters": alias_index.character_aliases, "scenes": alias_index.scene_aliases}
+    return None
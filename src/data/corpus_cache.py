@@ -0,0 +1,134 @@
+# 解析结果缓存
+# 负责将文档解析结果持久化到磁盘，源文档未变化时跳过重新解析
+
+import hashlib
+import os
+import pickle
+
+
+class CorpusCache:
+    """
+    解析结果缓存类
+    
+    按缓存项（人物、场景、剧情大纲、设定）保存解析结果，并记录每个源文件的
+    路径、大小、修改时间和内容哈希。读取时先比较大小和修改时间，不一致再比较
+    内容哈希；任一源文件变化或增删时缓存项失效。解析器代码由调用方作为源文件
+    一并传入，代码变化时缓存项同样失效。
+    """
+    
+    def __init__(self, cache_file="data/corpus_cache.pkl"):
+        """
+        初始化解析结果缓存
+        
+        Args:
+            cache_file (str): 缓存文件路径
+        """
+        self.cache_file = cache_file
+        self.entries = {}
+        self.dirty = False
+        self._load()
+    
+    def _load(self):
+        """加载缓存文件"""
+        if not os.path.exists(self.cache_file):
+            return
+        
+        try:
+            with open(self.cache_file, 'rb') as f:
+                cache = pickle.load(f)
+            self.entries = cache.get("entries", {})
+        except Exception as e:
+            print(f"加载解析缓存失败: {e}")
+            self.entries = {}
+    
+    def save(self):
+        """保存缓存文件（仅在有更新时写入，先写临时文件再替换）"""
+        if not self.dirty:
+            return
+        
+        try:
+            cache_dir = os.path.dirname(self.cache_file)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            temp_file = f"{self.cache_file}.tmp"
+            with open(temp_file, 'wb') as f:
+                pickle.dump({
+                    "entries": self.entries
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file, self.cache_file)
+            self.dirty = False
+        except Exception as e:
+            print(f"保存解析缓存失败: {e}")
+    
+    def get(self, name, source_files):
+        """
+        获取缓存的解析结果
+        
+        Args:
+            name (str): 缓存项名称
+            source_files (list): 源文件路径列表
+            
+        Returns:
+            缓存的解析结果，缓存不存在或已失效时返回None
+        """
+        entry = self.entries.get(name)
+        if not entry:
+            return None
+        
+        sources = entry["sources"]
+        if set(sources) != set(source_files):
+            return None
+        
+        for file_path in source_files:
+            fingerprint = sources[file_path]
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                return None
+            
+            if stat.st_size != fingerprint["size"]:
+                return None
+            if stat.st_mtime_ns != fingerprint["mtime_ns"]:
+                # 修改时间变化但内容未变时，更新指纹后继续使用缓存
+                if self._hash_file(file_path) != fingerprint["sha256"]:
+                    return None
+                fingerprint["mtime_ns"] = stat.st_mtime_ns
+                self.dirty = True
+        
+        return entry["data"]
+    
+    def put(self, name, source_files, data):
+        """
+        保存解析结果
+        
+        Args:
+            name (str): 缓存项名称
+            source_files (list): 源文件路径列表
+            data: 解析结果
+        """
+        sources = {}
+        for file_path in source_files:
+            stat = os.stat(file_path)
+            sources[file_path] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": self._hash_file(file_path)
+            }
+        
+        self.entries[name] = {
+            "sources": sources,
+            "data": data
+        }
+        self.dirty = True
+    
+    def clear(self):
+        """
+        清空缓存
+        """
+        self.entries = {}
+        self.dirty = True
+    
+    def _hash_file(self, file_path):
+        """计算文件内容哈希"""
+        with open(file_path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
@@ -1,6 +1,12 @@
 # 数据管理模块
 # 负责管理解析后的数据，提供数据访问接口，确保数据一致性
 
+import threading
+
+from .records import Character, Scene, EpisodeOutline
+from .alias_index import AliasIndex
+from .build_manifest import DEP_CHARACTER, DEP_SCENE, DEP_SETTING, DEP_OUTLINE, DEP_ALIASES, ALL_ENTRIES
+
 class DataManager:
     """
     数据管理类
@@ -20,17 +26,49 @@ class DataManager:
             "scenes": {},      # 场景数据
             "outlines": {},    # 剧情大纲数据
             "settings": {},    # 设定数据
-            "episodes": {}     # 剧集数据
+            "episodes": {},    # 剧集数据
+            "aliases": None    # 人物、场景别名索引
         }
+        # 生成剧本期间记录读取过哪些数据（增量生成用），按线程分别保存：
+        # 后端多个生成线程共用同一个数据管理器，各线程只记录自己读取的数据
+        self._local = threading.local()
+    
+    def __getstate__(self):
+        # 传给子进程时只传数据，依赖记录器属于当前线程
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+    
+    @property
+    def recorder(self):
+        """当前线程的依赖记录器，不记录时为None"""
+        return getattr(self._local, "recorder", None)
+    
+    def set_recorder(self, recorder):
+        """
+        设置当前线程的依赖记录器，之后本线程读取人物、场景、设定、大纲时记录读取的条目
+        
+        Args:
+            recorder (DependencyRecorder): 依赖记录器，None为停止记录
+        """
+        self._local.recorder = recorder
     
     def set_characters(self, characters):
         """
         设置人物数据
         
         Args:
-            characters (dict): 人物数据
+            characters (dict): 人物数据（值为字典或 Character 记录，统一保存为 Character 记录）
         """
-        self.data["characters"] = characters
+        self.data["characters"] = {
+            name: Character.from_dict(character) for name, character in characters.items()
+        }
+        # 人物变化后别名索引需要重新生成
+        self.data["aliases"] = None
     
     def get_characters(self):
         """
@@ -39,6 +77,9 @@ class DataManager:
         Returns:
             dict: 人物数据
         """
+        recorder = self.recorder
+        if recorder is not None:
+            return recorder.wrap(DEP_CHARACTER, self.data["characters"])
         return self.data["characters"]
     
     def get_character(self, name):
@@ -49,18 +90,26 @@ class DataManager:
             name (str): 人物名称
             
         Returns:
-            dict: 人物数据或None
+            Character: 人物数据或None
         """
-        return self.data["characters"].get(name)
+        character = self.data["characters"].get(name)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(DEP_CHARACTER, name, character)
+        return character
     
     def set_scenes(self, scenes):
         """
         设置场景数据
         
         Args:
-            scenes (dict): 场景数据
+            scenes (dict): 场景数据（值为字典或 Scene 记录，统一保存为 Scene 记录）
         """
-        self.data["scenes"] = scenes
+        self.data["scenes"] = {
+            name: Scene.from_dict(scene) for name, scene in scenes.items()
+        }
+        # 场景变化后别名索引需要重新生成
+        self.data["aliases"] = None
     
     def get_scenes(self):
         """
@@ -69,6 +118,9 @@ class DataManager:
         Returns:
             dict: 场景数据
         """
+        recorder = self.recorder
+        if recorder is not None:
+            return recorder.wrap(DEP_SCENE, self.data["scenes"])
         return self.data["scenes"]
     
     def get_scene(self, name):
@@ -79,18 +131,51 @@ class DataManager:
             name (str): 场景名称
             
         Returns:
-            dict: 场景数据或None
+            Scene: 场景数据或None
         """
-        return self.data["scenes"].get(name)
+        scene = self.data["scenes"].get(name)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(DEP_SCENE, name, scene)
+        return scene
+    
+    def set_alias_index(self, alias_index):
+        """
+        设置别名索引
+        
+        Args:
+            alias_index (AliasIndex): 人物、场景别名索引
+        """
+        self.data["aliases"] = alias_index
+    
+    def get_alias_index(self):
+        """
+        获取别名索引（未设置时根据当前人物、场景数据生成）
+        
+        Returns:
+            AliasIndex: 人物、场景别名索引
+        """
+        if self.data["aliases"] is None:
+            self.data["aliases"] = AliasIndex.build(self.data["characters"], self.data["scenes"])
+        alias_index = self.data["aliases"]
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(DEP_ALIASES, "", {
+                "characters": alias_index.character_aliases,
+                "scenes": alias_index.scene_aliases
+            })
+        return alias_index
     
     def set_outlines(self, outlines):
         """
         设置剧情大纲数据
         
         Args:
-            outlines (dict): 剧情大纲数据
+            outlines (dict): 剧情大纲数据（值为字典或 EpisodeOutline 记录，统一保存为 EpisodeOutline 记录）
         """
-        self.data["outlines"] = outlines
+        self.data["outlines"] = {
+            episode: EpisodeOutline.from_dict(outline) for episode, outline in outlines.items()
+        }
     
     def get_outlines(self):
         """
@@ -109,9 +194,17 @@ class DataManager:
             episode (int): 集数
             
         Returns:
-            dict: 剧情大纲数据或None
-        """
-        return self.data["outlines"].get(episode)
+            EpisodeOutline: 剧情大纲数据或None
+        """
+        outline = self.data["outlines"].get(episode)
+        recorder = self.recorder
+        if recorder is not None:
+            if outline is None:
+                recorder.record(DEP_OUTLINE, f"{episode}.{ALL_ENTRIES}", None)
+            else:
+                # 按字段记录，只改动生成器未用到的字段不会使该集失效
+                return recorder.wrap(DEP_OUTLINE, outline, f"{episode}.")
+        return outline
     
     def set_settings(self, settings):
         """
@@ -129,6 +222,9 @@ class DataManager:
         Returns:
             dict: 设定数据
         """
+        recorder = self.recorder
+        if recorder is not None:
+            return recorder.wrap(DEP_SETTING, self.data["settings"])
         return self.data["settings"]
     
     def get_setting(self, key):
@@ -141,7 +237,11 @@ class DataManager:
         Returns:
             设定值或None
         """
-        return self.data["settings"].get(key)
+        value = self.data["settings"].get(key)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(DEP_SETTING, key, value)
+        return value
     
     def set_episode(self, episode, data):
         """
@@ -183,7 +283,8 @@ class DataManager:
             "scenes": {},
             "outlines": {},
             "settings": {},
-            "episodes": {}
+            "episodes": {},
+            "aliases": None
         }
     
     def validate_consistency(self):
@@ -0,0 +1,192 @@
+# 数据记录类型
+# 定义人物、场景、剧情大纲的紧凑记录类型，替代嵌套字典以降低内存占用
+
+import sys
+from collections.abc import Mapping
+
+
+def _intern(value):
+    """
+    驻留重复出现的短字符串（人物名、类别、阶段名等），相同内容只保留一份
+    
+    Args:
+        value: 任意值
+        
+    Returns:
+        字符串返回驻留后的对象，其他值原样返回
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Record(Mapping):
+    """
+    记录基类
+    
+    子类通过 __slots__ 声明字段，不再为每个实例分配 __dict__。
+    同时实现只读映射接口（record["name"]、record.get("name")、"name" in record、
+    keys()/items()/values()），原先按字典访问解析结果的代码无需修改。
+    解析结果中未声明的字段保存在 extra 中，同样可以按键访问，不会被丢弃。
+    """
+    
+    __slots__ = ("extra",)
+    
+    def _extra(self):
+        """未声明字段的字典，没有时返回空字典"""
+        return getattr(self, "extra", None) or {}
+    
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            return getattr(self, key)
+        extra = self._extra()
+        if key in extra:
+            return extra[key]
+        raise KeyError(key)
+    
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def __contains__(self, key):
+        return key in self.__slots__ or key in self._extra()
+    
+    def __iter__(self):
+        yield from self.__slots__
+        yield from self._extra()
+    
+    def __len__(self):
+        return len(self.__slots__) + len(self._extra())
+    
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        extra = self._extra()
+        if extra:
+            fields += f", extra={extra!r}"
+        return f"{type(self).__name__}({fields})"
+    
+    def to_dict(self):
+        """
+        转换为普通字典（嵌套记录一并转换，元组转换为列表），用于JSON序列化
+        
+        Returns:
+            dict: 字典形式的记录，包含未声明的字段
+        """
+        data = {name: _to_plain(getattr(self, name)) for name in self.__slots__}
+        for key, value in self._extra().items():
+            data[key] = _to_plain(value)
+        return data
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        从解析器输出的字典创建记录，已经是记录时原样返回
+        
+        未在 __slots__ 中声明的字段保存到 extra，to_dict() 时原样输出
+        
+        Args:
+            data (dict): 字典形式的数据
+            
+        Returns:
+            Record: 记录
+        """
+        if isinstance(data, cls):
+            return data
+        record = cls(**{name: data[name] for name in cls.__slots__ if name in data})
+        extra = {key: value for key, value in data.items() if key not in cls.__slots__}
+        if extra:
+            record.extra = extra
+        return record
+
+
+def _to_plain(value):
+    """将记录、元组递归转换为字典、列表"""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: _to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_plain(item) for item in value]
+    return value
+
+
+class CharacterStage(Record):
+    """
+    人物阶段信息（身份、背景、性格、年龄、外貌）
+    """
+    
+    __slots__ = ("identity", "background", "personality", "age", "appearance")
+    
+    def __init__(self, identity="", background="", personality="", age="", appearance=""):
+        self.identity = _intern(identity)
+        self.background = background
+        self.personality = personality
+        self.age = _intern(age)
+        self.appearance = appearance
+
+
+class Character(Record):
+    """
+    人物信息，stages 为阶段名到 CharacterStage 的字典
+    """
+    
+    __slots__ = ("name", "category", "stages")
+    
+    def __init__(self, name="", category=None, stages=None):
+        self.name = _intern(name)
+        self.category = _intern(category)
+        self.stages = {
+            _intern(stage): CharacterStage.from_dict(info)
+            for stage, info in (stages or {}).items()
+        }
+
+
+class Scene(Record):
+    """
+    场景信息
+    """
+    
+    __slots__ = ("name", "category", "time", "description")
+    
+    def __init__(self, name="", category=None, time="", description=""):
+        self.name = _intern(name)
+        self.category = _intern(category)
+        self.time = _intern(time)
+        self.description = description
+
+
+class EventLogic(Record):
+    """
+    事件逻辑（起因、经过、结果）
+    """
+    
+    __slots__ = ("cause", "process", "result")
+    
+    def __init__(self, cause="", process="", result=""):
+        self.cause = cause
+        self.process = process
+        self.result = result
+
+
+class EpisodeOutline(Record):
+    """
+    单集剧情大纲，列表字段以元组保存
+    """
+    
+    __slots__ = (
+        "episode", "title", "main_progress", "event_logic", "goals", "utilize",
+        "hook", "climax", "highlights", "conflicts", "connections"
+    )
+    
+    def __init__(self, episode=0, title="", main_progress="", event_logic=None, goals=(),
+                 utilize=(), hook="", climax="", highlights=(), conflicts=(), connections=()):
+        self.episode = episode
+        self.title = title
+        self.main_progress = main_progress
+        self.event_logic = EventLogic.from_dict(event_logic or {})
+        self.goals = tuple(goals)
+        self.utilize = tuple(utilize)
+        self.hook = hook
+        self.climax = climax
+        self.highlights = tuple(highlights)
+        self.conflicts = tuple(conflicts)
+        self.connections = tuple(connections)
@@ -0,0 +1,239 @@
+# 剧本文件写入工具
+# 按内容哈希跳过未变化的写入，先写临时文件再替换，批量生成时集中同步到磁盘
+
+import json
+import os
+
+from .build_manifest import text_hash
+
+# 批量写入时每累计多少个文件同步一次
+DEFAULT_BATCH_SIZE = 16
+
+
+def _fsync_directory(directory):
+    """同步目录项（使替换后的文件名落盘），不支持时忽略"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class ScriptWriter:
+    """
+    剧本文件写入器
+    
+    哈希清单记录每个剧本文件上次写入内容的哈希及文件大小、修改时间。
+    新内容与清单中的哈希相同且文件未被改动时跳过写入，文件的修改时间不变，
+    不会触发文件监视和同步。
+    
+    实际写入时先写临时文件（输出目录下以点开头的 .第N集.md.tmp），同步到磁盘后
+    再替换目标文件，写入中途崩溃不会留下不完整的剧本。批量写入（begin_batch /
+    end_batch 之间）时临时文件先积攒起来，每 batch_size 个文件统一同步、替换，
+    目录只同步一次；同一文件在一批中写入多次时只保留最后一次的内容。
+    """
+    
+    def __init__(self, output_dir, manifest_file="data/script_hashes.json", batch_size=DEFAULT_BATCH_SIZE):
+        """
+        初始化剧本文件写入器
+        
+        Args:
+            output_dir (str): 剧本输出目录
+            manifest_file (str): 哈希清单文件路径
+            batch_size (int): 批量写入时每累计多少个文件同步一次
+        """
+        self.output_dir = output_dir
+        self.manifest_file = manifest_file
+        self.batch_size = max(1, batch_size)
+        self.hashes = {}
+        self.dirty = False
+        # 文件名 -> 已写好、等待同步并替换的（临时文件，目标文件，内容哈希）
+        self.pending = {}
+        self.batch_depth = 0
+        self._load()
+    
+    def _load(self):
+        """加载哈希清单"""
+        if not os.path.exists(self.manifest_file):
+            return
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                self.hashes = json.load(f)
+        except Exception as e:
+            print(f"加载剧本哈希清单失败: {e}")
+            self.hashes = {}
+    
+    def _save(self):
+        """保存哈希清单（仅在有更新时写入，先写临时文件再替换）"""
+        if not self.dirty:
+            return
+        try:
+            manifest_dir = os.path.dirname(self.manifest_file)
+            if manifest_dir:
+                os.makedirs(manifest_dir, exist_ok=True)
+            temp_file = f"{self.manifest_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.hashes, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(temp_file, self.manifest_file)
+            self.dirty = False
+        except Exception as e:
+            print(f"保存剧本哈希清单失败: {e}")
+    
+    def is_unchanged(self, filename, content_hash):
+        """
+        判断文件是否已经是指定内容
+        
+        清单中的哈希相同，且文件大小、修改时间与记录一致时直接判定未变化；
+        文件被改动过时读取文件重新计算哈希。
+        
+        Args:
+            filename (str): 文件名
+            content_hash (str): 新内容的哈希
+            
+        Returns:
+            bool: 是否无需写入
+        """
+        entry = self.hashes.get(filename)
+        if not entry or entry.get("hash") != content_hash:
+            return False
+        
+        file_path = os.path.join(self.output_dir, filename)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        if stat.st_size == entry.get("size") and stat.st_mtime_ns == entry.get("mtime_ns"):
+            return True
+        
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                if text_hash(f.read()) != content_hash:
+                    return False
+        except (OSError, ValueError):
+            return False
+        self._record(filename, content_hash)
+        return True
+    
+    def write(self, filename, content, content_hash=None):
+        """
+        写入剧本文件（内容未变化时跳过）
+        
+        Args:
+            filename (str): 文件名
+            content (str): 剧本内容
+            content_hash (str, optional): 已知的内容哈希，默认根据内容计算
+            
+        Returns:
+            bool: 是否实际写入
+        """
+        content_hash = content_hash or text_hash(content)
+        queued = self.pending.get(filename)
+        if queued is not None and queued[2] == content_hash:
+            return True
+        if self.is_unchanged(filename, content_hash):
+            # 本批中先写入的其他内容作废，文件保持原样
+            if queued is not None:
+                self._discard(filename)
+            return False
+        
+        os.makedirs(self.output_dir, exist_ok=True)
+        file_path = os.path.join(self.output_dir, filename)
+        temp_file = os.path.join(self.output_dir, f".{filename}.tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.write(content)
+        # 同一文件再次写入时覆盖同一个临时文件，只替换一次
+        self.pending[filename] = (temp_file, file_path, content_hash)
+        
+        if self.batch_depth == 0 or len(self.pending) >= self.batch_size:
+            self.flush()
+        return True
+    
+    def is_pending(self, filename):
+        """
+        文件是否已写入临时文件、等待批次同步时替换
+        
+        Args:
+            filename (str): 文件名
+            
+        Returns:
+            bool: 是否等待替换
+        """
+        return filename in self.pending
+    
+    def begin_batch(self):
+        """开始批量写入，之后的写入集中同步"""
+        self.batch_depth += 1
+    
+    def end_batch(self):
+        """结束批量写入，同步并替换剩余的文件"""
+        self.batch_depth = max(0, self.batch_depth - 1)
+        if self.batch_depth == 0:
+            self.flush()
+    
+    def flush(self):
+        """
+        同步所有待写入的临时文件，替换目标文件，最后同步一次目录并保存哈希清单
+        
+        某个文件同步或替换失败时，已替换的文件照常记入清单，其余的临时文件被删除、
+        不再写入，然后抛出指明失败文件的异常。
+        """
+        if not self.pending:
+            self._save()
+            return
+        
+        filename = None
+        try:
+            for filename, (temp_file, _, _) in self.pending.items():
+                fd = os.open(temp_file, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            for filename in list(self.pending):
+                temp_file, file_path, content_hash = self.pending[filename]
+                os.replace(temp_file, file_path)
+                # 替换成功后才移出待写入列表
+                del self.pending[filename]
+                self._record(filename, content_hash)
+                print(f"剧本已保存到: {file_path}")
+        except OSError as e:
+            for pending_name in list(self.pending):
+                self._discard(pending_name)
+            raise OSError(f"写入剧本文件 {filename} 失败: {e}") from e
+        finally:
+            _fsync_directory(self.output_dir)
+            self._save()
+    
+    def _discard(self, filename):
+        """
+        放弃等待替换的文件，删除其临时文件
+        
+        Args:
+            filename (str): 文件名
+        """
+        temp_file = self.pending.pop(filename)[0]
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
+    
+    def _record(self, filename, content_hash):
+        """
+        记录文件当前的哈希、大小和修改时间
+        
+        Args:
+            filename (str): 文件名
+            content_hash (str): 内容哈希
+        """
+        stat = os.stat(os.path.join(self.output_dir, filename))
+        self.hashes[filename] = {
+            "hash": content_hash,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns
+        }
+        self.dirty = True
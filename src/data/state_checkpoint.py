@@ -0,0 +1,347 @@
+# 状态检查点
+# 每集结束后保存一份不可变的状态检查点，未变化的部分与上一集共用，可直接打开任意一集的状态
+
+import hashlib
+import json
+import os
+from types import MappingProxyType
+
+from .state_store import ENTITY_KINDS
+
+# 空映射（没有任何实体时共用）
+_EMPTY_MAP = MappingProxyType({})
+
+
+class StateCheckpoint:
+    """
+    单集状态检查点（不可变）
+    
+    保存截至某一集的人物、势力、能力、道具状态，以及本集新增的事件和
+    上一个检查点的标识。各类实体的名称映射在内存和磁盘上都与上一集共用，
+    只有本集有变化的类型才会生成新的映射；读取实体状态时每次返回新的对象，
+    修改返回值不会影响检查点。
+    """
+    
+    __slots__ = ("checkpoint_id", "episode", "parent_id", "entity_ids", "entities", "events_id", "store")
+    
+    def __init__(self, checkpoint_id, episode, parent_id, entity_ids, events_id, store):
+        """
+        初始化状态检查点
+        
+        Args:
+            checkpoint_id (str): 检查点标识（内容哈希）
+            episode (int): 集数
+            parent_id (str): 上一个检查点的标识，没有时为None
+            entity_ids (dict): 实体类型到名称映射对象标识的字典
+            events_id (str): 本集新增事件列表的对象标识
+            store (CheckpointStore): 所属的检查点存储
+        """
+        self.checkpoint_id = checkpoint_id
+        self.episode = episode
+        self.parent_id = parent_id
+        self.entity_ids = MappingProxyType(dict(entity_ids))
+        # 实体类型到（名称 -> 状态对象标识）的只读映射，同一映射对象在各检查点间共用
+        self.entities = MappingProxyType({
+            kind: store.read_map(names_id) for kind, names_id in entity_ids.items()
+        })
+        self.events_id = events_id
+        self.store = store
+    
+    def get_entity(self, kind, name):
+        """
+        获取实体在本检查点的状态
+        
+        Args:
+            kind (str): 实体类型
+            name (str): 名称
+            
+        Returns:
+            dict: 状态，没有记录时返回None
+        """
+        object_id = self.entities.get(kind, _EMPTY_MAP).get(name)
+        if object_id is None:
+            return None
+        return self.store.read_object(object_id)
+    
+    def episode_events(self):
+        """
+        本集新增的事件
+        
+        Returns:
+            list: 事件列表
+        """
+        return self.store.read_object(self.events_id)
+    
+    def parent(self):
+        """
+        上一个检查点
+        
+        Returns:
+            StateCheckpoint: 检查点，没有时返回None
+        """
+        if self.parent_id is None:
+            return None
+        return self.store.load_checkpoint(self.parent_id)
+    
+    def get_events(self, start_episode=None, end_episode=None):
+        """
+        获取截至本检查点、指定集数范围内的事件，按集数顺序排列
+        
+        只沿检查点链回溯到开始集数，耗时与范围内的集数成正比。
+        
+        Args:
+            start_episode (int, optional): 开始集数，默认不限
+            end_episode (int, optional): 结束集数，默认不限
+            
+        Returns:
+            list: 事件记录列表（{"episode": 集数, "event": 事件}）
+        """
+        chunks = []
+        checkpoint = self
+        while checkpoint is not None:
+            if start_episode is not None and checkpoint.episode < start_episode:
+                break
+            if end_episode is None or checkpoint.episode <= end_episode:
+                chunks.append([
+                    {"episode": checkpoint.episode, "event": event}
+                    for event in checkpoint.episode_events()
+                ])
+            checkpoint = checkpoint.parent()
+        
+        events = []
+        for chunk in reversed(chunks):
+            events.extend(chunk)
+        return events
+    
+    def to_state(self):
+        """
+        还原为完整状态字典（格式与状态存储相同，实体只含本检查点时的状态）
+        
+        Returns:
+            dict: 状态
+        """
+        state = {kind: {} for kind in ENTITY_KINDS}
+        for kind, names in self.entities.items():
+            for name in names:
+                state[kind][name] = {str(self.episode): self.get_entity(kind, name)}
+        state["events"] = self.get_events()
+        state["current_episode"] = self.episode
+        return state
+
+
+class CheckpointStore:
+    """
+    检查点存储
+    
+    检查点、实体名称映射、实体状态、事件列表都按内容哈希保存为对象文件
+    （objects/<哈希>.json），内容相同的对象只保存一份：某一集没有变化的
+    实体类型直接引用上一集的映射对象，写入量只与本集的变化有关。
+    每集的检查点标识保存在 episode_<集数>.json 中，按集数直接打开，
+    耗时与历史长度无关。
+    
+    重新生成中间某一集时会写入该集的新检查点，之后各集的检查点仍引用原来的链，
+    需要时按顺序重新生成。
+    """
+    
+    def __init__(self, directory="data/checkpoints"):
+        """
+        初始化检查点存储
+        
+        Args:
+            directory (str): 检查点目录
+        """
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, "objects")
+        # 对象文本缓存（对象不可变，无需失效）
+        self._objects = {}
+        self._maps = {}
+        self._checkpoints = {}
+    
+    def _episode_file(self, episode):
+        """
+        指定集数的检查点引用文件
+        
+        Args:
+            episode (int): 集数
+            
+        Returns:
+            str: 文件路径
+        """
+        return os.path.join(self.directory, f"episode_{episode:04d}.json")
+    
+    def write_object(self, value):
+        """
+        保存对象（已存在时跳过）
+        
+        Args:
+            value: 可JSON序列化的值
+            
+        Returns:
+            str: 对象标识（内容哈希）
+        """
+        text = json.dumps(value, ensure_ascii=False, sort_keys=True)
+        object_id = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        if object_id in self._objects:
+            return object_id
+        
+        path = os.path.join(self.objects_dir, f"{object_id}.json")
+        if not os.path.exists(path):
+            os.makedirs(self.objects_dir, exist_ok=True)
+            temp_file = f"{path}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(temp_file, path)
+        self._objects[object_id] = text
+        return object_id
+    
+    def read_object(self, object_id):
+        """
+        读取对象
+        
+        Args:
+            object_id (str): 对象标识
+            
+        Returns:
+            对象的值（每次返回新的对象）
+        """
+        text = self._objects.get(object_id)
+        if text is None:
+            with open(os.path.join(self.objects_dir, f"{object_id}.json"), 'r', encoding='utf-8') as f:
+                text = f.read()
+            self._objects[object_id] = text
+        return json.loads(text)
+    
+    def read_map(self, object_id):
+        """
+        读取名称映射对象（只读，同一对象只解析一次并共用）
+        
+        Args:
+            object_id (str): 对象标识
+            
+        Returns:
+            MappingProxyType: 只读映射
+        """
+        names = self._maps.get(object_id)
+        if names is None:
+            names = MappingProxyType(self.read_object(object_id))
+            self._maps[object_id] = names
+        return names
+    
+    def load_checkpoint(self, checkpoint_id):
+        """
+        按标识读取检查点
+        
+        Args:
+            checkpoint_id (str): 检查点标识
+            
+        Returns:
+            StateCheckpoint: 检查点
+        """
+        checkpoint = self._checkpoints.get(checkpoint_id)
+        if checkpoint is None:
+            data = self.read_object(checkpoint_id)
+            checkpoint = StateCheckpoint(
+                checkpoint_id, data["episode"], data["parent"], data["entities"], data["events"], self
+            )
+            self._checkpoints[checkpoint_id] = checkpoint
+        return checkpoint
+    
+    def open(self, episode):
+        """
+        打开截至指定集数的检查点（该集没有检查点时使用之前最近的一集）
+        
+        Args:
+            episode (int): 集数
+            
+        Returns:
+            StateCheckpoint: 检查点，没有时返回None
+        """
+        checkpoint_id = self._read_ref(episode)
+        if checkpoint_id is None:
+            episodes = [number for number in self.episodes() if number <= episode]
+            if not episodes:
+                return None
+            checkpoint_id = self._read_ref(max(episodes))
+            if checkpoint_id is None:
+                return None
+        return self.load_checkpoint(checkpoint_id)
+    
+    def episodes(self):
+        """
+        已保存检查点的集数
+        
+        Returns:
+            list: 集数列表（升序）
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        episodes = []
+        for filename in os.listdir(self.directory):
+            if filename.startswith("episode_") and filename.endswith(".json"):
+                try:
+                    episodes.append(int(filename[len("episode_"):-len(".json")]))
+                except ValueError:
+                    continue
+        return sorted(episodes)
+    
+    def _read_ref(self, episode):
+        """
+        读取指定集数的检查点标识
+        
+        Args:
+            episode (int): 集数
+            
+        Returns:
+            str: 检查点标识，不存在时返回None
+        """
+        path = self._episode_file(episode)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)["checkpoint"]
+        except Exception as e:
+            print(f"读取状态检查点失败: {e}")
+            return None
+    
+    def write(self, episode, events, entity_changes):
+        """
+        在上一集的检查点基础上写入本集的检查点
+        
+        Args:
+            episode (int): 集数
+            events (list): 本集新增的事件
+            entity_changes (dict): 实体类型到（名称 -> 本集状态）的字典
+            
+        Returns:
+            StateCheckpoint: 新的检查点
+        """
+        parent = self.open(episode - 1)
+        
+        entity_ids = {}
+        for kind in ENTITY_KINDS:
+            changes = entity_changes.get(kind)
+            if parent and not changes:
+                # 本集没有变化的类型直接引用上一集的映射对象
+                entity_ids[kind] = parent.entity_ids[kind]
+                continue
+            names = dict(parent.entities[kind]) if parent else {}
+            for name, data in (changes or {}).items():
+                names[name] = self.write_object(data)
+            entity_ids[kind] = self.write_object(names)
+        
+        checkpoint_id = self.write_object({
+            "episode": episode,
+            "parent": parent.checkpoint_id if parent else None,
+            "entities": entity_ids,
+            "events": self.write_object(list(events))
+        })
+        
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._episode_file(episode)
+        temp_file = f"{path}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({"episode": episode, "checkpoint": checkpoint_id}, f)
+        os.replace(temp_file, path)
+        
+        return self.load_checkpoint(checkpoint_id)
@@ -0,0 +1,575 @@
+# 状态存储
+# 负责持久化状态跟踪器的状态，提供两种后端：
+# JSON（快照文件加追加写入的变更日志，定期压缩为新快照）和 SQLite（按集数、实体名称建索引）
+
+import json
+import os
+import sqlite3
+import threading
+
+# 变更日志累计多少条后压缩为新快照
+DEFAULT_COMPACT_THRESHOLD = 1000
+
+# 按集数记录状态的实体类型（人物、势力、能力、道具）
+ENTITY_KINDS = ("characters", "forces", "abilities", "items")
+
+# 状态存储后端
+BACKEND_JSON = "json"
+BACKEND_SQLITE = "sqlite"
+
+
+def empty_state():
+    """
+    空状态
+    
+    Returns:
+        dict: 不含任何人物、势力、事件的状态
+    """
+    return {
+        "characters": {},
+        "forces": {},
+        "abilities": {},
+        "items": {},
+        "events": [],
+        "current_episode": 0
+    }
+
+
+def event_key(event):
+    """
+    事件去重用的键（事件可能是字符串，也可能是字典）
+    
+    Args:
+        event: 事件
+        
+    Returns:
+        str: 去重键
+    """
+    if isinstance(event, str):
+        return event
+    return json.dumps(event, ensure_ascii=False, sort_keys=True)
+
+
+def _check_kind(kind):
+    """
+    检查实体类型
+    
+    Args:
+        kind (str): 实体类型
+    """
+    if kind not in ENTITY_KINDS:
+        raise ValueError(f"未知的实体类型: {kind}")
+
+
+def create_state_store(backend=BACKEND_JSON, state_file="data/state.json", database_file="data/state.db"):
+    """
+    创建状态存储
+    
+    Args:
+        backend (str): 存储后端（json 或 sqlite）
+        state_file (str): JSON快照文件路径
+        database_file (str): SQLite数据库文件路径
+        
+    Returns:
+        JsonStateStore 或 SqliteStateStore: 状态存储
+    """
+    if backend == BACKEND_SQLITE:
+        return SqliteStateStore(database_file)
+    if backend != BACKEND_JSON:
+        print(f"未知的状态存储后端: {backend}，使用 {BACKEND_JSON}")
+    return JsonStateStore(state_file)
+
+
+class JsonStateStore:
+    """
+    JSON状态存储
+    
+    状态由两部分组成：快照文件（完整状态，格式与原 state.json 相同）和
+    追加写入的变更日志（JSONL，每次更新一行，只包含新增内容）。
+    更新时只在日志末尾追加一行，写入量与新增事件数成正比，与累计状态大小无关；
+    日志达到一定条数后压缩：把内存中的完整状态写成新快照，再清空日志。
+    加载时读取快照并按顺序重放日志。
+    
+    已记录的事件保存在集合索引中，去重判断为O(1)。压缩中途中断（快照已替换、
+    日志未清空）时重放的日志会被索引去重，不会产生重复事件。
+    事件和实体状态另按集数建内存索引，读取单集的事件、实体状态（写入每集检查点时）
+    耗时只与该集的记录数有关，与累计历史长度无关。
+    
+    人物、势力、能力、道具的状态按集数保存：state[类型][名称][集数字符串] = 状态。
+    """
+    
+    def __init__(self, state_file="data/state.json", log_file=None, compact_threshold=DEFAULT_COMPACT_THRESHOLD):
+        """
+        初始化JSON状态存储
+        
+        Args:
+            state_file (str): 快照文件路径
+            log_file (str, optional): 变更日志路径，默认为快照文件同目录下的 .log.jsonl 文件
+            compact_threshold (int): 日志累计多少条后压缩，0为不自动压缩
+        """
+        self.state_file = state_file
+        if log_file is None:
+            log_file = os.path.splitext(state_file)[0] + ".log.jsonl"
+        self.log_file = log_file
+        self.compact_threshold = compact_threshold
+        self.state = empty_state()
+        self.event_keys = set()
+        # 集数 -> 事件记录列表；集数 -> 实体类型 -> 名称 -> 状态
+        self.episode_events = {}
+        self.episode_entities = {}
+        self.log_entries = 0
+    
+    def load(self):
+        """
+        加载状态：读取快照，再重放变更日志
+        
+        Returns:
+            dict: 状态
+        """
+        self.state = empty_state()
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    self.state = json.load(f)
+            except Exception as e:
+                print(f"加载状态文件失败: {e}")
+        self._build_index()
+        
+        self.log_entries = 0
+        truncated = False
+        if os.path.exists(self.log_file):
+            try:
+                with open(self.log_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            # 最后一行可能在写入时被中断，之后的内容不再可信
+                            print(f"状态日志存在不完整的记录，已忽略其后的内容: {self.log_file}")
+                            truncated = True
+                            break
+                        self._apply(entry)
+                        self.log_entries += 1
+            except Exception as e:
+                print(f"加载状态日志失败: {e}")
+        
+        # 立即压缩，避免之后追加的记录跟在不完整的记录后面
+        if truncated:
+            self.compact()
+        
+        return self.state
+    
+    def _build_index(self):
+        """根据快照中的完整状态重建事件去重索引和按集数的索引"""
+        self.event_keys = set()
+        self.episode_events = {}
+        self.episode_entities = {}
+        for entry in self.state.get("events", []):
+            self.event_keys.add(event_key(entry.get("event")))
+            self.episode_events.setdefault(entry["episode"], []).append(entry)
+        for kind in ENTITY_KINDS:
+            for name, history in self.state.get(kind, {}).items():
+                for key, data in history.items():
+                    self.episode_entities.setdefault(int(key), {}).setdefault(kind, {})[name] = data
+    
+    def get_current_episode(self):
+        """
+        获取最近一次更新的集数
+        
+        Returns:
+            int: 集数
+        """
+        return self.state.get("current_episode", 0)
+    
+    def record_episode(self, episode, events):
+        """
+        记录一集的状态更新：当前集数和新增事件
+        
+        Args:
+            episode (int): 集数
+            events (list): 事件列表
+            
+        Returns:
+            list: 实际新增的事件（已记录过的事件被去重）
+        """
+        new_events = []
+        keys = set()
+        for event in events:
+            key = event_key(event)
+            if key not in self.event_keys and key not in keys:
+                keys.add(key)
+                new_events.append(event)
+        
+        self._commit({"episode": episode, "events": new_events})
+        return new_events
+    
+    def record_entity(self, kind, name, episode, data):
+        """
+        记录人物、势力、能力或道具在某一集的状态
+        
+        Args:
+            kind (str): 实体类型（characters/forces/abilities/items）
+            name (str): 名称
+            episode (int): 集数
+            data (dict): 状态
+        """
+        _check_kind(kind)
+        self._commit({"kind": kind, "name": name, "episode": episode, "data": data})
+    
+    def get_entity(self, kind, name, episode):
+        """
+        获取人物、势力、能力或道具截至某一集的最新状态
+        
+        Args:
+            kind (str): 实体类型
+            name (str): 名称
+            episode (int): 集数
+            
+        Returns:
+            dict: 状态，没有记录时返回None
+        """
+        _check_kind(kind)
+        history = self.state.get(kind, {}).get(name)
+        if not history:
+            return None
+        episodes = [int(key) for key in history if int(key) <= episode]
+        if not episodes:
+            return None
+        return history[str(max(episodes))]
+    
+    def get_entities_at(self, kind, episode):
+        """
+        获取某类实体在指定集数记录的状态（不含之前各集的记录）
+        
+        Args:
+            kind (str): 实体类型
+            episode (int): 集数
+            
+        Returns:
+            dict: 名称到状态的字典
+        """
+        _check_kind(kind)
+        return dict(self.episode_entities.get(episode, {}).get(kind, {}))
+    
+    def get_events(self, start_episode=None, end_episode=None):
+        """
+        获取指定集数范围内的事件，按记录顺序排列
+        
+        Args:
+            start_episode (int, optional): 开始集数，默认不限
+            end_episode (int, optional): 结束集数，默认不限
+            
+        Returns:
+            list: 事件记录列表（{"episode": 集数, "event": 事件}）
+        """
+        if start_episode is not None and start_episode == end_episode:
+            return list(self.episode_events.get(start_episode, []))
+        return [
+            entry for entry in self.state["events"]
+            if (start_episode is None or entry["episode"] >= start_episode)
+            and (end_episode is None or entry["episode"] <= end_episode)
+        ]
+    
+    def compact(self):
+        """把当前完整状态写成新快照（先写临时文件再替换），然后清空变更日志"""
+        try:
+            state_dir = os.path.dirname(self.state_file)
+            if state_dir:
+                os.makedirs(state_dir, exist_ok=True)
+            temp_file = f"{self.state_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, ensure_ascii=False, indent=2)
+            os.replace(temp_file, self.state_file)
+            if os.path.exists(self.log_file):
+                os.remove(self.log_file)
+            self.log_entries = 0
+        except Exception as e:
+            print(f"压缩状态文件失败: {e}")
+    
+    def close(self):
+        """关闭存储（JSON存储每次写入后即关闭文件，无需处理）"""
+        pass
+    
+    def _commit(self, entry):
+        """
+        追加一条变更到日志，写入成功后再应用到内存中的状态，日志过长时压缩
+        
+        日志写入失败时抛出异常且内存状态不变，与SQLite存储写入失败时的行为一致。
+        
+        Args:
+            entry (dict): 变更记录
+        """
+        self._append(entry)
+        self._apply(entry)
+        if self.compact_threshold and self.log_entries >= self.compact_threshold:
+            self.compact()
+    
+    def _apply(self, entry):
+        """
+        把一条变更应用到内存中的状态
+        
+        Args:
+            entry (dict): 变更记录
+        """
+        episode = entry["episode"]
+        if "kind" in entry:
+            history = self.state.setdefault(entry["kind"], {}).setdefault(entry["name"], {})
+            history[str(episode)] = entry["data"]
+            self.episode_entities.setdefault(episode, {}).setdefault(entry["kind"], {})[entry["name"]] = entry["data"]
+            return
+        
+        self.state["current_episode"] = episode
+        for event in entry.get("events", []):
+            key = event_key(event)
+            if key in self.event_keys:
+                continue
+            self.event_keys.add(key)
+            record = {
+                "episode": episode,
+                "event": event
+            }
+            self.state["events"].append(record)
+            self.episode_events.setdefault(episode, []).append(record)
+    
+    def _append(self, entry):
+        """
+        在变更日志末尾追加一条记录
+        
+        Args:
+            entry (dict): 变更记录（写入失败时抛出 OSError）
+        """
+        log_dir = os.path.dirname(self.log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.log_entries += 1
+
+
+class SqliteStateStore:
+    """
+    SQLite状态存储
+    
+    事件和人物、势力、能力、道具的状态分别保存在各自的表中，
+    按集数和实体名称建立索引：「X在第N集时的状态」「第A到B集的事件」
+    都是索引查询，无需把全部历史读入内存。数据库使用WAL模式，
+    读取不会被写入阻塞。事件按内容去重（event_key 唯一索引）。
+    
+    连接可在多个线程间共用，所有操作由同一把锁串行化。
+    """
+    
+    def __init__(self, database_file="data/state.db"):
+        """
+        初始化SQLite状态存储
+        
+        Args:
+            database_file (str): 数据库文件路径
+        """
+        self.database_file = database_file
+        self.connection = None
+        self.lock = threading.RLock()
+    
+    def load(self):
+        """
+        打开数据库并建表（已存在时跳过），不读取历史数据
+        
+        Returns:
+            SqliteStateStore: 存储本身
+        """
+        with self.lock:
+            if self.connection is not None:
+                return self
+            database_dir = os.path.dirname(self.database_file)
+            if database_dir:
+                os.makedirs(database_dir, exist_ok=True)
+            self.connection = sqlite3.connect(self.database_file, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            with self.connection:
+                self._create_tables()
+            return self
+    
+    def _create_tables(self):
+        """创建各表和索引"""
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "episode INTEGER NOT NULL, "
+            "event_key TEXT NOT NULL UNIQUE, "
+            "event TEXT NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_events_episode ON events (episode)")
+        for kind in ENTITY_KINDS:
+            # 主键（名称，集数）即「某实体在第N集时的状态」所用的索引
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {kind} ("
+                "name TEXT NOT NULL, "
+                "episode INTEGER NOT NULL, "
+                "data TEXT NOT NULL, "
+                "PRIMARY KEY (name, episode)) WITHOUT ROWID"
+            )
+            self.connection.execute(f"CREATE INDEX IF NOT EXISTS idx_{kind}_episode ON {kind} (episode)")
+    
+    def _execute(self, sql, parameters=()):
+        """
+        执行查询（按需打开数据库）
+        
+        Args:
+            sql (str): SQL语句
+            parameters (tuple): 参数
+            
+        Returns:
+            list: 查询结果
+        """
+        with self.lock:
+            self.load()
+            return self.connection.execute(sql, parameters).fetchall()
+    
+    @property
+    def state(self):
+        """
+        完整状态（与JSON存储格式相同），需要读取全部历史，仅用于导出和兼容
+        
+        Returns:
+            dict: 状态
+        """
+        state = empty_state()
+        state["current_episode"] = self.get_current_episode()
+        state["events"] = self.get_events()
+        for kind in ENTITY_KINDS:
+            for name, episode, data in self._execute(f"SELECT name, episode, data FROM {kind} ORDER BY name, episode"):
+                state[kind].setdefault(name, {})[str(episode)] = json.loads(data)
+        return state
+    
+    def get_current_episode(self):
+        """
+        获取最近一次更新的集数
+        
+        Returns:
+            int: 集数
+        """
+        rows = self._execute("SELECT value FROM meta WHERE key = 'current_episode'")
+        return int(rows[0][0]) if rows else 0
+    
+    def record_episode(self, episode, events):
+        """
+        记录一集的状态更新：当前集数和新增事件
+        
+        Args:
+            episode (int): 集数
+            events (list): 事件列表
+            
+        Returns:
+            list: 实际新增的事件（已记录过的事件被去重）
+        """
+        new_events = []
+        with self.lock:
+            self.load()
+            with self.connection:
+                for event in events:
+                    cursor = self.connection.execute(
+                        "INSERT OR IGNORE INTO events (episode, event_key, event) VALUES (?, ?, ?)",
+                        (episode, event_key(event), json.dumps(event, ensure_ascii=False))
+                    )
+                    if cursor.rowcount:
+                        new_events.append(event)
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('current_episode', ?)",
+                    (str(episode),)
+                )
+        return new_events
+    
+    def record_entity(self, kind, name, episode, data):
+        """
+        记录人物、势力、能力或道具在某一集的状态
+        
+        Args:
+            kind (str): 实体类型（characters/forces/abilities/items）
+            name (str): 名称
+            episode (int): 集数
+            data (dict): 状态
+        """
+        _check_kind(kind)
+        with self.lock:
+            self.load()
+            with self.connection:
+                self.connection.execute(
+                    f"INSERT OR REPLACE INTO {kind} (name, episode, data) VALUES (?, ?, ?)",
+                    (name, episode, json.dumps(data, ensure_ascii=False))
+                )
+    
+    def get_entity(self, kind, name, episode):
+        """
+        获取人物、势力、能力或道具截至某一集的最新状态
+        
+        Args:
+            kind (str): 实体类型
+            name (str): 名称
+            episode (int): 集数
+            
+        Returns:
+            dict: 状态，没有记录时返回None
+        """
+        _check_kind(kind)
+        rows = self._execute(
+            f"SELECT data FROM {kind} WHERE name = ? AND episode <= ? ORDER BY episode DESC LIMIT 1",
+            (name, episode)
+        )
+        return json.loads(rows[0][0]) if rows else None
+    
+    def get_entities_at(self, kind, episode):
+        """
+        获取某类实体在指定集数记录的状态（不含之前各集的记录）
+        
+        Args:
+            kind (str): 实体类型
+            episode (int): 集数
+            
+        Returns:
+            dict: 名称到状态的字典
+        """
+        _check_kind(kind)
+        rows = self._execute(f"SELECT name, data FROM {kind} WHERE episode = ?", (episode,))
+        return {name: json.loads(data) for name, data in rows}
+    
+    def get_events(self, start_episode=None, end_episode=None):
+        """
+        获取指定集数范围内的事件，按记录顺序排列
+        
+        Args:
+            start_episode (int, optional): 开始集数，默认不限
+            end_episode (int, optional): 结束集数，默认不限
+            
+        Returns:
+            list: 事件记录列表（{"episode": 集数, "event": 事件}）
+        """
+        conditions = []
+        parameters = []
+        if start_episode is not None:
+            conditions.append("episode >= ?")
+            parameters.append(start_episode)
+        if end_episode is not None:
+            conditions.append("episode <= ?")
+            parameters.append(end_episode)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._execute(f"SELECT episode, event FROM events{where} ORDER BY id", tuple(parameters))
+        return [{"episode": episode, "event": json.loads(event)} for episode, event in rows]
+    
+    def compact(self):
+        """把WAL日志合并回数据库文件"""
+        try:
+            self._execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except Exception as e:
+            print(f"压缩状态数据库失败: {e}")
+    
+    def close(self):
+        """关闭数据库连接"""
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
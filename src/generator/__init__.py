@@ -9,16 +9,22 @@ generator模块
 - 第一集特殊处理
 - 第二集特殊处理
 - 正常集数处理
+- 生成结果（内容、内容哈希、验证结果）及其缓存
 """
 
 from .script_generator import ScriptGenerator
 from .first_episode import FirstEpisodeGenerator
 from .second_episode import SecondEpisodeGenerator
 from .normal_episode import NormalEpisodeGenerator
+from .generator_pool import GeneratorPool
+from .generation_result import GenerationResult, ResultCache
 
 __all__ = [
     "ScriptGenerator",
     "FirstEpisodeGenerator",
     "SecondEpisodeGenerator",
-    "NormalEpisodeGenerator"
+    "NormalEpisodeGenerator",
+    "GeneratorPool",
+    "GenerationResult",
+    "ResultCache"
 ]
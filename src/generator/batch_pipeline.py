@@ -0,0 +1,211 @@
+# 批量生成流水线
+# 生成、验证、保存分为三个阶段，阶段之间用有界队列连接，各阶段并行处理相邻的剧集
+
+import queue
+import threading
+import time
+
+# 队列结束标记
+_DONE = object()
+
+
+class StageStats:
+    """
+    单个阶段的吞吐统计
+    
+    busy 为处理各项的耗时合计，wait 为等待上游（输入队列为空）
+    或下游（输出队列已满）的耗时合计。
+    """
+    
+    __slots__ = ("name", "items", "busy", "wait")
+    
+    def __init__(self, name):
+        """
+        初始化阶段统计
+        
+        Args:
+            name (str): 阶段名称
+        """
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.wait = 0.0
+    
+    @property
+    def throughput(self):
+        """每秒处理的项数（按处理耗时计算，没有处理过时为0）"""
+        return self.items / self.busy if self.busy > 0 else 0.0
+    
+    def to_dict(self):
+        """
+        转换为字典
+        
+        Returns:
+            dict: 统计数据
+        """
+        return {
+            "name": self.name,
+            "items": self.items,
+            "busy": self.busy,
+            "wait": self.wait,
+            "throughput": self.throughput
+        }
+    
+    def __repr__(self):
+        return (
+            f"{self.name}: {self.items} 项，处理 {self.busy:.3f} 秒，"
+            f"等待 {self.wait:.3f} 秒，{self.throughput:.1f} 项/秒"
+        )
+
+
+class BatchPipeline:
+    """
+    批量生成流水线
+    
+    生产阶段在调用 run() 的线程中逐项产出（如逐集生成剧本），之后的每个阶段
+    各占一个线程，依次处理上一阶段的输出。阶段之间的队列有容量上限：下游处理
+    不过来时上游阻塞等待，内存中最多只积压几集的结果。各阶段按顺序处理，
+    输出顺序与生产顺序一致。
+    
+    任何阶段出错时，生产阶段停止产出，出错的阶段丢弃剩余的输入，
+    各线程结束后 run() 重新抛出第一个错误。
+    """
+    
+    def __init__(self, stages, queue_size=2):
+        """
+        初始化批量生成流水线
+        
+        Args:
+            stages (list): （阶段名称，处理函数）列表，处理函数接收上一阶段的输出，
+                返回值传给下一阶段（最后一个阶段的返回值忽略）
+            queue_size (int): 阶段之间每个队列的容量
+        """
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.stats = {}
+        self._error = None
+        self._error_lock = threading.Lock()
+    
+    def run(self, items, producer_name="produce"):
+        """
+        运行流水线
+        
+        Args:
+            items (iterable): 生产阶段的产出（在当前线程中迭代）
+            producer_name (str): 生产阶段的名称
+            
+        Returns:
+            dict: 阶段名称到吞吐统计的字典（按阶段顺序）
+        """
+        self._error = None
+        self.stats = {producer_name: StageStats(producer_name)}
+        for name, _ in self.stages:
+            self.stats[name] = StageStats(name)
+        
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = []
+        for index, (name, handler) in enumerate(self.stages):
+            output_queue = queues[index + 1] if index + 1 < len(queues) else None
+            thread = threading.Thread(
+                target=self._run_stage,
+                args=(self.stats[name], handler, queues[index], output_queue),
+                name=f"pipeline-{name}",
+                daemon=True
+            )
+            thread.start()
+            threads.append(thread)
+        
+        try:
+            self._produce(items, self.stats[producer_name], queues[0] if queues else None)
+        finally:
+            if queues:
+                self._put(queues[0], _DONE, None)
+            for thread in threads:
+                thread.join()
+        
+        if self._error is not None:
+            raise self._error
+        return self.stats
+    
+    def _produce(self, items, stats, output_queue):
+        """
+        生产阶段：逐项产出并放入第一个队列
+        
+        Args:
+            items (iterable): 产出
+            stats (StageStats): 阶段统计
+            output_queue (queue.Queue): 输出队列，没有后续阶段时为None
+        """
+        iterator = iter(items)
+        while self._error is None:
+            start_time = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            except Exception as e:
+                self._fail(e)
+                break
+            stats.busy += time.perf_counter() - start_time
+            stats.items += 1
+            if output_queue is not None:
+                self._put(output_queue, item, stats)
+    
+    def _run_stage(self, stats, handler, input_queue, output_queue):
+        """
+        阶段线程：从输入队列取出各项处理后放入输出队列，收到结束标记后向下游传递
+        
+        Args:
+            stats (StageStats): 阶段统计
+            handler (callable): 处理函数
+            input_queue (queue.Queue): 输入队列
+            output_queue (queue.Queue): 输出队列，最后一个阶段为None
+        """
+        while True:
+            start_time = time.perf_counter()
+            item = input_queue.get()
+            stats.wait += time.perf_counter() - start_time
+            if item is _DONE:
+                break
+            if self._error is not None:
+                # 流水线已出错：丢弃剩余的输入，直到收到结束标记
+                continue
+            
+            start_time = time.perf_counter()
+            try:
+                result = handler(item)
+            except Exception as e:
+                self._fail(e)
+                continue
+            stats.busy += time.perf_counter() - start_time
+            stats.items += 1
+            if output_queue is not None:
+                self._put(output_queue, result, stats)
+        
+        if output_queue is not None:
+            self._put(output_queue, _DONE, None)
+    
+    def _put(self, output_queue, item, stats):
+        """
+        放入队列（队列已满时阻塞等待，计入等待耗时）
+        
+        Args:
+            output_queue (queue.Queue): 队列
+            item: 放入的项
+            stats (StageStats): 阶段统计，不计时为None
+        """
+        start_time = time.perf_counter()
+        output_queue.put(item)
+        if stats is not None:
+            stats.wait += time.perf_counter() - start_time
+    
+    def _fail(self, error):
+        """
+        记录第一个错误
+        
+        Args:
+            error (Exception): 错误
+        """
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
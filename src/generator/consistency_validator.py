@@ -1,7 +1,11 @@
 # 一致性验证器
 # 负责验证剧本内容的一致性，确保前后文不矛盾
 
-import re
+from utils.phrase_scanner import LINE_FORBIDDEN_PATTERNS
+from generator.line_rules import (
+    LineValidationEngine, ForbiddenPatternRule, DescriptionLengthRule,
+    ConsecutiveDeltaRule, SceneDescriptionRule, CharacterIntroRule
+)
 
 
 class ConsistencyValidator:
@@ -20,18 +24,16 @@ class ConsistencyValidator:
         """
         self.state_tracker = state_tracker
         
-        self.forbidden_patterns = [
-            r'眼神.*',
-            r'声音(?!提示：).*',
-            r'心里.*',
-            r'气氛.*',
-            r'像.*',
-            r'如.*',
-            r'冷冷地.*',
-            r'狠狠地.*',
-            r'轻轻.*',
-            r'快速.*'
-        ]
+        # 逐行检查的禁止模式（与其他验证器共用同一个扫描器）
+        self.forbidden_patterns = [pattern for pattern, _, _ in LINE_FORBIDDEN_PATTERNS]
+        
+        # 逐行验证规则：剧本只拆分、分类一次，所有规则在同一遍中检查
+        self.line_engine = LineValidationEngine()
+        self.forbidden_rule = ForbiddenPatternRule()
+        self.description_length_rule = DescriptionLengthRule()
+        self.consecutive_delta_rule = ConsecutiveDeltaRule()
+        # 额外的逐行规则（通过 add_line_rule 添加），问题排在内置规则之后
+        self.extra_line_rules = []
         
         self.ability_unlock_rules = {
             "苍生笔": 1,
@@ -84,19 +86,37 @@ class ConsistencyValidator:
             "warnings": []
         }
         
+        line_rules = [
+            self.forbidden_rule,
+            self.description_length_rule,
+            self.consecutive_delta_rule
+        ] + self.extra_line_rules
+        line_issues = self.line_engine.run(content, line_rules)
+        
         issues = []
-        issues.extend(self._check_forbidden_patterns(content))
+        issues.extend(line_issues[0])
         issues.extend(self._check_ability_consistency(episode, content))
         issues.extend(self._check_force_consistency(episode, content))
         issues.extend(self._check_character_consistency(episode, content))
-        issues.extend(self._check_description_length(content))
-        issues.extend(self._check_consecutive_deltas(content))
+        issues.extend(line_issues[1])
+        issues.extend(line_issues[2])
+        for extra_issues in line_issues[3:]:
+            issues.extend(extra_issues)
         
         results["issues"] = issues
         results["is_valid"] = len(issues) == 0
         
         return results
     
+    def add_line_rule(self, rule):
+        """
+        添加逐行验证规则，与内置规则在同一遍中检查
+        
+        Args:
+            rule (LineRule): 逐行验证规则
+        """
+        self.extra_line_rules.append(rule)
+    
     def _check_forbidden_patterns(self, content):
         """
         检查禁止模式
@@ -107,15 +127,7 @@ class ConsistencyValidator:
         Returns:
             list: 问题列表
         """
-        issues = []
-        lines = content.split('\n')
-        
-        for i, line in enumerate(lines, 1):
-            for pattern in self.forbidden_patterns:
-                if re.search(pattern, line):
-                    issues.append(f"第{i}行：发现禁止模式【{pattern}】：{line.strip()}")
-        
-        return issues
+        return self.line_engine.run(content, [ForbiddenPatternRule()])[0]
     
     def _check_ability_consistency(self, episode, content):
         """
@@ -186,16 +198,7 @@ class ConsistencyValidator:
         Returns:
             list: 问题列表
         """
-        issues = []
-        lines = content.split('\n')
-        
-        for i, line in enumerate(lines, 1):
-            if line.startswith('△'):
-                desc = line[1:].strip()
-                if len(desc) > 50:
-                    issues.append(f"第{i}行：描写过长（{len(desc)}字），建议拆分：{desc[:30]}...")
-        
-        return issues
+        return self.line_engine.run(content, [DescriptionLengthRule()])[0]
     
     def _check_consecutive_deltas(self, content):
         """
@@ -207,25 +210,7 @@ class ConsistencyValidator:
         Returns:
             list: 问题列表
         """
-        issues = []
-        lines = content.split('\n')
-        consecutive_count = 0
-        start_line = 0
-        
-        for i, line in enumerate(lines, 1):
-            if line.startswith('△'):
-                if consecutive_count == 0:
-                    start_line = i
-                consecutive_count += 1
-            else:
-                if consecutive_count > 4:
-                    issues.append(f"第{start_line}-{i-1}行：连续{consecutive_count}个△，建议穿插对话或声音")
-                consecutive_count = 0
-        
-        if consecutive_count > 4:
-            issues.append(f"第{start_line}-{len(lines)}行：连续{consecutive_count}个△，建议穿插对话或声音")
-        
-        return issues
+        return self.line_engine.run(content, [ConsecutiveDeltaRule()])[0]
     
     def validate_character_intro(self, content, character_name):
         """
@@ -238,24 +223,9 @@ class ConsistencyValidator:
         Returns:
             bool: 是否符合规则
         """
-        lines = content.split('\n')
-        has_appearance = False
-        has_floating_text = False
-        appearance_line = 0
-        floating_text_line = 0
-        
-        for i, line in enumerate(lines, 1):
-            if character_name in line and line.startswith('△') and '金色字体' not in line:
-                has_appearance = True
-                appearance_line = i
-            if character_name in line and '金色字体' in line:
-                has_floating_text = True
-                floating_text_line = i
-        
-        if has_appearance and has_floating_text:
-            return appearance_line < floating_text_line
-        
-        return True
+        rule = CharacterIntroRule(character_name)
+        self.line_engine.run(content, [rule])
+        return rule.is_valid
     
     def validate_scene_description(self, content):
         """
@@ -267,12 +237,4 @@ class ConsistencyValidator:
         Returns:
             list: 问题列表
         """
-        issues = []
-        lines = content.split('\n')
-        
-        for i, line in enumerate(lines, 1):
-            if line.startswith('△') and '金色字体' not in line:
-                if '，' not in line and '。' not in line:
-                    issues.append(f"第{i}行：场景描写格式不正确，应为'时间+地点+物品+状态'格式")
-        
-        return issues
+        return self.line_engine.run(content, [SceneDescriptionRule()])[0]
@@ -28,6 +28,10 @@ class FirstEpisodeGenerator:
         self.writing_techniques = WritingTechniques()
         self.description_optimizer = DescriptionOptimizer()
     
+    def reset(self):
+        """第一集生成器没有单次生成的状态，供生成器池统一调用"""
+        pass
+    
     def generate(self, episode, outline):
         """
         生成第一集剧本
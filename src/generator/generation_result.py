@@ -0,0 +1,123 @@
+# 生成结果
+# 剧本内容、内容哈希和验证结果一起在生成、验证、保存之间传递，同一版本的内容只验证一次
+
+from data.build_manifest import text_hash
+
+
+class GenerationResult:
+    """
+    单集剧本的生成结果
+    
+    保存剧本内容、内容哈希、验证结果和生成时读取过的数据的依赖哈希。
+    验证结果按内容缓存：同一个结果对象只验证一次，之后直接返回已有的验证结果。
+    内容不可修改，修改后的剧本应创建新的结果对象。
+    """
+    
+    __slots__ = ("episode", "content", "content_hash", "validation", "dependencies")
+    
+    def __init__(self, episode, content, validation=None, dependencies=None, content_hash=None):
+        """
+        初始化生成结果
+        
+        Args:
+            episode (int): 集数
+            content (str): 剧本内容
+            validation (dict, optional): 已有的验证结果
+            dependencies (dict, optional): 依赖键到内容哈希的字典
+            content_hash (str, optional): 已知的内容哈希，默认根据内容计算
+        """
+        self.episode = episode
+        self.content = content
+        self.content_hash = content_hash or text_hash(content)
+        self.validation = validation
+        self.dependencies = dependencies or {}
+    
+    @property
+    def is_validated(self):
+        """是否已经验证过"""
+        return self.validation is not None
+    
+    @property
+    def issues(self):
+        """验证问题列表（未验证时为空）"""
+        return self.validation.get("issues", []) if self.validation else []
+    
+    def validate(self, validator):
+        """
+        验证剧本内容（已验证过时直接返回已有结果）
+        
+        Args:
+            validator (ConsistencyValidator): 一致性验证器
+            
+        Returns:
+            dict: 验证结果
+        """
+        if self.validation is None:
+            self.validation = validator.validate(self.episode, self.content)
+        return self.validation
+
+
+class ResultCache:
+    """
+    生成结果缓存
+    
+    按集数保存最近一次的生成结果。按内容查找时先比较内容哈希，
+    内容未变化时返回缓存的结果（连同已有的验证结果），否则创建新的结果替换旧结果。
+    """
+    
+    def __init__(self):
+        """初始化生成结果缓存"""
+        self.results = {}
+    
+    def get(self, episode):
+        """
+        获取指定集数最近一次的生成结果
+        
+        Args:
+            episode (int): 集数
+            
+        Returns:
+            GenerationResult: 生成结果，没有时返回None
+        """
+        return self.results.get(episode)
+    
+    def put(self, result):
+        """
+        保存生成结果（替换同一集的旧结果；内容相同且旧结果已验证时保留验证结果）
+        
+        Args:
+            result (GenerationResult): 生成结果
+            
+        Returns:
+            GenerationResult: 保存的生成结果
+        """
+        cached = self.results.get(result.episode)
+        if (
+            result.validation is None
+            and cached is not None
+            and cached.content_hash == result.content_hash
+        ):
+            result.validation = cached.validation
+        self.results[result.episode] = result
+        return result
+    
+    def lookup(self, episode, content):
+        """
+        按内容查找生成结果，内容与缓存的不同时创建新的结果
+        
+        Args:
+            episode (int): 集数
+            content (str): 剧本内容
+            
+        Returns:
+            GenerationResult: 生成结果
+        """
+        content_hash = text_hash(content)
+        cached = self.results.get(episode)
+        if cached is not None and cached.content_hash == content_hash:
+            return cached
+        return self.put(GenerationResult(episode, content, content_hash=content_hash))
+    
+    def clear(self):
+        """清空缓存（如重新解析文档或修改验证规则后）"""
+        self.results = {}
@@ -0,0 +1,146 @@
+# 生成器池
+# 按集数类型保存常驻的剧本生成器，批量生成和API生成时重复使用，不再每集重新构建
+
+from generator.state_tracker import StateTracker
+from generator.generation_result import GenerationResult
+
+# 集数类型
+EPISODE_FIRST = 'first'    # 第一集
+EPISODE_SECOND = 'second'  # 第二集
+EPISODE_SMART = 'smart'    # 其他集数（智能生成）
+
+
+def episode_type(episode):
+    """
+    判断集数对应的生成器类型
+    
+    Args:
+        episode (int): 集数
+        
+    Returns:
+        str: 集数类型
+    """
+    if episode == 1:
+        return EPISODE_FIRST
+    if episode == 2:
+        return EPISODE_SECOND
+    return EPISODE_SMART
+
+
+class GeneratorPool:
+    """
+    生成器池
+    
+    每种集数类型只构建一个生成器，所有生成器共用同一个状态跟踪器。
+    每次取出生成器前先调用其 reset()，清空上一集遗留的单次生成状态
+    （如已出场人物、已出现场景），并把状态跟踪器打开到上一集的检查点，
+    生成时读取的是本集开始前的状态，无需加载完整历史。
+    
+    生成器不是线程安全的，同一个池不应在多个线程中同时使用。
+    """
+    
+    def __init__(self, config_manager, data_manager, state_tracker=None):
+        """
+        初始化生成器池
+        
+        Args:
+            config_manager (ConfigManager): 配置管理器
+            data_manager (DataManager): 数据管理器
+            state_tracker (StateTracker, optional): 共用的状态跟踪器，默认新建
+        """
+        self.config_manager = config_manager
+        self.data_manager = data_manager
+        self.state_tracker = state_tracker or StateTracker(data_manager, config_manager)
+        self.generators = {}
+    
+    def get(self, episode):
+        """
+        取出适用于指定集数的生成器（已重置）
+        
+        Args:
+            episode (int): 集数
+            
+        Returns:
+            生成器实例
+        """
+        # 并行生成时上一集的检查点可能尚未写入，此时使用之前最近一集的检查点
+        self.state_tracker.open_at(episode - 1)
+        kind = episode_type(episode)
+        generator = self.generators.get(kind)
+        if generator is None:
+            generator = self._create(kind)
+            self.generators[kind] = generator
+        generator.reset()
+        return generator
+    
+    def generate(self, episode, outline):
+        """
+        用池中的生成器生成剧本
+        
+        Args:
+            episode (int): 集数
+            outline (dict): 剧情大纲
+            
+        Returns:
+            str: 生成的剧本内容
+        """
+        return self.get(episode).generate(episode, outline)
+    
+    def generate_result(self, episode, outline, validate=True):
+        """
+        用池中的生成器生成剧本，返回生成结果
+        
+        生成时已验证的生成器（智能生成）连同验证结果一起返回；
+        其他生成器的结果未验证，需要时再验证。
+        
+        Args:
+            episode (int): 集数
+            outline (dict): 剧情大纲
+            validate (bool): 是否在生成时验证
+            
+        Returns:
+            GenerationResult: 生成结果
+        """
+        generator = self.get(episode)
+        if hasattr(generator, "generate_result"):
+            return generator.generate_result(episode, outline, validate)
+        return GenerationResult(episode, generator.generate(episode, outline))
+    
+    def generate_iter(self, episode, outline):
+        """
+        用池中的生成器逐块生成剧本（不支持逐块生成的生成器整集作为一块产出）
+        
+        Args:
+            episode (int): 集数
+            outline (dict): 剧情大纲
+            
+        Returns:
+            iterator: 剧本内容块，按顺序拼接即为完整剧本
+        """
+        generator = self.get(episode)
+        if hasattr(generator, "generate_iter"):
+            return generator.generate_iter(episode, outline)
+        return iter((generator.generate(episode, outline),))
+    
+    def clear(self):
+        """丢弃所有生成器（如重新解析文档后），下次使用时重新构建"""
+        self.generators = {}
+    
+    def _create(self, kind):
+        """
+        构建指定类型的生成器
+        
+        Args:
+            kind (str): 集数类型
+            
+        Returns:
+            生成器实例
+        """
+        if kind == EPISODE_FIRST:
+            from generator.first_episode import FirstEpisodeGenerator
+            return FirstEpisodeGenerator(self.config_manager, self.data_manager)
+        if kind == EPISODE_SECOND:
+            from generator.second_episode import SecondEpisodeGenerator
+            return SecondEpisodeGenerator(self.config_manager, self.data_manager)
+        from generator.smart_episode_generator import SmartEpisodeGenerator
+        return SmartEpisodeGenerator(self.config_manager, self.data_manager, self.state_tracker)
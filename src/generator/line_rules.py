@@ -0,0 +1,303 @@
+# 逐行验证引擎
+# 负责把剧本拆分为行并分类一次，再把分类后的行依次交给各条验证规则
+
+import re
+
+from utils.phrase_scanner import FORBIDDEN_SCANNER, LINE_FORBIDDEN_PATTERNS
+
+# 行类型
+LINE_BLANK = 'blank'                # 空行
+LINE_ACTION = 'action'              # △动作/场景描写
+LINE_GOLD_LABEL = 'gold_label'      # △金色字体标注
+LINE_SYSTEM_PANEL = 'system_panel'  # △系统面板
+LINE_SOUND = 'sound'                # 声音提示
+LINE_OS = 'os'                      # 内心独白（OS）
+LINE_DIALOGUE = 'dialogue'          # 台词
+LINE_COLOR = 'color'                # 颜色标记行（【GREEN】、【绿色】等开头）
+LINE_TEXT = 'text'                  # 其他文本（标题、场景号等）
+
+# △开头的行类型
+ACTION_LINE_TYPES = (LINE_ACTION, LINE_GOLD_LABEL, LINE_SYSTEM_PANEL)
+
+# 行首颜色标记
+COLOR_MARKER_PATTERN = re.compile(r'【(GREEN|YELLOW|BLUE|绿色|黄色|蓝色)】')
+
+
+class ScriptLine:
+    """
+    分类后的剧本行
+    """
+    
+    __slots__ = ("number", "text", "kind", "marker", "hits")
+    
+    def __init__(self, number, text, kind, marker=None):
+        """
+        初始化剧本行
+        
+        Args:
+            number (int): 行号（从1开始）
+            text (str): 原始行文本
+            kind (str): 行类型
+            marker (str, optional): 行首颜色标记
+        """
+        self.number = number
+        self.text = text
+        self.kind = kind
+        self.marker = marker
+        # 该行的禁止用语命中（仅在有规则需要时填充）
+        self.hits = []
+    
+    @property
+    def is_action(self):
+        """是否为△开头的行"""
+        return self.kind in ACTION_LINE_TYPES
+
+
+def classify_line(number, text):
+    """
+    判断剧本行的类型
+    
+    Args:
+        number (int): 行号
+        text (str): 原始行文本
+        
+    Returns:
+        ScriptLine: 分类后的剧本行
+    """
+    if not text.strip():
+        return ScriptLine(number, text, LINE_BLANK)
+    
+    if text.startswith('△'):
+        if '金色字体' in text:
+            return ScriptLine(number, text, LINE_GOLD_LABEL)
+        if text.startswith('△系统面板：'):
+            return ScriptLine(number, text, LINE_SYSTEM_PANEL)
+        return ScriptLine(number, text, LINE_ACTION)
+    
+    match = COLOR_MARKER_PATTERN.match(text)
+    if match:
+        return ScriptLine(number, text, LINE_COLOR, match.group(1))
+    
+    if text.startswith('声音提示：'):
+        return ScriptLine(number, text, LINE_SOUND)
+    if '（OS）：' in text:
+        return ScriptLine(number, text, LINE_OS)
+    if '：' in text:
+        return ScriptLine(number, text, LINE_DIALOGUE)
+    return ScriptLine(number, text, LINE_TEXT)
+
+
+class LineRule:
+    """
+    逐行验证规则基类
+    
+    子类实现 check_line 逐行检查，需要看完全文才能下结论的规则在 finish 中收尾。
+    kinds 为规则关心的行类型（None 表示所有行），引擎只把这些类型的行交给规则；
+    needs_hits 为 True 时引擎会先扫描禁止用语，并把命中挂到每一行上。
+    """
+    
+    kinds = None
+    needs_hits = False
+    
+    def reset(self):
+        """开始验证新剧本前清空问题列表"""
+        self.issues = []
+    
+    def check_line(self, line):
+        """
+        检查一行
+        
+        Args:
+            line (ScriptLine): 分类后的剧本行
+        """
+        pass
+    
+    def finish(self, line_count):
+        """
+        全部行检查完毕
+        
+        Args:
+            line_count (int): 总行数
+        """
+        pass
+
+
+class ForbiddenPatternRule(LineRule):
+    """
+    禁止模式：行中出现眼神、声音（声音提示除外）、心里、比喻等描写
+    """
+    
+    needs_hits = True
+    
+    def __init__(self):
+        # （类别，用语）对应的模式序号
+        self.pattern_indexes = {}
+        for index, (_, category, phrase) in enumerate(LINE_FORBIDDEN_PATTERNS):
+            self.pattern_indexes.setdefault((category, phrase), []).append(index)
+        self.reset()
+    
+    def check_line(self, line):
+        matched = set()
+        for hit in line.hits:
+            indexes = self.pattern_indexes.get((hit.category, hit.phrase))
+            if not indexes:
+                continue
+            # 「声音提示：」是音效标注，不算声音描写
+            if hit.phrase == "声音" and line.text.startswith("提示：", hit.column - 1 + len(hit.phrase)):
+                continue
+            matched.update(indexes)
+        
+        for index in sorted(matched):
+            pattern = LINE_FORBIDDEN_PATTERNS[index][0]
+            self.issues.append(f"第{line.number}行：发现禁止模式【{pattern}】：{line.text.strip()}")
+
+
+class DescriptionLengthRule(LineRule):
+    """
+    描写长度：△描写超过50字时建议拆分
+    """
+    
+    kinds = ACTION_LINE_TYPES
+    
+    def __init__(self, max_length=50):
+        """
+        Args:
+            max_length (int): 单条描写的最大字数
+        """
+        self.max_length = max_length
+        self.reset()
+    
+    def check_line(self, line):
+        desc = line.text[1:].strip()
+        if len(desc) > self.max_length:
+            self.issues.append(f"第{line.number}行：描写过长（{len(desc)}字），建议拆分：{desc[:30]}...")
+
+
+class ConsecutiveDeltaRule(LineRule):
+    """
+    连续△数量：超过4个连续△时建议穿插对话或声音
+    """
+    
+    def __init__(self, max_count=4):
+        """
+        Args:
+            max_count (int): 允许连续出现的△数量
+        """
+        self.max_count = max_count
+        self.reset()
+    
+    def reset(self):
+        self.issues = []
+        self.count = 0
+        self.start_line = 0
+    
+    def check_line(self, line):
+        if line.is_action:
+            if self.count == 0:
+                self.start_line = line.number
+            self.count += 1
+        else:
+            self._close(line.number - 1)
+    
+    def finish(self, line_count):
+        self._close(line_count)
+    
+    def _close(self, end_line):
+        """结束一段连续△"""
+        if self.count > self.max_count:
+            self.issues.append(f"第{self.start_line}-{end_line}行：连续{self.count}个△，建议穿插对话或声音")
+        self.count = 0
+
+
+class SceneDescriptionRule(LineRule):
+    """
+    场景描写格式：△描写（金色字体标注除外）应包含逗号或句号
+    """
+    
+    kinds = (LINE_ACTION, LINE_SYSTEM_PANEL)
+    
+    def __init__(self):
+        self.reset()
+    
+    def check_line(self, line):
+        if '，' not in line.text and '。' not in line.text:
+            self.issues.append(f"第{line.number}行：场景描写格式不正确，应为'时间+地点+物品+状态'格式")
+
+
+class CharacterIntroRule(LineRule):
+    """
+    人物出场顺序：人物的△出场描写应在金色字体标注之前
+    """
+    
+    def __init__(self, character_name):
+        """
+        Args:
+            character_name (str): 人物名称
+        """
+        self.character_name = character_name
+        self.reset()
+    
+    def reset(self):
+        self.issues = []
+        self.appearance_line = 0
+        self.floating_text_line = 0
+    
+    def check_line(self, line):
+        if self.character_name not in line.text:
+            return
+        has_floating_text = '金色字体' in line.text
+        if line.is_action and not has_floating_text:
+            self.appearance_line = line.number
+        if has_floating_text:
+            self.floating_text_line = line.number
+    
+    @property
+    def is_valid(self):
+        """出场描写和金色字体标注都存在时，出场描写是否在前"""
+        if self.appearance_line and self.floating_text_line:
+            return self.appearance_line < self.floating_text_line
+        return True
+
+
+class LineValidationEngine:
+    """
+    逐行验证引擎
+    
+    剧本只拆分、分类一次，然后按行类型分发给各条规则；增加规则不会增加扫描次数。
+    """
+    
+    def run(self, content, rules):
+        """
+        用一组规则验证剧本
+        
+        Args:
+            content (str): 剧本内容
+            rules (list): LineRule 列表
+            
+        Returns:
+            list: 与 rules 一一对应的问题列表
+        """
+        for rule in rules:
+            rule.reset()
+        
+        lines = [classify_line(number, text) for number, text in enumerate(content.split('\n'), 1)]
+        
+        # 有规则需要时，一次扫描禁止用语并挂到对应行上
+        if any(rule.needs_hits for rule in rules):
+            for hit in FORBIDDEN_SCANNER.scan(content):
+                lines[hit.line - 1].hits.append(hit)
+        
+        # 按行类型预先分好每类行要交给哪些规则
+        dispatch = {}
+        for line in lines:
+            targets = dispatch.get(line.kind)
+            if targets is None:
+                targets = [rule for rule in rules if rule.kinds is None or line.kind in rule.kinds]
+                dispatch[line.kind] = targets
+            for rule in targets:
+                rule.check_line(line)
+        
+        for rule in rules:
+            rule.finish(len(lines))
+        
+        return [rule.issues for rule in rules]
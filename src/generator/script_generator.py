@@ -2,8 +2,48 @@
 # 负责协调各个生成器的工作，生成符合要求的剧本
 
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from utils.config_manager import ConfigManager
 from data.data_manager import DataManager
+from data.build_manifest import BuildManifest, DependencyRecorder, code_fingerprint
+from data.script_writer import ScriptWriter
+from generator.generator_pool import GeneratorPool
+from generator.generation_result import GenerationResult, ResultCache
+from generator.consistency_validator import ConsistencyValidator
+from generator.batch_pipeline import BatchPipeline
+
+# 子进程中的剧本生成器，由进程池初始化时创建，同一进程内的各集共用
+_worker_generator = None
+
+
+def _init_worker(config_manager, data_manager):
+    """
+    进程池初始化函数：每个子进程只接收一次配置和解析数据
+    
+    Args:
+        config_manager (ConfigManager): 配置管理器
+        data_manager (DataManager): 数据管理器
+    """
+    global _worker_generator
+    _worker_generator = ScriptGenerator(config_manager, data_manager)
+
+
+def _build_episode(episode, validate=True):
+    """
+    在子进程中生成单集剧本（不保存，文件由主进程按集数顺序写入）
+    
+    Args:
+        episode (int): 集数
+        validate (bool): 是否在生成时验证
+        
+    Returns:
+        tuple: （生成结果，耗时秒数）
+    """
+    start_time = time.perf_counter()
+    result = _worker_generator.build_result(episode, validate)
+    return result, time.perf_counter() - start_time
 
 
 class ScriptGenerator:
@@ -24,12 +64,23 @@ class ScriptGenerator:
         self.config_manager = config_manager or ConfigManager()
         self.data_manager = data_manager or DataManager()
         self.output_dir = self.config_manager.get_output_dir()
+        # 常驻的各类型生成器，各集重复使用
+        self.generator_pool = GeneratorPool(self.config_manager, self.data_manager)
+        # 最近一次批量生成中各集的生成耗时（秒）
+        self.timings = {}
+        # 最近一次批量生成中流水线各阶段的吞吐统计
+        self.pipeline_stats = {}
         
         os.makedirs(self.output_dir, exist_ok=True)
+        # 剧本文件写入器，内容未变化的剧集不重写文件
+        self.script_writer = ScriptWriter(self.output_dir, self.config_manager.get_script_hash_file())
+        # 最近生成或验证过的各集结果（连同验证结果），验证时不再重新读取、验证文件
+        self.result_cache = ResultCache()
+        self.validator = ConsistencyValidator(self.generator_pool.state_tracker)
     
     def generate_script(self, episode):
         """
-        生成指定集数的剧本
+        生成指定集数的剧本并保存，同时更新构建清单
         
         Args:
             episode (int): 集数
@@ -37,45 +88,234 @@ class ScriptGenerator:
         Returns:
             str: 生成的剧本内容
         """
-        outline = self.data_manager.get_outline(episode)
+        return self.generate_result(episode).content
+    
+    def generate_result(self, episode):
+        """
+        生成指定集数的剧本并保存，同时更新构建清单和剧集状态
         
-        if episode == 1:
-            from generator.first_episode import FirstEpisodeGenerator
-            generator = FirstEpisodeGenerator(self.config_manager, self.data_manager)
-        elif episode == 2:
-            from generator.second_episode import SecondEpisodeGenerator
-            generator = SecondEpisodeGenerator(self.config_manager, self.data_manager)
-        else:
-            from generator.smart_episode_generator import SmartEpisodeGenerator
-            generator = SmartEpisodeGenerator(self.config_manager, self.data_manager)
+        Args:
+            episode (int): 集数
+            
+        Returns:
+            GenerationResult: 生成结果（含验证结果，之后验证该集时直接使用）
+        """
+        result = self.build_result(episode)
         
-        script_content = generator.generate(episode, outline)
+        self.save_result(result)
+        self.record_state(result)
+        
+        manifest = BuildManifest(self.config_manager.get_build_manifest_file())
+        manifest.record(episode, result.dependencies, result.content, code_fingerprint())
+        manifest.save()
+        
+        return result
+    
+    def build_script(self, episode):
+        """
+        生成指定集数的剧本内容（不保存）
+        
+        Args:
+            episode (int): 集数
+            
+        Returns:
+            str: 生成的剧本内容
+        """
+        outline = self.data_manager.get_outline(episode)
+        return self.generator_pool.generate(episode, outline)
+    
+    def build_result(self, episode, validate=True):
+        """
+        生成指定集数的剧本（不保存），同时记录生成时读取过的数据
         
-        self.save_script(episode, script_content)
+        Args:
+            episode (int): 集数
+            validate (bool): 是否在生成时验证（批量生成时由验证阶段统一验证）
+            
+        Returns:
+            GenerationResult: 生成结果，dependencies 为依赖键到内容哈希的字典
+        """
+        # 记录器只挂在当前线程上，共用数据管理器的其他生成线程不受影响
+        recorder = DependencyRecorder()
+        self.data_manager.set_recorder(recorder)
+        try:
+            outline = self.data_manager.get_outline(episode)
+            result = self.generator_pool.generate_result(episode, outline, validate)
+        finally:
+            self.data_manager.set_recorder(None)
+        result.dependencies = recorder.hashes()
+        return result
+    
+    def iter_script(self, episode):
+        """
+        逐块生成指定集数的剧本（不保存），供边生成边输出的调用方使用
         
-        return script_content
+        Args:
+            episode (int): 集数
+            
+        Returns:
+            iterator: 剧本内容块，按顺序拼接即为完整剧本
+        """
+        outline = self.data_manager.get_outline(episode)
+        return self.generator_pool.generate_iter(episode, outline)
     
-    def generate_all_scripts(self, start_episode=1, end_episode=70):
+    def generate_all_scripts(self, start_episode=1, end_episode=70, jobs=None, incremental=False):
         """
         生成所有集数的剧本
         
+        各集剧本相互独立，进程数大于1时分发到多个进程并行生成；
+        生成、验证、保存按流水线执行，阶段之间用有界队列连接。
+        剧本始终由主进程按集数顺序保存，输出顺序和文件名与串行生成一致。
+        每集保存后记录本集的状态并写入状态检查点，之后各集生成时从上一集的检查点读取状态；
+        每集生成时读取过的人物、场景、设定条目和大纲字段记录在构建清单中；
+        增量生成时只重新生成依赖、生成代码或剧本文件有变化的剧集。
+        
         Args:
             start_episode (int): 开始集数
             end_episode (int): 结束集数
+            jobs (int): 并行生成的进程数，1为串行，0为使用全部CPU核心，默认使用配置
+            incremental (bool): 是否增量生成
             
         Returns:
-            dict: 生成的剧本字典，键为集数，值为剧本内容
+            dict: 生成的剧本字典，键为集数，值为剧本内容（增量生成时只含重新生成的剧集）
         """
+        episodes = list(range(start_episode, end_episode + 1))
+        manifest = BuildManifest(self.config_manager.get_build_manifest_file())
+        code = code_fingerprint()
+        
+        if incremental:
+            pending = []
+            for episode in episodes:
+                filename = os.path.basename(self.get_script_path(episode))
+                reason = manifest.stale_reason(
+                    episode, self.data_manager, code,
+                    partial(self.script_writer.is_unchanged, filename)
+                )
+                if reason is None:
+                    print(f"第{episode}集输入未变化，跳过")
+                else:
+                    print(f"第{episode}集需要重新生成：{reason}")
+                    pending.append(episode)
+            print(f"增量生成：{len(pending)} 集需要重新生成，{len(episodes) - len(pending)} 集跳过")
+            episodes = pending
+        
+        if jobs is None:
+            jobs = self.config_manager.get_generation_jobs()
+        if jobs == 0:
+            jobs = os.cpu_count() or 1
+        jobs = min(jobs, len(episodes))
+        
         scripts = {}
+        self.timings = {}
+        start_time = time.perf_counter()
         
-        for episode in range(start_episode, end_episode + 1):
-            print(f"生成第{episode}集剧本...")
-            script_content = self.generate_script(episode)
-            scripts[episode] = script_content
-            print(f"第{episode}集剧本生成完成")
+        def validate_stage(item):
+            result, elapsed = item
+            validation_result = self.validate_result(result)
+            if not validation_result["is_valid"]:
+                print(f"第{result.episode}集验证发现问题：")
+                for issue in validation_result["issues"]:
+                    print(f"  - {issue}")
+            return item
+        
+        def write_stage(item):
+            result, elapsed = item
+            episode = result.episode
+            scripts[episode] = result.content
+            self.timings[episode] = elapsed
+            self.save_result(result)
+            self.record_state(result)
+            manifest.record(episode, result.dependencies, result.content, code)
+            print(f"第{episode}集剧本生成完成（耗时 {elapsed:.3f} 秒）")
+        
+        # 生成、验证、保存三个阶段流水线执行：保存第N集时已在验证、生成之后的剧集
+        pipeline = BatchPipeline(
+            [("validate", validate_stage), ("write", write_stage)],
+            self.config_manager.get_pipeline_queue_size()
+        )
+        
+        # 批量写入：各集先写临时文件，按批同步到磁盘后再替换
+        self.script_writer.begin_batch()
+        try:
+            self.pipeline_stats = pipeline.run(self._iter_built_scripts(episodes, jobs), "generate")
+        except BaseException:
+            # 中途出错时已生成的剧集仍写入文件并记入清单，同步失败只提示，不掩盖流水线的异常
+            self._finish_batch(manifest, raise_errors=False)
+            raise
+        self._finish_batch(manifest)
+        
+        if episodes:
+            total = time.perf_counter() - start_time
+            print(f"共生成 {len(scripts)} 集剧本，总耗时 {total:.3f} 秒，单集生成耗时合计 {sum(self.timings.values()):.3f} 秒")
+            for stats in self.pipeline_stats.values():
+                print(f"  {stats}")
         
         return scripts
     
+    def _finish_batch(self, manifest, raise_errors=True):
+        """
+        结束批量写入：同步并替换剩余的剧本文件，再保存构建清单
+        
+        Args:
+            manifest (BuildManifest): 构建清单
+            raise_errors (bool): 同步失败时是否抛出异常（否则只提示）
+        """
+        try:
+            self.script_writer.end_batch()
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"同步剧本文件失败: {e}")
+        finally:
+            # 替换失败的剧集不在剧本哈希清单中，下次增量生成时会重新生成
+            manifest.save()
+    
+    def _iter_built_scripts(self, episodes, jobs):
+        """
+        按集数顺序逐个返回生成结果（未验证），进程数大于1时在进程池中生成
+        
+        Args:
+            episodes (list): 集数列表
+            jobs (int): 进程数
+            
+        Yields:
+            tuple: （生成结果，耗时秒数）
+        """
+        if jobs > 1:
+            try:
+                executor = ProcessPoolExecutor(
+                    max_workers=jobs,
+                    initializer=_init_worker,
+                    initargs=(self.config_manager, self.data_manager)
+                )
+            except Exception as e:
+                # 无法创建进程池时（如受限环境）退回串行生成
+                print(f"创建进程池失败，改为串行生成: {e}")
+            else:
+                with executor:
+                    print(f"使用 {jobs} 个进程并行生成第{episodes[0]}集到第{episodes[-1]}集剧本...")
+                    # map 按提交顺序返回结果，后面的集数先完成时也会等待前面的集数
+                    yield from executor.map(partial(_build_episode, validate=False), episodes)
+                return
+        
+        for episode in episodes:
+            print(f"生成第{episode}集剧本...")
+            start_time = time.perf_counter()
+            result = self.build_result(episode, validate=False)
+            yield result, time.perf_counter() - start_time
+    
+    def get_script_path(self, episode):
+        """
+        剧本文件路径
+        
+        Args:
+            episode (int): 集数
+            
+        Returns:
+            str: 文件路径
+        """
+        return os.path.join(self.output_dir, f"第{episode}集.md")
+    
     def save_script(self, episode, content):
         """
         保存剧本到文件
@@ -84,15 +324,56 @@ class ScriptGenerator:
             episode (int): 集数
             content (str): 剧本内容
         """
-        file_path = os.path.join(self.output_dir, f"第{episode}集.md")
+        self.save_result(GenerationResult(episode, content))
+    
+    def save_result(self, result):
+        """
+        保存生成结果到文件，并记入结果缓存
+        
+        内容与上次写入的相同且文件未被改动时跳过写入；否则先写临时文件再替换。
+        批量生成期间文件在批次同步时才替换到位，替换成功后才提示已保存。
+        
+        Args:
+            result (GenerationResult): 生成结果
+        """
+        file_path = self.get_script_path(result.episode)
+        filename = os.path.basename(file_path)
+        self.result_cache.put(result)
         
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            print(f"剧本已保存到: {file_path}")
+            if not self.script_writer.write(filename, result.content, result.content_hash):
+                print(f"剧本未变化，跳过写入: {file_path}")
+            elif self.script_writer.is_pending(filename):
+                print(f"剧本已加入写入队列，批次同步时保存: {file_path}")
         except Exception as e:
             print(f"保存剧本失败: {e}")
     
+    def record_state(self, result):
+        """
+        记录一集的状态更新（本集事件和出场人物的阶段、身份），并写入本集的状态检查点
+        
+        本集事件取自剧情大纲的事件结果（没有时使用主线进展），出场人物按别名索引从剧本中识别。
+        
+        Args:
+            result (GenerationResult): 生成结果
+        """
+        episode = result.episode
+        state_tracker = self.generator_pool.state_tracker
+        outline = self.data_manager.get_outline(episode) or {}
+        event = (outline.get("event_logic") or {}).get("result") or outline.get("main_progress")
+        events = [event] if event else []
+        
+        try:
+            alias_index = self.data_manager.get_alias_index()
+            for name in alias_index.find_characters(result.content):
+                state_tracker.record_entity_state("characters", name, episode, {
+                    "stage": state_tracker.get_character_stage(name, episode),
+                    "identity": state_tracker.get_character_identity(name, episode)
+                })
+            state_tracker.update_episode_state(episode, events)
+        except Exception as e:
+            print(f"更新第{episode}集状态失败: {e}")
+    
     def load_script(self, episode):
         """
         加载已生成的剧本
@@ -103,7 +384,7 @@ class ScriptGenerator:
         Returns:
             str: 剧本内容或空字符串
         """
-        file_path = os.path.join(self.output_dir, f"第{episode}集.md")
+        file_path = self.get_script_path(episode)
         
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -117,21 +398,34 @@ class ScriptGenerator:
         """
         验证剧本
         
+        本次运行中保存过该集且剧本文件未被改动时，直接使用保存时的生成结果
+        （生成时已验证的不再重复验证）；否则读取剧本文件，内容与缓存的结果相同时
+        同样复用验证结果。
+        
         Args:
             episode (int): 集数
             
         Returns:
             list: 验证问题列表
         """
-        from generator.consistency_validator import ConsistencyValidator
-        from generator.state_tracker import StateTracker
-        
-        state_tracker = StateTracker(self.data_manager)
-        validator = ConsistencyValidator(state_tracker)
+        result = self.result_cache.get(episode)
+        filename = os.path.basename(self.get_script_path(episode))
+        if result is None or not self.script_writer.is_unchanged(filename, result.content_hash):
+            content = self.load_script(episode)
+            if not content:
+                return ["无法加载剧本内容"]
+            result = self.result_cache.lookup(episode, content)
         
-        content = self.load_script(episode)
-        if not content:
-            return ["无法加载剧本内容"]
+        return self.validate_result(result).get("issues", [])
+    
+    def validate_result(self, result):
+        """
+        验证生成结果（已验证过时直接返回已有的验证结果）
         
-        result = validator.validate(episode, content)
-        return result.get("issues", [])
+        Args:
+            result (GenerationResult): 生成结果
+            
+        Returns:
+            dict: 验证结果
+        """
+        return result.validate(self.validator)
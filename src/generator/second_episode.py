@@ -24,6 +24,10 @@ class SecondEpisodeGenerator:
         self.color_marker = ColorMarker()
         self.sound_generator = SoundGenerator()
     
+    def reset(self):
+        """第二集生成器没有单次生成的状态，供生成器池统一调用"""
+        pass
+    
     def generate(self, episode, outline):
         """
         生成第二集剧本
@@ -1,8 +1,11 @@
 # 智能剧本生成器
 # 负责根据剧情大纲动态生成剧本，无需单独的生成器文件
 
+from collections.abc import Mapping
+
 from generator.state_tracker import StateTracker
 from generator.consistency_validator import ConsistencyValidator
+from generator.generation_result import GenerationResult
 from generator.components.character_intro import CharacterIntroComponent
 from generator.components.scene_description import SceneDescriptionComponent
 from generator.components.action_chain import ActionChainComponent
@@ -10,7 +13,6 @@ from generator.components.dialogue import DialogueComponent
 from generator.components.system_panel import SystemPanelComponent
 from generator.components.color_marker import ColorMarkerComponent
 
-
 class SmartEpisodeGenerator:
     """
     智能剧本生成器
@@ -18,18 +20,19 @@ class SmartEpisodeGenerator:
     负责根据剧情大纲动态生成剧本，无需单独的生成器文件
     """
     
-    def __init__(self, config_manager, data_manager):
+    def __init__(self, config_manager, data_manager, state_tracker=None):
         """
         初始化智能生成器
         
         Args:
             config_manager (ConfigManager): 配置管理器
             data_manager (DataManager): 数据管理器
+            state_tracker (StateTracker, optional): 共用的状态跟踪器，默认新建
         """
         self.config_manager = config_manager
         self.data_manager = data_manager
         
-        self.state_tracker = StateTracker(data_manager)
+        self.state_tracker = state_tracker or StateTracker(data_manager, config_manager)
         self.validator = ConsistencyValidator(self.state_tracker)
         
         self.character_intro = CharacterIntroComponent(self.state_tracker)
@@ -41,6 +44,13 @@ class SmartEpisodeGenerator:
         
         self.introduced_characters = set()
         self.introduced_scenes = set()
+        # 最近一次逐块生成完成后的生成结果
+        self.last_result = None
+    
+    def reset(self):
+        """清空单次生成的状态（已出场人物、已出现场景），生成器可继续用于下一集"""
+        self.introduced_characters.clear()
+        self.introduced_scenes.clear()
     
     def generate(self, episode, outline):
         """
@@ -53,18 +63,62 @@ class SmartEpisodeGenerator:
         Returns:
             str: 生成的剧本内容
         """
-        self.introduced_characters = set()
-        self.introduced_scenes = set()
+        return self.generate_result(episode, outline).content
+    
+    def generate_result(self, episode, outline, validate=True):
+        """
+        生成剧本，返回带内容哈希和验证结果的生成结果
         
-        script_content = self.build_script_structure(episode, outline)
+        Args:
+            episode (int): 集数
+            outline (dict): 剧情大纲
+            validate (bool): 是否验证剧本并打印问题
+            
+        Returns:
+            GenerationResult: 生成结果，验证结果随结果传给保存和后续验证，不再重复验证
+        """
+        for _ in self.generate_iter(episode, outline, validate, keep_result=True):
+            pass
+        return self.last_result
+    
+    def generate_iter(self, episode, outline, validate=True, keep_result=False):
+        """
+        逐块生成剧本：依次产出剧本头（标题、出场人物、场景列表）和
+        起因、经过、结果、钩子各场景，调用方可以边生成边写出。
         
-        validation_result = self.validator.validate(episode, script_content)
-        if not validation_result["is_valid"]:
-            print(f"第{episode}集验证发现问题：")
-            for issue in validation_result["issues"]:
-                print(f"  - {issue}")
+        只有验证或 keep_result 为真时才在内存中拼接整集剧本，全部产出后生成结果
+        保存在 last_result 中；两者都为假时不保留剧本副本，last_result 为None，
+        内存占用只与单个内容块有关。
         
-        return script_content
+        Args:
+            episode (int): 集数
+            outline (dict): 剧情大纲
+            validate (bool): 全部产出后是否验证整集剧本并打印问题
+            keep_result (bool): 不验证时是否仍保留整集剧本，生成 last_result
+            
+        Yields:
+            str: 剧本内容块，按顺序拼接即为完整剧本
+        """
+        self.reset()
+        self.last_result = None
+        
+        buffered = validate or keep_result
+        blocks = []
+        for block in self.iter_script_blocks(episode, outline):
+            if buffered:
+                blocks.append(block)
+            yield block
+        
+        if not buffered:
+            return
+        result = GenerationResult(episode, "".join(blocks))
+        if validate:
+            validation_result = result.validate(self.validator)
+            if not validation_result["is_valid"]:
+                print(f"第{episode}集验证发现问题：")
+                for issue in validation_result["issues"]:
+                    print(f"  - {issue}")
+        self.last_result = result
     
     def build_script_structure(self, episode, outline):
         """
@@ -77,17 +131,25 @@ class SmartEpisodeGenerator:
         Returns:
             str: 剧本内容
         """
+        return "".join(self.iter_script_blocks(episode, outline))
+    
+    def iter_script_blocks(self, episode, outline):
+        """
+        按顺序产出剧本头和各场景内容
+        
+        Args:
+            episode (int): 集数
+            outline (dict): 剧情大纲
+            
+        Yields:
+            str: 剧本内容块
+        """
         title = outline.get("title", f"第{episode}集")
         characters = self.extract_characters(outline)
         scenes = self.extract_scenes(outline)
-        scene_content = self.generate_scene_content(episode, outline)
-        
-        script = f"{title}\n\n"
-        script += f"出场人物：{characters}\n\n"
-        script += f"场景列表：{scenes}\n\n"
-        script += scene_content
         
-        return script
+        yield f"{title}\n\n出场人物：{characters}\n\n场景列表：{scenes}\n\n"
+        yield from self.iter_scene_blocks(episode, outline)
     
     def extract_characters(self, outline):
         """
@@ -106,32 +168,17 @@ class SmartEpisodeGenerator:
         hook = outline.get("hook", "")
         climax = outline.get("climax", "")
         
-        if isinstance(event_logic, dict):
+        if isinstance(event_logic, Mapping):
             event_text = f"{event_logic.get('cause', '')} {event_logic.get('process', '')} {event_logic.get('result', '')}"
         else:
             event_text = str(event_logic)
         
         all_text = f"{main_plot} {event_text} {hook} {climax}"
         
-        character_keywords = {
-            "陆长乐": ["陆长乐", "二姐", "姐姐"],
-            "镇北王": ["镇北王", "父王", "陆无敌"],
-            "太子": ["太子", "朱峰"],
-            "皇后": ["皇后", "苏云纤"],
-            "百晓通": ["百晓通", "百晓堂"],
-            "六剑奴": ["六剑奴", "剑奴"],
-            "李梦邪": ["李梦邪", "七杀楼"],
-            "陈蒹葭": ["陈蒹葭", "蒹葭"],
-            "白泽": ["白泽", "神兽"],
-            "蒙面女子": ["蒙面女子"]
-        }
-        
-        for char_name, keywords in character_keywords.items():
-            for keyword in keywords:
-                if keyword in all_text:
-                    if char_name not in characters:
-                        characters.append(char_name)
-                    break
+        # 按人物、场景文档生成的别名索引，一次扫描找出所有人物，按首次出现顺序排列
+        for char_name in self.data_manager.get_alias_index().find_characters(all_text):
+            if char_name not in characters:
+                characters.append(char_name)
         
         return "、".join(characters)
     
@@ -145,34 +192,15 @@ class SmartEpisodeGenerator:
         Returns:
             str: 场景列表
         """
-        scenes = []
-        
         event_logic = outline.get("event_logic", {})
         
-        if isinstance(event_logic, dict):
+        if isinstance(event_logic, Mapping):
             event_text = f"{event_logic.get('cause', '')} {event_logic.get('process', '')} {event_logic.get('result', '')}"
         else:
             event_text = str(event_logic)
         
-        scene_keywords = {
-            "镇北王府·世子寝殿": ["寝殿", "世子寝殿", "房间", "王府"],
-            "镇北王府·正厅": ["正厅", "大厅"],
-            "镇北王府·后花园": ["后花园", "花园"],
-            "长安·醉仙楼": ["醉仙楼", "酒楼"],
-            "长安·百晓堂": ["百晓堂", "情报堂"],
-            "长安·街道": ["街道", "长安"],
-            "皇宫": ["皇宫", "宫廷"],
-            "皇宫·御书房": ["御书房"],
-            "北荒·边境": ["北荒", "边境"],
-            "皇家狩猎场": ["狩猎场", "狩猎"]
-        }
-        
-        for scene_name, keywords in scene_keywords.items():
-            for keyword in keywords:
-                if keyword in event_text:
-                    if scene_name not in scenes:
-                        scenes.append(scene_name)
-                    break
+        # 一次扫描找出所有场景，按首次出现顺序排列
+        scenes = self.data_manager.get_alias_index().find_scenes(event_text)
         
         if not scenes:
             scenes = ["镇北王府·世子寝殿"]
@@ -194,8 +222,19 @@ class SmartEpisodeGenerator:
         Returns:
             str: 场景内容
         """
-        content = ""
+        return "".join(self.iter_scene_blocks(episode, outline))
+    
+    def iter_scene_blocks(self, episode, outline):
+        """
+        依次产出起因、经过、结果、钩子场景
         
+        Args:
+            episode (int): 集数
+            outline (dict): 剧情大纲
+            
+        Yields:
+            str: 场景内容
+        """
         event_logic = outline.get("event_logic", {})
         hook = outline.get("hook", "")
         climax = outline.get("climax", "")
@@ -203,19 +242,17 @@ class SmartEpisodeGenerator:
         highlights = outline.get("highlights", [])
         conflicts = outline.get("conflicts", [])
         
-        if isinstance(event_logic, dict):
+        if isinstance(event_logic, Mapping):
             cause = event_logic.get("cause", "")
             process = event_logic.get("process", "")
             result = event_logic.get("result", "")
         else:
             cause, process, result = self.parse_event_logic(str(event_logic))
         
-        content += self.generate_cause_scene(episode, cause, outline)
-        content += self.generate_process_scene(episode, process, outline, climax)
-        content += self.generate_result_scene(episode, result, outline)
-        content += self.generate_hook_scene(episode, hook, outline)
-        
-        return content
+        yield self.generate_cause_scene(episode, cause, outline)
+        yield self.generate_process_scene(episode, process, outline, climax)
+        yield self.generate_result_scene(episode, result, outline)
+        yield self.generate_hook_scene(episode, hook, outline)
     
     def parse_event_logic(self, event_logic):
         """
@@ -1,8 +1,8 @@
 # 状态跟踪器
 # 负责跟踪人物状态、势力状态、事件状态，确保前后文一致性
 
-import json
-import os
+from data.state_store import ENTITY_KINDS, create_state_store
+from data.state_checkpoint import CheckpointStore
 
 
 class StateTracker:
@@ -12,42 +12,76 @@ class StateTracker:
     负责跟踪人物状态、势力状态、事件状态，确保前后文一致性
     """
     
-    def __init__(self, data_manager):
+    def __init__(self, data_manager, config_manager=None, episode=None):
         """
         初始化状态跟踪器
         
         Args:
             data_manager (DataManager): 数据管理器
+            config_manager (ConfigManager, optional): 配置管理器，用于选择状态存储后端，默认使用JSON存储
+            episode (int, optional): 直接打开截至该集的状态检查点，不加载完整历史
+        
+        状态存储在第一次需要时才加载：打开了检查点时查询直接读取检查点，
+        更新状态或没有可用的检查点时才加载完整历史。
         """
         self.data_manager = data_manager
         self.state_file = "data/state.json"
-        self.state = {
-            "characters": {},
-            "forces": {},
-            "abilities": {},
-            "items": {},
-            "events": [],
-            "current_episode": 0
-        }
-        self._load_state()
+        backend = "json"
+        database_file = "data/state.db"
+        checkpoint_dir = "data/checkpoints"
+        if config_manager is not None:
+            backend = config_manager.get_state_backend()
+            self.state_file = config_manager.get_state_file()
+            database_file = config_manager.get_state_database_file()
+            checkpoint_dir = config_manager.get_state_checkpoint_dir()
+        # JSON存储：快照加变更日志，更新时只追加日志；SQLite存储：按集数、实体名称建索引
+        self.store = create_state_store(backend, self.state_file, database_file)
+        self.store_loaded = False
+        # 每集结束后写入的不可变检查点
+        self.checkpoints = CheckpointStore(checkpoint_dir)
+        self.checkpoint = None
+        
+        if episode is not None:
+            self.open_at(episode)
+    
+    @property
+    def state(self):
+        """完整状态字典（SQLite存储需读取全部历史，按集数、名称查询请用 get_entity_state、get_events）"""
+        if not self.store_loaded and self.checkpoint is not None:
+            return self.checkpoint.to_state()
+        self._ensure_store()
+        return self.store.state
+    
+    def open_at(self, episode):
+        """
+        打开截至指定集数的状态检查点
+        
+        打开后查询直接读取检查点，不再加载完整历史；之后更新状态时才加载状态存储。
+        状态存储已加载时查询仍读取状态存储（按集数查询，结果与检查点一致）。
+        
+        Args:
+            episode (int): 集数
+            
+        Returns:
+            bool: 是否找到检查点（找不到时之后的查询读取状态存储）
+        """
+        self.checkpoint = self.checkpoints.open(episode) if episode > 0 else None
+        return self.checkpoint is not None
     
     def _load_state(self):
-        """加载状态文件"""
-        if os.path.exists(self.state_file):
-            try:
-                with open(self.state_file, 'r', encoding='utf-8') as f:
-                    self.state = json.load(f)
-            except Exception as e:
-                print(f"加载状态文件失败: {e}")
+        """加载状态"""
+        self.store.load()
+        self.store_loaded = True
+    
+    def _ensure_store(self):
+        """打开检查点后需要更新状态时，再加载状态存储"""
+        if not self.store_loaded:
+            self._load_state()
     
     def _save_state(self):
-        """保存状态文件"""
-        try:
-            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
-            with open(self.state_file, 'w', encoding='utf-8') as f:
-                json.dump(self.state, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"保存状态文件失败: {e}")
+        """保存完整状态（JSON存储压缩为新快照，SQLite存储合并WAL日志）"""
+        self._ensure_store()
+        self.store.compact()
     
     def get_character_stage(self, character_name, episode):
         """
@@ -125,18 +159,86 @@ class StateTracker:
         """
         更新剧集状态
         
+        已记录过的事件不会重复添加；更新只追加到变更日志，不重写整个状态文件。
+        更新后写入本集的状态检查点，本集的人物、势力等状态应在此之前记录。
+        
         Args:
             episode (int): 集数
             events (list): 事件列表
         """
-        self.state["current_episode"] = episode
-        for event in events:
-            if event not in self.state["events"]:
-                self.state["events"].append({
-                    "episode": episode,
-                    "event": event
-                })
-        self._save_state()
+        self._ensure_store()
+        self.store.record_episode(episode, events)
+        # 只读取本集的事件和实体状态（存储按集数建了索引），耗时与累计历史无关
+        try:
+            self.checkpoint = self.checkpoints.write(
+                episode,
+                [entry["event"] for entry in self.store.get_events(episode, episode)],
+                {kind: self.store.get_entities_at(kind, episode) for kind in ENTITY_KINDS}
+            )
+        except Exception as e:
+            print(f"保存状态检查点失败: {e}")
+    
+    def record_entity_state(self, kind, name, episode, data):
+        """
+        记录人物、势力、能力或道具在指定集数的状态
+        
+        Args:
+            kind (str): 实体类型（characters/forces/abilities/items）
+            name (str): 名称
+            episode (int): 集数
+            data (dict): 状态
+        """
+        self._ensure_store()
+        self.store.record_entity(kind, name, episode, data)
+    
+    def get_entity_state(self, kind, name, episode):
+        """
+        获取人物、势力、能力或道具截至指定集数的最新状态
+        
+        Args:
+            kind (str): 实体类型（characters/forces/abilities/items）
+            name (str): 名称
+            episode (int): 集数
+            
+        Returns:
+            dict: 状态，没有记录时返回None
+        """
+        if not self.store_loaded and self.checkpoint is not None:
+            checkpoint = self._checkpoint_for(episode)
+            return checkpoint.get_entity(kind, name) if checkpoint else None
+        self._ensure_store()
+        return self.store.get_entity(kind, name, episode)
+    
+    def get_events(self, start_episode=None, end_episode=None):
+        """
+        获取指定集数范围内的事件
+        
+        Args:
+            start_episode (int, optional): 开始集数，默认不限
+            end_episode (int, optional): 结束集数，默认不限
+            
+        Returns:
+            list: 事件记录列表（{"episode": 集数, "event": 事件}）
+        """
+        if not self.store_loaded and self.checkpoint is not None:
+            checkpoint = self._checkpoint_for(end_episode)
+            return checkpoint.get_events(start_episode, end_episode) if checkpoint else []
+        self._ensure_store()
+        return self.store.get_events(start_episode, end_episode)
+    
+    def _checkpoint_for(self, episode):
+        """
+        截至指定集数的检查点（不超过已打开的检查点）
+        
+        Args:
+            episode (int): 集数，None表示已打开的检查点
+            
+        Returns:
+            StateCheckpoint: 检查点，没有时返回None
+        """
+        if episode is None or episode >= self.checkpoint.episode:
+            return self.checkpoint
+        return self.checkpoints.open(episode)
     
     def is_ability_unlocked(self, ability_name, episode):
         """
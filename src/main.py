@@ -3,11 +3,14 @@
 # 负责协调各个模块的工作，是整个项目的入口点
 
 import argparse
+import inspect
 import os
 from utils.config_manager import ConfigManager
 from utils.scene_selector import SceneSelector
 from utils.character_manager import CharacterManager
 from data.data_manager import DataManager
+from data.corpus_cache import CorpusCache
+from data.alias_index import AliasIndex
 from parser.markdown_parser import MarkdownParser
 from parser.character_parser import CharacterParser
 from parser.scene_parser import SceneParser
@@ -34,21 +37,31 @@ class Main:
         self.markdown_parser = MarkdownParser()
         self.character_parser = CharacterParser()
         self.scene_parser = SceneParser()
-        self.outline_parser = OutlineParser()
+        self.outline_parser = OutlineParser(self.config_manager.get_outline_workers())
         self.setting_parser = SettingParser()
         # 初始化生成器
         self.script_generator = ScriptGenerator(self.config_manager, self.data_manager)
     
-    def parse_documents(self):
+    def parse_documents(self, use_cache=True):
         """
         解析所有文档
+        
+        Args:
+            use_cache (bool): 是否使用解析结果缓存（源文档未变化时跳过解析）
         """
         print("开始解析文档...")
         
+        corpus_cache = None
+        if use_cache and self.config_manager.is_corpus_cache_enabled():
+            corpus_cache = CorpusCache(self.config_manager.get_corpus_cache_file())
+        
         # 解析人物文档
         character_file = "doc/人物.md"
         if os.path.exists(character_file):
-            characters = self.character_parser.parse_file(character_file)
+            characters = self._parse_with_cache(
+                corpus_cache, "characters", [character_file],
+                lambda: self.character_parser.parse_file(character_file)
+            )
             self.data_manager.set_characters(characters)
             print(f"解析人物文档完成，共解析 {len(characters)} 个角色")
         else:
@@ -57,18 +70,38 @@ class Main:
         # 解析场景文档
         scene_file = "doc/场景列表.md"
         if os.path.exists(scene_file):
-            scenes = self.scene_parser.parse_file(scene_file)
+            scenes = self._parse_with_cache(
+                corpus_cache, "scenes", [scene_file],
+                lambda: self.scene_parser.parse_file(scene_file)
+            )
             self.data_manager.set_scenes(scenes)
             print(f"解析场景文档完成，共解析 {len(scenes)} 个场景")
         else:
             print(f"场景文档不存在: {scene_file}")
         
+        # 根据人物、场景文档生成别名索引
+        alias_sources = [file_path for file_path in (character_file, scene_file) if os.path.exists(file_path)]
+        if alias_sources:
+            # 默认别名和合并规则写在 alias_index.py 中，代码变化时缓存同样失效
+            alias_sources.append(inspect.getfile(AliasIndex))
+            alias_index = self._parse_with_cache(
+                corpus_cache, "aliases", alias_sources,
+                lambda: AliasIndex.build(self.data_manager.get_characters(), self.data_manager.get_scenes())
+            )
+            self.data_manager.set_alias_index(alias_index)
+            print(f"生成别名索引完成，共 {len(alias_index.character_aliases)} 个人物、{len(alias_index.scene_aliases)} 个场景")
+        
         # 解析剧情大纲
         outline_dir = "doc/剧情大纲"
         if os.path.exists(outline_dir):
-            outlines = self.outline_parser.parse_directory(outline_dir)
-            # 过滤掉summary，只保留集数大纲
-            episode_outlines = {k: v for k, v in outlines.items() if isinstance(k, int)}
+            outline_files = sorted(
+                os.path.join(outline_dir, filename)
+                for filename in os.listdir(outline_dir) if filename.endswith('.md')
+            )
+            episode_outlines = self._parse_with_cache(
+                corpus_cache, "outlines", outline_files,
+                lambda: self._parse_episode_outlines(outline_dir)
+            )
             self.data_manager.set_outlines(episode_outlines)
             print(f"解析剧情大纲完成，共解析 {len(episode_outlines)} 集大纲")
         else:
@@ -77,14 +110,71 @@ class Main:
         # 解析设定文档
         setting_file = "doc/设定.md"
         if os.path.exists(setting_file):
-            settings = self.setting_parser.parse_file(setting_file)
+            settings = self._parse_with_cache(
+                corpus_cache, "settings", [setting_file],
+                lambda: self.setting_parser.parse_file(setting_file)
+            )
             self.data_manager.set_settings(settings)
             print("解析设定文档完成")
         else:
             print(f"设定文档不存在: {setting_file}")
         
+        if corpus_cache:
+            corpus_cache.save()
+        
         print("文档解析完成！")
     
+    def _parse_episode_outlines(self, outline_dir):
+        """
+        解析剧情大纲目录，只保留集数大纲
+        
+        Args:
+            outline_dir (str): 剧情大纲目录
+            
+        Returns:
+            dict: 剧情大纲字典，键为集数
+        """
+        outlines = self.outline_parser.parse_directory(outline_dir)
+        # 过滤掉summary，只保留集数大纲
+        return {k: v for k, v in outlines.items() if isinstance(k, int)}
+    
+    def _parse_with_cache(self, corpus_cache, name, source_files, parse):
+        """
+        优先从缓存读取解析结果，缓存失效时重新解析并写入缓存
+        
+        Args:
+            corpus_cache (CorpusCache): 解析结果缓存，为None时直接解析
+            name (str): 缓存项名称
+            source_files (list): 源文件路径列表
+            parse (callable): 解析函数
+            
+        Returns:
+            解析结果
+        """
+        if corpus_cache is None:
+            return parse()
+        
+        # 解析器代码变化时缓存同样失效：parser 包下的源文件也作为缓存项的源文件
+        source_files = list(source_files) + self._parser_sources()
+        data = corpus_cache.get(name, source_files)
+        if data is None:
+            data = parse()
+            corpus_cache.put(name, source_files, data)
+        return data
+    
+    def _parser_sources(self):
+        """
+        获取 parser 包下所有源文件路径
+        
+        Returns:
+            list: 源文件路径列表（按文件名排序）
+        """
+        parser_dir = os.path.dirname(inspect.getfile(MarkdownParser))
+        return sorted(
+            os.path.join(parser_dir, filename)
+            for filename in os.listdir(parser_dir) if filename.endswith('.py')
+        )
+    
     def generate_script(self, episode):
         """
         生成指定集数的剧本
@@ -93,20 +183,28 @@ class Main:
             episode (int): 集数
         """
         print(f"开始生成第{episode}集剧本...")
-        script_content = self.script_generator.generate_script(episode)
+        result = self.script_generator.generate_result(episode)
         print(f"第{episode}集剧本生成完成！")
+        # 生成时已验证的直接使用保存在生成结果中的验证结果
+        issues = self.script_generator.validate_result(result).get("issues", [])
+        if issues:
+            print(f"第{episode}集剧本有 {len(issues)} 个验证问题")
+        else:
+            print(f"第{episode}集剧本验证通过")
         print(f"剧本已保存到: {self.config_manager.get_output_dir()}/第{episode}集.md")
     
-    def generate_all_scripts(self, start_episode=1, end_episode=70):
+    def generate_all_scripts(self, start_episode=1, end_episode=70, jobs=None, incremental=False):
         """
         生成所有集数的剧本
         
         Args:
             start_episode (int): 开始集数
             end_episode (int): 结束集数
+            jobs (int): 并行生成的进程数，默认使用配置
+            incremental (bool): 是否只重新生成输入有变化的剧集
         """
         print(f"开始生成第{start_episode}集到第{end_episode}集的剧本...")
-        self.script_generator.generate_all_scripts(start_episode, end_episode)
+        self.script_generator.generate_all_scripts(start_episode, end_episode, jobs, incremental)
         print(f"所有剧本生成完成！")
         print(f"剧本已保存到: {self.config_manager.get_output_dir()}")
     
@@ -120,7 +218,10 @@ class Main:
         parser.add_argument("--generate-all", action="store_true", help="生成所有集数的剧本")
         parser.add_argument("--start-episode", type=int, default=1, help="开始集数")
         parser.add_argument("--end-episode", type=int, default=70, help="结束集数")
+        parser.add_argument("--jobs", type=int, help="批量生成时的并行进程数（1为串行，0为使用全部CPU核心）")
+        parser.add_argument("--incremental", action="store_true", help="批量生成时只重新生成输入有变化的剧集")
         parser.add_argument("--parse", action="store_true", help="解析所有文档")
+        parser.add_argument("--no-cache", action="store_true", help="忽略解析结果缓存，重新解析所有文档")
         parser.add_argument("--version", action="store_true", help="显示版本信息")
         
         args = parser.parse_args()
@@ -132,11 +233,11 @@ class Main:
         
         # 解析文档
         if args.parse:
-            self.parse_documents()
+            self.parse_documents(use_cache=not args.no_cache)
             return
         
         # 解析文档（默认）
-        self.parse_documents()
+        self.parse_documents(use_cache=not args.no_cache)
         
         # 生成指定集数的剧本
         if args.generate:
@@ -144,18 +245,23 @@ class Main:
         
         # 生成所有集数的剧本
         elif args.generate_all:
-            self.generate_all_scripts(args.start_episode, args.end_episode)
+            self.generate_all_scripts(args.start_episode, args.end_episode, args.jobs, args.incremental)
         
         # 默认行为
         else:
             print("请指定要执行的操作：")
             print("  --generate <episode>    生成指定集数的剧本")
             print("  --generate-all         生成所有集数的剧本")
+            print("  --jobs <n>             批量生成时的并行进程数")
+            print("  --incremental          批量生成时只重新生成输入有变化的剧集")
             print("  --parse                仅解析文档")
+            print("  --no-cache             忽略解析结果缓存")
             print("  --version              显示版本信息")
             print("\n示例：")
             print("  python src/main.py --generate 1     # 生成第1集剧本")
             print("  python src/main.py --generate-all  # 生成所有70集剧本")
+            print("  python src/main.py --generate-all --jobs 4  # 使用4个进程生成所有剧本")
+            print("  python src/main.py --generate-all --incremental  # 只重新生成输入有变化的剧集")
 
 if __name__ == "__main__":
     # 创建主实例并运行
@@ -27,10 +27,10 @@ class CharacterParser:
             dict: 人物字典，键为人物名称，值为人物信息
         """
         try:
-            # 读取文件内容
-            content = self.md_parser.parse_file(file_path)
+            # 读取文档树（与其他解析器共享）
+            document = self.md_parser.parse_document(file_path)
             # 解析人物信息
-            characters = self.parse_content(content)
+            characters = self.parse_lines(document.lines)
             return characters
         except Exception as e:
             print(f"解析人物文件失败: {e}")
@@ -43,11 +43,22 @@ class CharacterParser:
         Args:
             content (str): 人物文本内容
             
+        Returns:
+            dict: 人物字典
+        """
+        return self.parse_lines(content.split('\n'))
+    
+    def parse_lines(self, lines):
+        """
+        逐行解析人物文本
+        
+        Args:
+            lines (list): 人物文本的行列表
+            
         Returns:
             dict: 人物字典
         """
         characters = {}
-        lines = content.split('\n')
         current_character = None
         current_info = {}
         current_section = None
@@ -61,7 +72,9 @@ class CharacterParser:
             
             # 检测人物类别（如「主角」、「核心配角」、「主要配角」等）
             if line.startswith('主角') or line.startswith('核心配角') or line.startswith('主要配角') or line.startswith('次要配角') or line.startswith('反派势力'):
-                # 重置当前人物
+                # 保存并重置当前人物
+                if current_character:
+                    characters[current_character] = current_info
                 current_character = None
                 current_info = {}
                 current_section = line
@@ -81,6 +94,16 @@ class CharacterParser:
                 # 跳过表头
                 pass
             
+            # 同一类别下的下一个人物（不含制表符的行为人物名称）
+            elif current_character and '\t' not in line and not line.startswith('---'):
+                characters[current_character] = current_info
+                current_character = line
+                current_info = {
+                    "name": current_character,
+                    "category": current_section,
+                    "stages": {}
+                }
+            
             # 检测人物阶段信息
             elif current_character and line:
                 # 分割阶段信息
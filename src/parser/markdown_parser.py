@@ -1,13 +1,217 @@
 # Markdown解析器
-# 负责解析Markdown文件，提取文本内容
+# 负责解析Markdown文件，提取文本内容和文档结构
+
+import os
+import threading
+from collections import OrderedDict
+
+
+class MarkdownSection:
+    """
+    Markdown章节
+    
+    对应一个标题及其下的内容，子标题构成子章节
+    """
+    
+    def __init__(self, document, title, level, line_no):
+        """
+        初始化章节
+        
+        Args:
+            document (MarkdownDocument): 所属文档
+            title (str): 标题文本
+            level (int): 标题级别（#的个数，根节点为0）
+            line_no (int): 标题所在行号（根节点为-1）
+        """
+        self.document = document
+        self.title = title
+        self.level = level
+        self.line_no = line_no
+        self.end_line = line_no + 1
+        self.parent = None
+        self.children = []
+        self.code_blocks = []
+        self.list_items = []
+    
+    @property
+    def content(self):
+        """
+        章节自身的内容（到下一个任意级别的标题为止）
+        
+        Returns:
+            str: 章节内容
+        """
+        return '\n'.join(self.document.lines[self.line_no + 1:self.end_line])
+    
+    @property
+    def path(self):
+        """
+        章节的标题路径
+        
+        Returns:
+            tuple: 从顶层标题到本章节的标题元组
+        """
+        titles = []
+        section = self
+        while section.parent is not None:
+            titles.append(section.title)
+            section = section.parent
+        return tuple(reversed(titles))
+
+
+class MarkdownCodeBlock:
+    """
+    Markdown代码块
+    """
+    
+    def __init__(self, info, line_no, section):
+        """
+        初始化代码块
+        
+        Args:
+            info (str): 代码块语言标记
+            line_no (int): 起始围栏所在行号
+            section (MarkdownSection): 所属章节
+        """
+        self.info = info
+        self.line_no = line_no
+        self.section = section
+        self.lines = []
+    
+    @property
+    def content(self):
+        """
+        代码块内容
+        
+        Returns:
+            str: 代码块内容
+        """
+        return '\n'.join(self.lines)
+
+
+class MarkdownDocument:
+    """
+    Markdown文档树
+    
+    一次扫描建立标题、章节、列表项、代码块的层级结构，各领域解析器按标题路径查询，
+    保留原始行文本以便按行解析。代码块中以#开头的行不视为标题。
+    """
+    
+    def __init__(self, text):
+        """
+        初始化文档树
+        
+        Args:
+            text (str): Markdown文本
+        """
+        self.text = text
+        self.lines = text.split('\n')
+        self.root = MarkdownSection(self, "", 0, -1)
+        self.sections = []
+        self.code_blocks = []
+        self._build()
+    
+    def _build(self):
+        """逐行扫描，建立文档树"""
+        stack = [self.root]
+        current = self.root
+        code_block = None
+        
+        for line_no, line in enumerate(self.lines):
+            stripped = line.strip()
+            
+            # 代码块围栏
+            if stripped.startswith('```'):
+                if code_block:
+                    code_block = None
+                else:
+                    code_block = MarkdownCodeBlock(stripped[3:].strip(), line_no, current)
+                    current.code_blocks.append(code_block)
+                    self.code_blocks.append(code_block)
+                continue
+            
+            if code_block:
+                code_block.lines.append(line)
+                continue
+            
+            # 标题（# 开头）
+            if line.startswith('#'):
+                current.end_line = line_no
+                level = len(line) - len(line.lstrip('#'))
+                section = MarkdownSection(self, line.strip('# ').strip(), level, line_no)
+                while stack[-1].level >= level and stack[-1] is not self.root:
+                    stack.pop()
+                section.parent = stack[-1]
+                stack[-1].children.append(section)
+                stack.append(section)
+                self.sections.append(section)
+                current = section
+                continue
+            
+            # 列表项
+            if stripped[:1] in ('-', '*', '+', '•') and stripped[:3] != '---':
+                current.list_items.append(stripped)
+        
+        current.end_line = len(self.lines)
+    
+    def get_section(self, *path):
+        """
+        按标题路径查找章节
+        
+        Args:
+            *path (str): 从顶层开始的标题路径，如 get_section("第1-10集摘要")
+            
+        Returns:
+            MarkdownSection: 章节或None
+        """
+        section = self.root
+        for title in path:
+            for child in section.children:
+                if child.title == title:
+                    section = child
+                    break
+            else:
+                return None
+        return section
+    
+    def find_sections(self, predicate):
+        """
+        查找满足条件的所有章节（按文档顺序）
+        
+        Args:
+            predicate (callable): 判断函数，参数为章节
+            
+        Returns:
+            list: 章节列表
+        """
+        return [section for section in self.sections if predicate(section)]
+    
+    def section_map(self):
+        """
+        章节字典，键为标题，值为章节自身内容（忽略空标题，同名标题以最后一个为准）
+        
+        Returns:
+            dict: 章节字典
+        """
+        return {section.title: section.content for section in self.sections if section.title}
+
 
 class MarkdownParser:
     """
     Markdown解析器
     
-    负责解析Markdown文件，提取文本内容
+    负责解析Markdown文件，提取文本内容和文档结构。
+    同一文件在进程内只读取和解析一次，所有解析器共享同一棵文档树。
+    文档缓存按最近最少使用淘汰，长时间运行的进程（如后端服务）中内存占用有上限。
     """
     
+    # 文档缓存最多保留的文件数
+    MAX_CACHED_DOCUMENTS = 256
+    
+    # 进程内文档缓存（LRU），键为文件绝对路径，值为（文件大小，修改时间，文档树）
+    _documents = OrderedDict()
+    _documents_lock = threading.Lock()
+    
     def __init__(self):
         """
         初始化Markdown解析器
@@ -25,13 +229,38 @@ class MarkdownParser:
             str: 文件内容
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            return content
+            return self.parse_document(file_path).text
         except Exception as e:
             print(f"解析Markdown文件失败: {e}")
             return ""
     
+    def parse_document(self, file_path):
+        """
+        解析Markdown文件为文档树（文件未变化时直接返回缓存的文档树）
+        
+        Args:
+            file_path (str): 文件路径
+            
+        Returns:
+            MarkdownDocument: 文档树
+        """
+        key = os.path.abspath(file_path)
+        stat = os.stat(key)
+        with self._documents_lock:
+            cached = self._documents.get(key)
+            if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+                self._documents.move_to_end(key)
+                return cached[2]
+        
+        with open(key, 'r', encoding='utf-8') as f:
+            document = MarkdownDocument(f.read())
+        with self._documents_lock:
+            self._documents[key] = (stat.st_size, stat.st_mtime_ns, document)
+            self._documents.move_to_end(key)
+            while len(self._documents) > self.MAX_CACHED_DOCUMENTS:
+                self._documents.popitem(last=False)
+        return document
+    
     def parse_text(self, text):
         """
         解析Markdown文本
@@ -56,29 +285,7 @@ class MarkdownParser:
         Returns:
             dict: 章节字典，键为章节标题，值为章节内容
         """
-        sections = {}
-        lines = content.split('\n')
-        current_section = None
-        current_content = []
-        
-        for line in lines:
-            # 检测章节标题（# 开头）
-            if line.startswith('#'):
-                # 如果有当前章节，保存
-                if current_section:
-                    sections[current_section] = '\n'.join(current_content)
-                # 新章节
-                current_section = line.strip('# ').strip()
-                current_content = []
-            else:
-                # 章节内容
-                current_content.append(line)
-        
-        # 保存最后一个章节
-        if current_section:
-            sections[current_section] = '\n'.join(current_content)
-        
-        return sections
+        return MarkdownDocument(content).section_map()
     
     def extract_code_blocks(self, content):
         """
@@ -90,21 +297,4 @@ class MarkdownParser:
         Returns:
             list: 代码块列表
         """
-        code_blocks = []
-        in_code_block = False
-        current_block = []
-        
-        for line in content.split('\n'):
-            if line.startswith('```'):
-                if in_code_block:
-                    # 代码块结束
-                    code_blocks.append('\n'.join(current_block))
-                    current_block = []
-                    in_code_block = False
-                else:
-                    # 代码块开始
-                    in_code_block = True
-            elif in_code_block:
-                current_block.append(line)
-        
-        return code_blocks
+        return [code_block.content for code_block in MarkdownDocument(content).code_blocks]
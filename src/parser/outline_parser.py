@@ -3,7 +3,72 @@
 
 import os
 import re
-from .markdown_parser import MarkdownParser
+from concurrent.futures import ProcessPoolExecutor
+from .markdown_parser import MarkdownParser, MarkdownDocument
+
+# 剧情大纲文件名模式（如「剧情大纲1-10.md」）
+OUTLINE_FILENAME_PATTERN = re.compile(r'剧情大纲(\d+)-(\d+)\.md')
+
+# 集数标题模式（如「# 第1集：血色生辰，画道觉醒」），对标题行匹配
+EPISODE_HEADING_PATTERN = re.compile(r'# 第(\d+)集：(.+)')
+
+# 单集大纲中的字段名，字段之间以这些关键词分隔
+OUTLINE_FIELDS = ['主线推进', '事件逻辑', '目的必须达成', '利用', '悬念/钩子', '爽点', '亮点', '矛盾冲突', '环环相扣']
+
+# 字段分隔关键词（「悬念/钩子」按「悬念」判断）
+FIELD_KEYWORDS = ['主线推进', '事件逻辑', '目的必须达成', '利用', '悬念', '爽点', '亮点', '矛盾冲突', '环环相扣']
+FIELD_KEYWORD_PATTERN = re.compile('|'.join(re.escape(kw) for kw in FIELD_KEYWORDS))
+
+# 字段标题模式，与 extract_field 的匹配规则一致
+FIELD_PATTERNS = {
+    field_name: re.compile(rf'{re.escape(field_name)}[：:（][^：:\n]*[）]?\s*')
+    for field_name in OUTLINE_FIELDS
+}
+
+# 所有字段标题的起点（分隔符不会出现在字段名中，因此逐个匹配不会漏掉重叠的字段标题）
+FIELD_START_PATTERN = re.compile(
+    '(' + '|'.join(re.escape(field_name) for field_name in OUTLINE_FIELDS) + ')[：:（]'
+)
+
+# 事件逻辑的组成部分
+EVENT_PARTS = ['起因', '经过', '结果']
+
+# 行类型
+LINE_ITEM = 'item'        # 列表项（- 或 • 开头）
+LINE_TEXT = 'text'        # 普通文本
+LINE_HEADING = 'heading'  # 标题（# 开头）
+LINE_BLANK = 'blank'      # 空行
+LINE_FIELD = 'field'      # 包含字段关键词的行
+
+def _parse_outline_file(file_path):
+    """
+    在子进程中解析单个剧情大纲文件
+    
+    Args:
+        file_path (str): 文件路径
+        
+    Returns:
+        dict: 剧情大纲字典
+    """
+    return OutlineParser().parse_file(file_path)
+
+
+def _outline_file_sort_key(file_path):
+    """
+    剧情大纲文件的排序键：按起始集数排序，无法识别集数范围的文件排在最后
+    
+    Args:
+        file_path (str): 文件路径
+        
+    Returns:
+        tuple: 排序键
+    """
+    filename = os.path.basename(file_path)
+    match = OUTLINE_FILENAME_PATTERN.search(filename)
+    if match:
+        return (0, int(match.group(1)), int(match.group(2)), filename)
+    return (1, 0, 0, filename)
+
 
 class OutlineParser:
     """
@@ -12,33 +77,56 @@ class OutlineParser:
     负责解析剧情大纲目录下的所有文件，提取每集的剧情大纲
     """
     
-    def __init__(self):
+    def __init__(self, max_workers=1):
         """
         初始化剧情大纲解析器
+        
+        Args:
+            max_workers (int): 并行解析大纲文件的进程数，1为串行解析，0为使用全部CPU核心
         """
         self.md_parser = MarkdownParser()
+        self.max_workers = max_workers
+        self.conflicts = []
     
-    def parse_directory(self, directory_path):
+    def parse_directory(self, directory_path, max_workers=None):
         """
         解析剧情大纲目录
         
+        各大纲文件相互独立，可在多个进程中并行解析；合并时按起始集数排序，
+        结果与并行与否、目录遍历顺序无关。多个文件定义同一集时以排序靠后的文件为准，
+        并记录到 self.conflicts。
+        
         Args:
             directory_path (str): 目录路径
+            max_workers (int): 并行解析的进程数，默认使用初始化时的设置
             
         Returns:
             dict: 剧情大纲字典，键为集数，值为剧情大纲
         """
         outlines = {}
+        self.conflicts = []
         
         try:
-            # 遍历目录下的所有文件
-            for filename in os.listdir(directory_path):
-                if filename.endswith('.md') and filename != '剧情摘要.md':
-                    file_path = os.path.join(directory_path, filename)
-                    # 解析单个文件
-                    file_outlines = self.parse_file(file_path)
-                    # 合并剧情大纲
-                    outlines.update(file_outlines)
+            # 收集目录下的所有大纲文件，按起始集数排序
+            file_paths = sorted(
+                (os.path.join(directory_path, filename)
+                 for filename in os.listdir(directory_path)
+                 if filename.endswith('.md') and filename != '剧情摘要.md'),
+                key=_outline_file_sort_key
+            )
+            
+            # 解析各个文件
+            results = self.parse_files(file_paths, max_workers)
+            
+            # 按顺序合并剧情大纲，并记录重复定义的集数
+            sources = {}
+            for file_path, file_outlines in zip(file_paths, results):
+                for episode in file_outlines:
+                    if episode in sources:
+                        self.conflicts.append((episode, sources[episode], file_path))
+                        print(f"第{episode}集在多个大纲文件中重复定义: {sources[episode]}、{file_path}，以后者为准")
+                    sources[episode] = file_path
+                outlines.update(file_outlines)
             
             # 解析剧情摘要
             summary_path = os.path.join(directory_path, '剧情摘要.md')
@@ -51,6 +139,33 @@ class OutlineParser:
             print(f"解析剧情大纲目录失败: {e}")
             return {}
     
+    def parse_files(self, file_paths, max_workers=None):
+        """
+        解析多个剧情大纲文件，进程数大于1时并行解析
+        
+        Args:
+            file_paths (list): 文件路径列表
+            max_workers (int): 并行解析的进程数，默认使用初始化时的设置
+            
+        Returns:
+            list: 与 file_paths 顺序一致的剧情大纲字典列表
+        """
+        if max_workers is None:
+            max_workers = self.max_workers
+        if max_workers == 0:
+            max_workers = os.cpu_count() or 1
+        max_workers = min(max_workers, len(file_paths))
+        
+        if max_workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    return list(executor.map(_parse_outline_file, file_paths))
+            except Exception as e:
+                # 无法创建进程池时（如受限环境）退回串行解析
+                print(f"并行解析剧情大纲失败，改为串行解析: {e}")
+        
+        return [self.parse_file(file_path) for file_path in file_paths]
+    
     def parse_file(self, file_path):
         """
         解析单个剧情大纲文件
@@ -64,30 +179,58 @@ class OutlineParser:
         outlines = {}
         
         try:
-            # 读取文件内容
-            content = self.md_parser.parse_file(file_path)
+            # 读取文档树（与其他解析器共享）
+            document = self.md_parser.parse_document(file_path)
             # 提取文件名中的集数范围
             filename = os.path.basename(file_path)
             
             # 解析集数范围（如「剧情大纲1-10.md」）
             if '剧情大纲' in filename:
                 # 提取数字部分
-                match = re.search(r'剧情大纲(\d+)-(\d+)\.md', filename)
+                match = OUTLINE_FILENAME_PATTERN.search(filename)
                 if match:
                     start_episode = int(match.group(1))
                     end_episode = int(match.group(2))
                     
-                    # 解析每集的剧情大纲
+                    # 一次扫描建立集数标题索引，再按索引切片解析每集
+                    episode_index = self.index_episodes(document)
                     for i in range(start_episode, end_episode + 1):
-                        # 查找对应集数的剧情大纲
-                        episode_outline = self.extract_episode_outline(content, i)
-                        if episode_outline:
-                            outlines[i] = episode_outline
+                        if i in episode_index:
+                            outlines[i] = self.build_episode_outline(i, *episode_index[i])
         except Exception as e:
             print(f"解析剧情大纲文件失败: {e}")
         
         return outlines
     
+    def index_episodes(self, document):
+        """
+        根据文档树的标题建立集数索引
+        
+        每个「# 第N集：」标题只匹配一次，该集内容截止到文件中的下一个集数标题，
+        因此集数缺失或乱序时也无需重新扫描。同一集数出现多次时以第一次为准。
+        
+        Args:
+            document (MarkdownDocument): 文档树
+            
+        Returns:
+            dict: 集数索引，键为集数，值为（标题文本，该集内容）
+        """
+        headings = []
+        for section in document.sections:
+            match = EPISODE_HEADING_PATTERN.search(document.lines[section.line_no])
+            if match:
+                headings.append((section.line_no, match))
+        
+        index = {}
+        for i, (line_no, match) in enumerate(headings):
+            episode = int(match.group(1))
+            if episode in index:
+                continue
+            end_line = headings[i + 1][0] if i + 1 < len(headings) else len(document.lines)
+            index[episode] = (match.group(2), '\n'.join(document.lines[line_no + 1:end_line]))
+        
+        return index
+    
     def extract_episode_outline(self, content, episode):
         """
         提取指定集数的剧情大纲
@@ -96,6 +239,24 @@ class OutlineParser:
             content (str): 文件内容
             episode (int): 集数
             
+        Returns:
+            dict: 剧情大纲字典
+        """
+        episode_index = self.index_episodes(MarkdownDocument(content))
+        if episode not in episode_index:
+            return None
+        
+        return self.build_episode_outline(episode, *episode_index[episode])
+    
+    def build_episode_outline(self, episode, title, episode_content):
+        """
+        根据单集标题和内容构建剧情大纲
+        
+        Args:
+            episode (int): 集数
+            title (str): 标题文本（不含「第N集：」）
+            episode_content (str): 该集内容
+            
         Returns:
             dict: 剧情大纲字典
         """
@@ -117,67 +278,141 @@ class OutlineParser:
             "connections": []
         }
         
-        # 查找对应集数的标题
-        episode_pattern = rf'# 第{episode}集：([^\n]+)'
-        episode_match = re.search(episode_pattern, content)
-        
-        if not episode_match:
-            return None
+        outline["title"] = f"第{episode}集：{title}"
         
-        outline["title"] = f"第{episode}集：{episode_match.group(1)}"
+        # 一次扫描提取所有字段
+        fields, event_parts = self.extract_fields(episode_content)
         
-        # 提取该集的内容（到下一集标题或文件结束）
-        start_pos = episode_match.end()
-        next_episode_pattern = rf'# 第{episode + 1}集：'
-        next_episode_match = re.search(next_episode_pattern, content[start_pos:])
+        outline["main_progress"] = '\n'.join(fields["主线推进"])
+        outline["event_logic"]["cause"] = event_parts["起因"]
+        outline["event_logic"]["process"] = event_parts["经过"]
+        outline["event_logic"]["result"] = event_parts["结果"]
+        outline["goals"] = fields["目的必须达成"]
+        outline["utilize"] = fields["利用"]
+        outline["hook"] = '\n'.join(fields["悬念/钩子"])
+        outline["climax"] = '\n'.join(fields["爽点"])
+        outline["highlights"] = fields["亮点"]
+        outline["conflicts"] = fields["矛盾冲突"]
+        outline["connections"] = fields["环环相扣"]
         
-        if next_episode_match:
-            episode_content = content[start_pos:start_pos + next_episode_match.start()]
-        else:
-            episode_content = content[start_pos:]
+        return outline
+    
+    def classify_line(self, line):
+        """
+        判断单行（已去除首尾空白）的类型
         
-        # 提取各个字段
-        outline["main_progress"] = self.extract_field(episode_content, "主线推进")
+        Args:
+            line (str): 行内容
+            
+        Returns:
+            str: 行类型
+        """
+        if not line:
+            return LINE_BLANK
+        if line[0] in '-•':
+            return LINE_ITEM
+        if line[0] == '#':
+            return LINE_HEADING
+        if FIELD_KEYWORD_PATTERN.search(line):
+            return LINE_FIELD
+        return LINE_TEXT
+    
+    def extract_fields(self, content):
+        """
+        一次扫描提取单集内容中的所有字段
         
-        # 提取事件逻辑
-        event_logic = self.extract_field(episode_content, "事件逻辑")
-        if event_logic:
-            outline["event_logic"]["cause"] = self.extract_event_part(event_logic, "起因")
-            outline["event_logic"]["process"] = self.extract_event_part(event_logic, "经过")
-            outline["event_logic"]["result"] = self.extract_event_part(event_logic, "结果")
+        先定位每个字段标题的第一次出现，再逐行扫描一次：每行只判断一次类型，
+        并分发给所有尚未结束的字段；事件逻辑的起因/经过/结果在同一次扫描中提取。
+        结果与逐个调用 extract_field、extract_event_part 一致。
         
-        # 提取目的必须达成
-        goals_text = self.extract_field(episode_content, "目的必须达成")
-        if goals_text:
-            outline["goals"] = [line.strip() for line in goals_text.split('\n') if line.strip()]
+        Args:
+            content (str): 单集内容
+            
+        Returns:
+            tuple: (字段字典，键为字段名，值为字段行列表；事件逻辑字典，键为起因/经过/结果)
+        """
+        fields = {field_name: [] for field_name in OUTLINE_FIELDS}
+        event_parts = {part_name: "" for part_name in EVENT_PARTS}
         
-        # 提取利用
-        utilize_text = self.extract_field(episode_content, "利用")
-        if utilize_text:
-            outline["utilize"] = [line.strip() for line in utilize_text.split('\n') if line.strip()]
+        # 定位各字段标题第一次出现的位置
+        field_starts = {}
+        for match in FIELD_START_PATTERN.finditer(content):
+            field_name = match.group(1)
+            if field_name not in field_starts:
+                field_starts[field_name] = FIELD_PATTERNS[field_name].match(content, match.start()).end()
+                if len(field_starts) == len(OUTLINE_FIELDS):
+                    break
         
-        # 提取悬念/钩子
-        outline["hook"] = self.extract_field(episode_content, "悬念/钩子")
+        if not field_starts:
+            return fields, event_parts
         
-        # 提取爽点
-        outline["climax"] = self.extract_field(episode_content, "爽点")
+        # 按行号登记每个字段的起始位置，字段从标题之后的剩余行开始
+        activations = {}
+        for field_name, pos in field_starts.items():
+            line_no = content.count('\n', 0, pos)
+            offset = pos - content.rfind('\n', 0, pos) - 1
+            activations.setdefault(line_no, []).append((field_name, offset))
         
-        # 提取亮点
-        highlights_text = self.extract_field(episode_content, "亮点")
-        if highlights_text:
-            outline["highlights"] = [line.strip() for line in highlights_text.split('\n') if line.strip()]
+        lines = content.split('\n')
+        active = []
+        last_activation = max(activations)
+        for line_no in range(min(activations), len(lines)):
+            line = lines[line_no]
+            if active:
+                stripped = line.strip()
+                line_type = self.classify_line(stripped)
+                # 含字段关键词的行不影响任何字段
+                if line_type is not LINE_FIELD:
+                    active = [field_name for field_name in active
+                              if self._feed_line(fields[field_name], field_name, stripped, line_type, event_parts)]
+            elif line_no > last_activation:
+                break
+            
+            # 新字段从标题所在行的剩余部分开始，不接收整行
+            for field_name, offset in activations.get(line_no, ()):
+                stripped = line[offset:].strip()
+                if self._feed_line(fields[field_name], field_name, stripped, self.classify_line(stripped), event_parts):
+                    active.append(field_name)
         
-        # 提取矛盾冲突
-        conflicts_text = self.extract_field(episode_content, "矛盾冲突")
-        if conflicts_text:
-            outline["conflicts"] = [line.strip() for line in conflicts_text.split('\n') if line.strip()]
+        return fields, event_parts
+    
+    def _feed_line(self, field_lines, field_name, line, line_type, event_parts):
+        """
+        将一行交给指定字段处理
         
-        # 提取环环相扣
-        connections_text = self.extract_field(episode_content, "环环相扣")
-        if connections_text:
-            outline["connections"] = [line.strip() for line in connections_text.split('\n') if line.strip()]
+        Args:
+            field_lines (list): 字段已收集的行
+            field_name (str): 字段名
+            line (str): 行内容（已去除首尾空白）
+            line_type (str): 行类型
+            event_parts (dict): 事件逻辑字典
+            
+        Returns:
+            bool: 字段是否继续接收后续行
+        """
+        if line_type is LINE_ITEM or (line_type is LINE_TEXT and field_lines):
+            field_lines.append(line)
+            if field_name == '事件逻辑':
+                self._match_event_parts(line, event_parts)
+            return True
+        if line_type is LINE_HEADING or (line_type is LINE_BLANK and field_lines):
+            return False
+        return True
+    
+    def _match_event_parts(self, line, event_parts):
+        """
+        从事件逻辑的一行中提取起因/经过/结果（每部分取第一次出现）
         
-        return outline
+        Args:
+            line (str): 事件逻辑中的一行
+            event_parts (dict): 事件逻辑字典
+        """
+        for part_name in EVENT_PARTS:
+            if not event_parts[part_name]:
+                marker = f"- {part_name}："
+                index = line.find(marker)
+                if index != -1:
+                    event_parts[part_name] = line[index + len(marker):].strip()
     
     def extract_field(self, content, field_name):
         """
@@ -199,7 +434,7 @@ class OutlineParser:
                 stripped = line.strip()
                 if stripped and (stripped.startswith('-') or stripped.startswith('•')):
                     field_lines.append(stripped)
-                elif stripped and not stripped.startswith('#') and not any(kw in stripped for kw in ['主线推进', '事件逻辑', '目的必须达成', '利用', '悬念', '爽点', '亮点', '矛盾冲突', '环环相扣']):
+                elif stripped and not stripped.startswith('#') and not any(kw in stripped for kw in FIELD_KEYWORDS):
                     if field_lines:
                         field_lines.append(stripped)
                 elif stripped.startswith('#'):
@@ -239,10 +474,8 @@ class OutlineParser:
         summary = {}
         
         try:
-            # 读取文件内容
-            content = self.md_parser.parse_file(file_path)
-            # 提取章节
-            sections = self.md_parser.extract_sections(content)
+            # 读取文档树并提取章节
+            sections = self.md_parser.parse_document(file_path).section_map()
             
             for section_title, section_content in sections.items():
                 if '摘要' in section_title:
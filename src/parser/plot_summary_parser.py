@@ -1,7 +1,7 @@
 # 剧情摘要解析器
 # 负责解析剧情摘要.md文件，提取各阶段摘要信息
 
-from parser.markdown_parser import MarkdownParser
+from parser.markdown_parser import MarkdownParser, MarkdownDocument
 
 
 class PlotSummaryParser:
@@ -25,8 +25,8 @@ class PlotSummaryParser:
             dict: 摘要字典，键为阶段名称，值为摘要信息
         """
         try:
-            content = self.md_parser.parse_file(file_path)
-            summaries = self.parse_content(content)
+            document = self.md_parser.parse_document(file_path)
+            summaries = self.parse_document(document)
             return summaries
         except Exception as e:
             print(f"解析剧情摘要文件失败: {e}")
@@ -42,28 +42,33 @@ class PlotSummaryParser:
         Returns:
             dict: 摘要字典
         """
-        summaries = {}
-        lines = content.split('\n')
-        current_stage = None
-        current_content = []
-        in_block = False
+        return self.parse_document(MarkdownDocument(content))
+    
+    def parse_document(self, document):
+        """
+        从文档树中解析各阶段摘要（「## 第X-Y集摘要」章节下代码块中的内容）
         
-        for line in lines:
-            line = line.strip()
+        Args:
+            document (MarkdownDocument): 文档树
             
-            if line.startswith('## 第') and '集摘要' in line:
-                if current_stage and current_content:
-                    summaries[current_stage] = self.parse_stage_content('\n'.join(current_content))
-                current_stage = line.replace('## ', '').replace('摘要', '').strip()
-                current_content = []
-                in_block = False
-            elif line.startswith('```'):
-                in_block = not in_block
-            elif current_stage and in_block and line:
-                current_content.append(line)
+        Returns:
+            dict: 摘要字典
+        """
+        summaries = {}
+        sections = document.find_sections(
+            lambda section: section.level == 2 and section.title.startswith('第') and '集摘要' in section.title
+        )
         
-        if current_stage and current_content:
-            summaries[current_stage] = self.parse_stage_content('\n'.join(current_content))
+        for section in sections:
+            lines = [
+                line.strip()
+                for code_block in section.code_blocks
+                for line in code_block.lines
+                if line.strip()
+            ]
+            if lines:
+                stage = section.title.replace('摘要', '').strip()
+                summaries[stage] = self.parse_stage_content('\n'.join(lines))
         
         return summaries
     
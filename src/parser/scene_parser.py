@@ -27,10 +27,10 @@ class SceneParser:
             dict: 场景字典，键为场景名称，值为场景信息
         """
         try:
-            # 读取文件内容
-            content = self.md_parser.parse_file(file_path)
+            # 读取文档树（与其他解析器共享）
+            document = self.md_parser.parse_document(file_path)
             # 解析场景信息
-            scenes = self.parse_content(content)
+            scenes = self.parse_lines(document.lines)
             return scenes
         except Exception as e:
             print(f"解析场景文件失败: {e}")
@@ -43,11 +43,22 @@ class SceneParser:
         Args:
             content (str): 场景文本内容
             
+        Returns:
+            dict: 场景字典
+        """
+        return self.parse_lines(content.split('\n'))
+    
+    def parse_lines(self, lines):
+        """
+        逐行解析场景文本
+        
+        Args:
+            lines (list): 场景文本的行列表
+            
         Returns:
             dict: 场景字典
         """
         scenes = {}
-        lines = content.split('\n')
         current_category = None
         
         for line in lines:
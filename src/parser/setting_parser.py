@@ -1,7 +1,7 @@
 # 设定解析器
 # 负责解析设定.md文件，提取核心设定信息
 
-from .markdown_parser import MarkdownParser
+from .markdown_parser import MarkdownParser, MarkdownDocument
 
 class SettingParser:
     """
@@ -27,10 +27,10 @@ class SettingParser:
             dict: 设定字典，包含金手指、世界观、主角人设等信息
         """
         try:
-            # 读取文件内容
-            content = self.md_parser.parse_file(file_path)
+            # 读取文档树
+            document = self.md_parser.parse_document(file_path)
             # 解析设定信息
-            settings = self.parse_content(content)
+            settings = self.parse_document(document)
             return settings
         except Exception as e:
             print(f"解析设定文件失败: {e}")
@@ -43,13 +43,25 @@ class SettingParser:
         Args:
             content (str): 设定文本内容
             
+        Returns:
+            dict: 设定字典
+        """
+        return self.parse_document(MarkdownDocument(content))
+    
+    def parse_document(self, document):
+        """
+        解析设定文档树
+        
+        Args:
+            document (MarkdownDocument): 设定文档树
+            
         Returns:
             dict: 设定字典
         """
         settings = {}
         
         # 提取章节
-        sections = self.md_parser.extract_sections(content)
+        sections = document.section_map()
         
         # 解析金手指设定
         if "金手指：画道通神系统（核心爽点引擎）" in sections:
@@ -10,6 +10,8 @@ utils模块
 - 颜色标记
 - 音效生成
 - 配置管理
+- 多关键词匹配
+- 禁止用语扫描
 """
 
 from .scene_selector import SceneSelector
@@ -17,11 +19,16 @@ from .character_manager import CharacterManager
 from .color_marker import ColorMarker
 from .sound_generator import SoundGenerator
 from .config_manager import ConfigManager
+from .keyword_matcher import KeywordMatcher
+from .phrase_scanner import PhraseScanner, PhraseHit
 
 __all__ = [
     "SceneSelector",
     "CharacterManager",
     "ColorMarker",
     "SoundGenerator",
-    "ConfigManager"
+    "ConfigManager",
+    "KeywordMatcher",
+    "PhraseScanner",
+    "PhraseHit"
 ]
@@ -103,6 +103,69 @@ class ConfigManager:
         """
         return self.get("paths.output_dir", "doc/剧本正文")
     
+    def get_outline_workers(self):
+        """
+        获取并行解析剧情大纲文件的进程数
+        
+        Returns:
+            int: 进程数（1为串行，0为使用全部CPU核心）
+        """
+        return self.get("parsing.outline_workers", 1)
+    
+    def get_generation_jobs(self):
+        """
+        获取批量生成剧本的进程数
+        
+        Returns:
+            int: 进程数（1为串行，0为使用全部CPU核心）
+        """
+        return self.get("generation.jobs", 1)
+    
+    def get_pipeline_queue_size(self):
+        """
+        获取批量生成流水线各阶段之间的队列容量
+        
+        Returns:
+            int: 队列容量（最多积压的剧集数）
+        """
+        return self.get("generation.pipeline_queue_size", 2)
+    
+    def get_state_backend(self):
+        """
+        获取状态存储后端
+        
+        Returns:
+            str: 存储后端（json 或 sqlite）
+        """
+        return self.get("state.backend", "json")
+    
+    def get_state_file(self):
+        """
+        获取JSON状态快照文件路径
+        
+        Returns:
+            str: 文件路径
+        """
+        return self.get("state.state_file", "data/state.json")
+    
+    def get_state_database_file(self):
+        """
+        获取SQLite状态数据库文件路径
+        
+        Returns:
+            str: 文件路径
+        """
+        return self.get("state.database_file", "data/state.db")
+    
+    def get_state_checkpoint_dir(self):
+        """
+        获取每集状态检查点的保存目录
+        
+        Returns:
+            str: 目录路径
+        """
+        return self.get("state.checkpoint_dir", "data/checkpoints")
+    
     def get_creativity_level(self):
         """
         获取创造性级别
@@ -157,6 +220,42 @@ class ConfigManager:
         """
         return self.get("validation.enable_format_check", True)
     
+    def is_corpus_cache_enabled(self):
+        """
+        是否启用文档解析结果缓存
+        
+        Returns:
+            bool: 是否启用文档解析结果缓存
+        """
+        return self.get("cache.enable_corpus_cache", True)
+    
+    def get_corpus_cache_file(self):
+        """
+        获取解析结果缓存文件路径
+        
+        Returns:
+            str: 解析结果缓存文件路径
+        """
+        return self.get("cache.corpus_cache_file", "data/corpus_cache.pkl")
+    
+    def get_build_manifest_file(self):
+        """
+        获取构建清单文件路径（记录每集剧本的依赖，用于增量生成）
+        
+        Returns:
+            str: 构建清单文件路径
+        """
+        return self.get("cache.build_manifest_file", "data/build_manifest.json")
+    
+    def get_script_hash_file(self):
+        """
+        获取剧本哈希清单文件路径（记录已写入剧本文件的内容哈希，内容未变化时跳过写入）
+        
+        Returns:
+            str: 剧本哈希清单文件路径
+        """
+        return self.get("cache.script_hash_file", "data/script_hashes.json")
+    
     def get_logging_level(self):
         """
         获取日志级别
@@ -0,0 +1,235 @@
+# 多关键词匹配工具
+# 基于 Aho–Corasick 自动机，一次扫描文本即可找出所有关键词
+
+import re
+import threading
+from collections import deque
+
+
+class KeywordMatcher:
+    """
+    多关键词匹配器（Aho–Corasick 自动机）
+    
+    每个关键词对应一个或多个值（如人物别名对应人物标准名、禁止词对应类别），
+    自动机在初始化时构建（之后再添加关键词则在下次匹配时重建），之后每次
+    匹配只需扫描文本一遍，耗时与关键词数量无关。
+    
+    自动机构建在局部变量中完成，再作为一个不可变元组整体发布，多个线程
+    共用同一个匹配器时不会读到构建了一半的自动机。
+    """
+    
+    def __init__(self, keyword_map=None):
+        """
+        初始化多关键词匹配器
+        
+        Args:
+            keyword_map (dict, optional): 值到关键词列表的映射，
+                如 {"陆长乐": ["陆长乐", "二姐"]}
+        """
+        # 关键词及其对应的值，按添加顺序保存
+        self.keywords = {}
+        # 自动机：（状态转移，失败指针，输出，关键词到值的映射，值的顺序，起始字符模式），
+        # 关键词变化后置为None，下次匹配时重建
+        self._automaton = None
+        self._lock = threading.Lock()
+        
+        if keyword_map:
+            for value, keywords in keyword_map.items():
+                for keyword in keywords:
+                    self.add(keyword, value)
+        self._get_automaton()
+    
+    def add(self, keyword, value=None):
+        """
+        添加关键词
+        
+        Args:
+            keyword (str): 关键词
+            value: 关键词对应的值，默认为关键词本身
+        """
+        if not keyword:
+            return
+        
+        value = keyword if value is None else value
+        with self._lock:
+            values = self.keywords.setdefault(keyword, [])
+            if value not in values:
+                values.append(value)
+            # 关键词变化后需要重新构建自动机
+            self._automaton = None
+    
+    def _get_automaton(self):
+        """
+        获取当前的自动机，关键词变化后先重建
+        
+        Returns:
+            tuple: 自动机
+        """
+        automaton = self._automaton
+        if automaton is not None:
+            return automaton
+        with self._lock:
+            if self._automaton is None:
+                self._automaton = self._build({keyword: tuple(values) for keyword, values in self.keywords.items()})
+            return self._automaton
+    
+    def _build(self, keywords):
+        """
+        构建自动机：先建关键词树，再按广度优先计算失败指针和输出
+        
+        Args:
+            keywords (dict): 关键词到值的映射（构建时的快照）
+            
+        Returns:
+            tuple: 自动机
+        """
+        goto = [{}]
+        output = [[]]
+        
+        for keyword in keywords:
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append([])
+                state = next_state
+            output[state].append(keyword)
+        
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                # 合并失败链上的输出，匹配时无需再沿失败指针回溯
+                output[next_state] = output[next_state] + output[fail[next_state]]
+        
+        # 值的添加顺序，用于位置相同时排序
+        order = {}
+        for values in keywords.values():
+            for value in values:
+                order.setdefault(value, len(order))
+        
+        start_pattern = None
+        if goto[0]:
+            start_pattern = re.compile('[' + ''.join(re.escape(char) for char in goto[0]) + ']')
+        return goto, fail, output, keywords, order, start_pattern
+    
+    def iter_matches(self, text):
+        """
+        扫描文本，逐个返回匹配结果（包括相互重叠的关键词）
+        
+        Args:
+            text (str): 文本
+            
+        Yields:
+            tuple: （起始位置，关键词，值），按关键词结束位置排序
+        """
+        return self._iter_matches(self._get_automaton(), text)
+    
+    def _iter_matches(self, automaton, text):
+        """
+        用指定的自动机扫描文本，逐个返回匹配结果
+        
+        Args:
+            automaton (tuple): 自动机
+            text (str): 文本
+            
+        Yields:
+            tuple: （起始位置，关键词，值）
+        """
+        goto, fail, output, keywords, _, start_pattern = automaton
+        if start_pattern is None:
+            return
+        
+        start_search = start_pattern.search
+        length = len(text)
+        state = 0
+        pos = 0
+        
+        while pos < length:
+            if not state:
+                # 处于根状态时直接跳到下一个可能作为关键词开头的字符
+                match = start_search(text, pos)
+                if not match:
+                    return
+                pos = match.start()
+            char = text[pos]
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                for keyword in output[state]:
+                    start = pos - len(keyword) + 1
+                    for value in keywords[keyword]:
+                        yield start, keyword, value
+            pos += 1
+    
+    def find_values(self, text, longest=False):
+        """
+        找出文本中出现的所有值（去重），按首次出现位置排序
+        
+        出现位置相同时按关键词的添加顺序排序。
+        
+        Args:
+            text (str): 文本
+            longest (bool): 是否只保留最左最长匹配（被更长关键词覆盖的匹配不计入）
+            
+        Returns:
+            list: 值列表
+        """
+        automaton = self._get_automaton()
+        matches = self._iter_matches(automaton, text)
+        if longest:
+            matches = self._longest_matches(matches)
+        
+        first_seen = {}
+        for start, keyword, value in matches:
+            if value not in first_seen or start < first_seen[value]:
+                first_seen[value] = start
+        
+        order = automaton[4]
+        return sorted(first_seen, key=lambda value: (first_seen[value], order[value]))
+    
+    def _longest_matches(self, matches):
+        """
+        从所有匹配中选出互不重叠的最左最长匹配
+        
+        Args:
+            matches (iterable): （起始位置，关键词，值）
+            
+        Returns:
+            list: 筛选后的匹配
+        """
+        selected = []
+        covered_end = 0
+        for start, keyword, value in sorted(matches, key=lambda match: (match[0], -len(match[1]))):
+            end = start + len(keyword)
+            if start >= covered_end:
+                selected.append((start, keyword, value))
+                covered_end = end
+            elif selected and selected[-1][0] == start and selected[-1][1] == keyword:
+                # 同一关键词对应多个值时一并保留
+                selected.append((start, keyword, value))
+        return selected
+    
+    def contains_any(self, text):
+        """
+        判断文本中是否包含任一关键词
+        
+        Args:
+            text (str): 文本
+            
+        Returns:
+            bool: 是否包含
+        """
+        for _ in self.iter_matches(text):
+            return True
+        return False
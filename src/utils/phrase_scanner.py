@@ -0,0 +1,176 @@
+# 禁止用语扫描工具
+# 汇总各验证器的禁止用语，一次扫描剧本即可得到所有命中位置
+
+import bisect
+from collections import namedtuple
+
+from .keyword_matcher import KeywordMatcher
+
+# 单条命中：类别、禁止用语、行号（从1开始）、列号（从1开始）
+PhraseHit = namedtuple("PhraseHit", ["category", "phrase", "line", "column"])
+
+# RuleValidator 的禁止表达式（类别 -> 用语）
+RULE_FORBIDDEN_PHRASES = {
+    "眼神描写": [
+        "眼神冷", "眼神锐利", "眼神一冷", "眼神扫过", "眼神没离开",
+        "眼神坚定", "眼神警惕", "眼神如刀", "眼神如炬", "眼神如",
+        "眼神扫", "眼神看", "眼神盯", "眼神注视", "眼神凝视"
+    ],
+    "声音描写": [
+        "声音冷", "声音狠", "声音发颤", "喉间压狠音", "声音沙哑",
+        "声音低沉", "声音高亢", "声音温柔", "声音严厉", "声音颤抖"
+    ],
+    "心理描写": [
+        "心中暗爽", "很害怕", "心里想", "心想", "心中想",
+        "心里觉得", "心中觉得", "内心", "心里", "心中"
+    ],
+    "情感描述": [
+        "气氛紧张", "很愤怒", "恐惧", "开心", "悲伤",
+        "兴奋", "焦虑", "紧张", "愤怒", "害怕"
+    ],
+    "抽象描述": [
+        "很安静", "气质清雅", "优雅", "美丽", "丑陋",
+        "英俊", "丑陋", "高大", "矮小", "肥胖"
+    ],
+    "比喻": [
+        "像什么", "如什么", "如诗如画", "如同", "宛如",
+        "仿佛", "好似", "恰似", "犹如", "好像"
+    ],
+    "形容词修饰": [
+        "冷冷地", "狠狠地", "轻轻", "快速", "慢慢地",
+        "缓缓地", "重重地", "悄悄地", "偷偷地", "渐渐地"
+    ]
+}
+
+# 台词括号中的眼神描写
+DIALOGUE_EYE_CATEGORY = "台词括号"
+DIALOGUE_EYE_PHRASES = ["（眼神", "(眼神"]
+
+# 创作指南（ForbiddenChecker）的禁止事项（类别 -> 用语）
+GUIDE_FORBIDDEN_PHRASES = {
+    "眼神描写": [
+        "眼神冷", "眼神锐利", "眼神一冷", "眼神扫过", "眼神没离开",
+        "眼神坚定", "眼神警惕", "眼神变得专注", "眼神频繁瞟", "眼神怒", "眼神骤亮"
+    ],
+    "声音描写": [
+        "声音冷", "声音狠", "声音发颤", "喉间压狠音", "声音沙哑", "声音低沉"
+    ],
+    "心理描写": [
+        "心中暗爽", "很害怕", "心里想", "心中想", "心里觉得", "心中觉得"
+    ],
+    "情感描述": [
+        "气氛紧张", "很愤怒", "恐惧", "开心", "悲伤", "兴奋", "焦虑", "紧张"
+    ],
+    "抽象描述": [
+        "很安静", "气质清雅", "优雅", "美丽", "丑陋", "英俊", "高大", "矮小", "肥胖"
+    ],
+    "比喻": [
+        "像什么", "如什么", "如诗如画", "如同", "宛如", "仿佛", "好似", "恰似", "犹如", "好像"
+    ],
+    "形容词/副词修饰": [
+        "冷冷地", "狠狠地", "轻轻", "快速", "慢慢地", "缓缓地", "重重地", "悄悄地", "偷偷地", "渐渐地"
+    ]
+}
+
+# 逐行检查的禁止模式（生成器 ConsistencyValidator）：（模式说明，类别，用语）
+LINE_FORBIDDEN_PATTERNS = [
+    (r'眼神.*', "眼神描写", "眼神"),
+    (r'声音(?!提示：).*', "声音描写", "声音"),
+    (r'心里.*', "心理描写", "心里"),
+    (r'气氛.*', "情感描述", "气氛"),
+    (r'像.*', "比喻", "像"),
+    (r'如.*', "比喻", "如"),
+    (r'冷冷地.*', "形容词修饰", "冷冷地"),
+    (r'狠狠地.*', "形容词修饰", "狠狠地"),
+    (r'轻轻.*', "形容词修饰", "轻轻"),
+    (r'快速.*', "形容词修饰", "快速")
+]
+
+
+class PhraseScanner:
+    """
+    禁止用语扫描器
+    
+    把所有类别的禁止用语编译进同一个多关键词匹配器，一次扫描剧本，
+    按（类别，用语，行号，列号）输出所有命中。各验证器只需按自己的
+    用语表筛选命中结果，验证耗时与用语数量无关。
+    
+    匹配器在初始化时构建完成，模块级的共用扫描器在导入时即已就绪；上次扫描
+    结果作为一个元组整体替换，多个线程共用同一个扫描器时不会读到不一致的状态。
+    """
+    
+    def __init__(self, phrase_table):
+        """
+        初始化禁止用语扫描器
+        
+        Args:
+            phrase_table (dict): 类别到用语列表的映射
+        """
+        self.matcher = KeywordMatcher(phrase_table)
+        # 上次扫描的（文本，命中列表）
+        self._last_scan = (None, None)
+    
+    def scan(self, text):
+        """
+        扫描文本中的所有禁止用语
+        
+        同一文本连续扫描（如多个验证器检查同一集剧本）时直接返回上次的结果。
+        
+        Args:
+            text (str): 剧本内容
+            
+        Returns:
+            list: PhraseHit 列表，按行号、列号排序
+        """
+        last_text, last_hits = self._last_scan
+        if text is last_text or text == last_text:
+            return last_hits
+        
+        # 每行起始位置，用于把匹配位置换算为行号、列号
+        line_starts = [0]
+        position = text.find('\n')
+        while position != -1:
+            line_starts.append(position + 1)
+            position = text.find('\n', position + 1)
+        
+        hits = []
+        for start, phrase, category in self.matcher.iter_matches(text):
+            line_index = bisect.bisect_right(line_starts, start) - 1
+            hits.append(PhraseHit(category, phrase, line_index + 1, start - line_starts[line_index] + 1))
+        hits.sort(key=lambda hit: (hit.line, hit.column))
+        
+        self._last_scan = (text, hits)
+        return hits
+    
+    def found_phrases(self, text):
+        """
+        文本中出现过的（类别，用语）集合
+        
+        Args:
+            text (str): 剧本内容
+            
+        Returns:
+            set: （类别，用语）集合
+        """
+        return {(hit.category, hit.phrase) for hit in self.scan(text)}
+
+
+def _build_phrase_table():
+    """合并各验证器的用语表，同一类别下的用语去重"""
+    table = {}
+    sources = [RULE_FORBIDDEN_PHRASES, GUIDE_FORBIDDEN_PHRASES, {DIALOGUE_EYE_CATEGORY: DIALOGUE_EYE_PHRASES}]
+    for source in sources:
+        for category, phrases in source.items():
+            table.setdefault(category, [])
+            for phrase in phrases:
+                if phrase not in table[category]:
+                    table[category].append(phrase)
+    for _, category, phrase in LINE_FORBIDDEN_PATTERNS:
+        table.setdefault(category, [])
+        if phrase not in table[category]:
+            table[category].append(phrase)
+    return table
+
+
+# 所有验证器共用的扫描器
+FORBIDDEN_SCANNER = PhraseScanner(_build_phrase_table())
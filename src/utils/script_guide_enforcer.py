@@ -1,6 +1,8 @@
 # 创作指南约束器
 # 负责强制执行创作指南的所有要求
 
+from .phrase_scanner import FORBIDDEN_SCANNER, GUIDE_FORBIDDEN_PHRASES
+
 class ForbiddenChecker:
     """
     禁止事项检查器
@@ -12,41 +14,14 @@ class ForbiddenChecker:
         """
         初始化禁止事项检查器
         """
-        # 眼神描写禁止词
-        self.eye_phrases = [
-            "眼神冷", "眼神锐利", "眼神一冷", "眼神扫过", "眼神没离开",
-            "眼神坚定", "眼神警惕", "眼神变得专注", "眼神频繁瞟", "眼神怒", "眼神骤亮"
-        ]
-        
-        # 声音描写禁止词
-        self.sound_phrases = [
-            "声音冷", "声音狠", "声音发颤", "喉间压狠音", "声音沙哑", "声音低沉"
-        ]
-        
-        # 心理描写禁止词
-        self.mind_phrases = [
-            "心中暗爽", "很害怕", "心里想", "心中想", "心里觉得", "心中觉得"
-        ]
-        
-        # 情感描述禁止词
-        self.emotion_phrases = [
-            "气氛紧张", "很愤怒", "恐惧", "开心", "悲伤", "兴奋", "焦虑", "紧张"
-        ]
-        
-        # 抽象描述禁止词
-        self.abstract_phrases = [
-            "很安静", "气质清雅", "优雅", "美丽", "丑陋", "英俊", "高大", "矮小", "肥胖"
-        ]
-        
-        # 比喻禁止词
-        self.metaphor_phrases = [
-            "像什么", "如什么", "如诗如画", "如同", "宛如", "仿佛", "好似", "恰似", "犹如", "好像"
-        ]
-        
-        # 形容词和副词修饰禁止词
-        self.modifier_phrases = [
-            "冷冷地", "狠狠地", "轻轻", "快速", "慢慢地", "缓缓地", "重重地", "悄悄地", "偷偷地", "渐渐地"
-        ]
+        # 各类禁止词（与其他验证器共用同一个扫描器）
+        self.eye_phrases = GUIDE_FORBIDDEN_PHRASES["眼神描写"]
+        self.sound_phrases = GUIDE_FORBIDDEN_PHRASES["声音描写"]
+        self.mind_phrases = GUIDE_FORBIDDEN_PHRASES["心理描写"]
+        self.emotion_phrases = GUIDE_FORBIDDEN_PHRASES["情感描述"]
+        self.abstract_phrases = GUIDE_FORBIDDEN_PHRASES["抽象描述"]
+        self.metaphor_phrases = GUIDE_FORBIDDEN_PHRASES["比喻"]
+        self.modifier_phrases = GUIDE_FORBIDDEN_PHRASES["形容词/副词修饰"]
     
     def check(self, text):
         """
@@ -60,57 +35,48 @@ class ForbiddenChecker:
         """
         issues = []
         
-        # 检查眼神描写
-        for phrase in self.eye_phrases:
-            if phrase in text:
-                issues.append(f"[禁止事项] 发现眼神描写：'{phrase}'")
-        
-        # 检查声音描写
-        for phrase in self.sound_phrases:
-            if phrase in text:
-                issues.append(f"[禁止事项] 发现声音描写：'{phrase}'")
-        
-        # 检查心理描写
-        for phrase in self.mind_phrases:
-            if phrase in text:
-                issues.append(f"[禁止事项] 发现心理描写：'{phrase}'")
-        
-        # 检查情感描述
-        for phrase in self.emotion_phrases:
-            if phrase in text:
-                issues.append(f"[禁止事项] 发现情感描述：'{phrase}'")
-        
-        # 检查抽象描述
-        for phrase in self.abstract_phrases:
-            if phrase in text:
-                issues.append(f"[禁止事项] 发现抽象描述：'{phrase}'")
-        
-        # 检查比喻
-        for phrase in self.metaphor_phrases:
-            if phrase in text:
-                issues.append(f"[禁止事项] 发现比喻：'{phrase}'")
-        
-        # 检查形容词和副词修饰
-        for phrase in self.modifier_phrases:
-            if phrase in text:
-                issues.append(f"[禁止事项] 发现形容词/副词修饰：'{phrase}'")
-        
-        # 检查台词括号中的眼神和声音描写
-        lines = text.split('\n')
-        for i, line in enumerate(lines, 1):
+        # 一次扫描得到所有禁止词的命中
+        hits = FORBIDDEN_SCANNER.scan(text)
+        found = {(hit.category, hit.phrase) for hit in hits}
+        
+        # 按类别检查禁止词
+        checks = [
+            ("眼神描写", self.eye_phrases),
+            ("声音描写", self.sound_phrases),
+            ("心理描写", self.mind_phrases),
+            ("情感描述", self.emotion_phrases),
+            ("抽象描述", self.abstract_phrases),
+            ("比喻", self.metaphor_phrases),
+            ("形容词/副词修饰", self.modifier_phrases)
+        ]
+        for category, phrases in checks:
+            for phrase in phrases:
+                if (category, phrase) in found:
+                    issues.append(f"[禁止事项] 发现{category}：'{phrase}'")
+        
+        # 检查台词括号中的眼神和声音描写（只看有眼神、声音命中的行）
+        bracket_hits = {}
+        for hit in hits:
+            if hit.category in ("眼神描写", "声音描写"):
+                bracket_hits.setdefault(hit.line, []).append(hit)
+        
+        lines = text.split('\n') if bracket_hits else []
+        for i in sorted(bracket_hits):
+            line = lines[i - 1]
             if '（' in line and '）' in line:
-                # 提取括号内容
-                start = line.find('（')
-                end = line.find('）')
-                if start != -1 and end != -1:
-                    content = line[start+1:end]
-                    # 检查括号内容是否包含眼神或声音描写
-                    for phrase in self.eye_phrases:
-                        if phrase in content:
-                            issues.append(f"[禁止事项] 第{i}行台词括号中发现眼神描写：'{phrase}'")
-                    for phrase in self.sound_phrases:
-                        if phrase in content:
-                            issues.append(f"[禁止事项] 第{i}行台词括号中发现声音描写：'{phrase}'")
+                # 括号内容的范围（列号从1开始）
+                start = line.find('（') + 2
+                end = line.find('）') + 1
+                inside = {
+                    (hit.category, hit.phrase) for hit in bracket_hits[i]
+                    if hit.column >= start and hit.column + len(hit.phrase) <= end
+                }
+                for phrase in self.eye_phrases:
+                    if ("眼神描写", phrase) in inside:
+                        issues.append(f"[禁止事项] 第{i}行台词括号中发现眼神描写：'{phrase}'")
+                for phrase in self.sound_phrases:
+                    if ("声音描写", phrase) in inside:
+                        issues.append(f"[禁止事项] 第{i}行台词括号中发现声音描写：'{phrase}'")
         
         return issues
 
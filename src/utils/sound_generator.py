@@ -1,6 +1,36 @@
 # 音效生成工具
 # 负责为剧本添加音效标注
 
+from .keyword_matcher import KeywordMatcher
+
+# 战斗动作对应的音效
+COMBAT_SOUNDS = {
+    "挥刀": "唰",
+    "拔剑": "锵",
+    "砍中": "当",
+    "踢中": "砰",
+    "骨折": "咔嚓",
+    "吐血": "噗",
+    "爆炸": "BOOM"
+}
+
+# 环境描述对应的音效
+ENVIRONMENT_SOUNDS = {
+    "开门": "吱呀",
+    "关门": "砰",
+    "脚步声": "踏踏",
+    "风声": "呼呼",
+    "雨声": "滴答",
+    "雷声": "轰隆",
+    "鸟鸣": "啾啾"
+}
+
+# 动作/环境关键词匹配器
+SOUND_MATCHER = KeywordMatcher({
+    keyword: [keyword] for keyword in list(COMBAT_SOUNDS) + list(ENVIRONMENT_SOUNDS)
+})
+
+
 class SoundGenerator:
     """
     音效生成类
@@ -40,17 +70,7 @@ class SoundGenerator:
         Returns:
             str: 战斗音效标注
         """
-        sound_map = {
-            "挥刀": "唰",
-            "拔剑": "锵",
-            "砍中": "当",
-            "踢中": "砰",
-            "骨折": "咔嚓",
-            "吐血": "噗",
-            "爆炸": "BOOM"
-        }
-        
-        sound = sound_map.get(action, "啪")
+        sound = COMBAT_SOUNDS.get(action, "啪")
         return self.generate_sound(sound, f"{action}声")
     
     def generate_environment_sound(self, environment):
@@ -63,18 +83,26 @@ class SoundGenerator:
         Returns:
             str: 环境音效标注
         """
-        sound_map = {
-            "开门": "吱呀",
-            "关门": "砰",
-            "脚步声": "踏踏",
-            "风声": "呼呼",
-            "雨声": "滴答",
-            "雷声": "轰隆",
-            "鸟鸣": "啾啾"
-        }
-        
-        sound = sound_map.get(environment, "")
+        sound = ENVIRONMENT_SOUNDS.get(environment, "")
         if sound:
             return self.generate_sound(sound, f"{environment}声")
         else:
             return ""
+    
+    def generate_sounds_for_text(self, text):
+        """
+        为一段文本中出现的战斗动作和环境描述生成音效标注
+        
+        Args:
+            text (str): 动作或场景文本
+            
+        Returns:
+            str: 音效标注文本（按动作在文本中首次出现的顺序）
+        """
+        sounds = ""
+        for keyword in SOUND_MATCHER.find_values(text):
+            if keyword in COMBAT_SOUNDS:
+                sounds += self.generate_combat_sound(keyword)
+            else:
+                sounds += self.generate_environment_sound(keyword)
+        return sounds
@@ -1,6 +1,8 @@
 # 规则验证器
 # 负责验证剧本是否符合写作指南中的规则
 
+from utils.phrase_scanner import FORBIDDEN_SCANNER, RULE_FORBIDDEN_PHRASES, DIALOGUE_EYE_CATEGORY
+
 class RuleValidator:
     """
     规则验证器
@@ -12,38 +14,8 @@ class RuleValidator:
         """
         初始化规则验证器
         """
-        # 禁止的表达式列表
-        self.forbidden_patterns = {
-            "眼神描写": [
-                "眼神冷", "眼神锐利", "眼神一冷", "眼神扫过", "眼神没离开", 
-                "眼神坚定", "眼神警惕", "眼神如刀", "眼神如炬", "眼神如", 
-                "眼神扫", "眼神看", "眼神盯", "眼神注视", "眼神凝视"
-            ],
-            "声音描写": [
-                "声音冷", "声音狠", "声音发颤", "喉间压狠音", "声音沙哑", 
-                "声音低沉", "声音高亢", "声音温柔", "声音严厉", "声音颤抖"
-            ],
-            "心理描写": [
-                "心中暗爽", "很害怕", "心里想", "心想", "心中想", 
-                "心里觉得", "心中觉得", "内心", "心里", "心中"
-            ],
-            "情感描述": [
-                "气氛紧张", "很愤怒", "恐惧", "开心", "悲伤", 
-                "兴奋", "焦虑", "紧张", "愤怒", "害怕"
-            ],
-            "抽象描述": [
-                "很安静", "气质清雅", "优雅", "美丽", "丑陋", 
-                "英俊", "丑陋", "高大", "矮小", "肥胖"
-            ],
-            "比喻": [
-                "像什么", "如什么", "如诗如画", "如同", "宛如", 
-                "仿佛", "好似", "恰似", "犹如", "好像"
-            ],
-            "形容词修饰": [
-                "冷冷地", "狠狠地", "轻轻", "快速", "慢慢地", 
-                "缓缓地", "重重地", "悄悄地", "偷偷地", "渐渐地"
-            ]
-        }
+        # 禁止的表达式列表（与其他验证器共用同一个扫描器）
+        self.forbidden_patterns = RULE_FORBIDDEN_PHRASES
     
     def validate(self, script_content):
         """
@@ -57,17 +29,20 @@ class RuleValidator:
         """
         issues = []
         
+        # 一次扫描得到所有禁止用语的命中
+        hits = FORBIDDEN_SCANNER.scan(script_content)
+        found = {(hit.category, hit.phrase) for hit in hits}
+        
         # 检查禁止的表达式
         for category, patterns in self.forbidden_patterns.items():
             for pattern in patterns:
-                if pattern in script_content:
+                if (category, pattern) in found:
                     issues.append(f"[{category}] 禁止使用 '{pattern}'")
         
         # 检查台词括号中的眼神描写
-        lines = script_content.split('\n')
-        for i, line in enumerate(lines, 1):
-            if '（眼神' in line or '(眼神' in line:
-                issues.append(f"[台词括号] 第{i}行：禁止在台词括号中描写眼神")
+        dialogue_lines = sorted({hit.line for hit in hits if hit.category == DIALOGUE_EYE_CATEGORY})
+        for i in dialogue_lines:
+            issues.append(f"[台词括号] 第{i}行：禁止在台词括号中描写眼神")
         
         return issues
     
@@ -0,0 +1,7 @@
+# 测试配置
+# 将 src 加入模块搜索路径，与 python src/main.py 的运行方式一致
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,46 @@
+# 数据管理器测试
+
+import pickle
+import threading
+
+from data.build_manifest import DependencyRecorder, dependency_key, DEP_CHARACTER
+from data.data_manager import DataManager
+
+
+def test_recorder_is_per_thread():
+    data_manager = DataManager()
+    data_manager.set_characters({"林风": {"name": "林风"}, "苏晴": {"name": "苏晴"}})
+    recorders = {}
+    barrier = threading.Barrier(2)
+    
+    def build(name):
+        recorder = DependencyRecorder()
+        data_manager.set_recorder(recorder)
+        # 两个线程都设置好记录器后再读取，共用一个记录器时会互相记录
+        barrier.wait()
+        for _ in range(50):
+            data_manager.get_character(name)
+        barrier.wait()
+        data_manager.set_recorder(None)
+        recorders[name] = recorder
+    
+    threads = [threading.Thread(target=build, args=(name,)) for name in ("林风", "苏晴")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert set(recorders["林风"].hashes()) == {dependency_key(DEP_CHARACTER, "林风")}
+    assert set(recorders["苏晴"].hashes()) == {dependency_key(DEP_CHARACTER, "苏晴")}
+    assert data_manager.recorder is None
+
+
+def test_pickled_data_manager_keeps_data_but_not_recorder():
+    data_manager = DataManager()
+    data_manager.set_characters({"林风": {"name": "林风"}})
+    data_manager.set_recorder(DependencyRecorder())
+    
+    copy = pickle.loads(pickle.dumps(data_manager))
+    
+    assert copy.recorder is None
+    assert copy.get_character("林风")["name"] == "林风"
@@ -0,0 +1,41 @@
+# 多关键词匹配器测试
+
+import threading
+
+from utils.keyword_matcher import KeywordMatcher
+
+
+def test_find_values_prefers_longest_alias():
+    matcher = KeywordMatcher({"镇北王": ["镇北王"], "世子": ["镇北王世子", "世子"]})
+    
+    assert matcher.find_values("镇北王世子到了", longest=True) == ["世子"]
+    assert matcher.find_values("镇北王世子到了") == ["镇北王", "世子"]
+
+
+def test_add_while_matching_from_other_threads():
+    matcher = KeywordMatcher({"林风": ["林风"]})
+    text = "林风看向苏晴。" * 200
+    errors = []
+    stop = threading.Event()
+    
+    def scan():
+        while not stop.is_set():
+            try:
+                values = matcher.find_values(text)
+                assert values[0] == "林风"
+            except Exception as e:
+                errors.append(e)
+                return
+    
+    threads = [threading.Thread(target=scan) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for index in range(200):
+        matcher.add(f"角色{index}", f"角色{index}")
+    matcher.add("苏晴")
+    stop.set()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    assert matcher.find_values(text) == ["林风", "苏晴"]
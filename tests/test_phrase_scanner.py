@@ -0,0 +1,33 @@
+# 禁止用语扫描器测试
+
+import threading
+
+from utils.phrase_scanner import FORBIDDEN_SCANNER, PhraseHit
+
+
+def test_shared_scanner_is_built_at_import():
+    assert FORBIDDEN_SCANNER.matcher._automaton is not None
+
+
+def test_shared_scanner_from_many_threads():
+    texts = [f"第{index}场\n林风心里想着，眼神冷了下来。\n" * 20 for index in range(8)]
+    expected = [FORBIDDEN_SCANNER.scan(text) for text in texts]
+    errors = []
+    
+    def scan(offset):
+        for round_index in range(200):
+            index = (offset + round_index) % len(texts)
+            try:
+                assert FORBIDDEN_SCANNER.scan(texts[index]) == expected[index]
+            except Exception as e:
+                errors.append(e)
+                return
+    
+    threads = [threading.Thread(target=scan, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    assert PhraseHit("眼神描写", "眼神冷", 2, 8) in expected[0]
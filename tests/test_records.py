@@ -0,0 +1,47 @@
+# 数据记录类型测试
+
+from data.records import Character, EpisodeOutline, Scene
+
+
+def test_scene_round_trip_keeps_unknown_fields():
+    data = {
+        "name": "青云宗·外门",
+        "category": "宗门",
+        "time": "白天",
+        "description": "山门前的广场",
+        "weather": "小雨"
+    }
+    
+    scene = Scene.from_dict(data)
+    
+    assert scene["weather"] == "小雨"
+    assert "weather" in scene
+    assert scene.extra == {"weather": "小雨"}
+    assert scene.to_dict() == data
+    assert Scene.from_dict(scene.to_dict()).to_dict() == data
+
+
+def test_nested_records_keep_unknown_fields():
+    data = {
+        "name": "林风",
+        "category": "主角",
+        "stages": {
+            "初期": {"identity": "外门弟子", "age": "16", "nickname": "小林"}
+        },
+        "faction": "青云宗"
+    }
+    
+    character = Character.from_dict(data)
+    plain = character.to_dict()
+    
+    assert plain["faction"] == "青云宗"
+    assert plain["stages"]["初期"]["nickname"] == "小林"
+    assert Character.from_dict(plain).to_dict() == plain
+
+
+def test_known_fields_only_has_no_extra():
+    outline = EpisodeOutline.from_dict({"episode": 3, "title": "初入宗门", "goals": ["拜师"]})
+    
+    assert getattr(outline, "extra", None) is None
+    assert set(outline) == set(EpisodeOutline.__slots__)
+    assert outline.to_dict()["goals"] == ["拜师"]
@@ -0,0 +1,50 @@
+# 剧本生成器测试
+
+import pytest
+
+from data.data_manager import DataManager
+from generator.script_generator import ScriptGenerator
+from utils.config_manager import ConfigManager
+
+
+def _generator(tmp_path):
+    config_manager = ConfigManager(str(tmp_path / "missing.yaml"))
+    config_manager.config = {
+        "paths": {"output_dir": str(tmp_path / "scripts")},
+        "state": {"state_file": str(tmp_path / "state.json"), "checkpoint_dir": str(tmp_path / "checkpoints")},
+        "cache": {
+            "build_manifest_file": str(tmp_path / "build_manifest.json"),
+            "script_hash_file": str(tmp_path / "script_hashes.json")
+        }
+    }
+    return ScriptGenerator(config_manager, DataManager())
+
+
+def test_failed_batch_sync_does_not_mask_pipeline_error(tmp_path, monkeypatch):
+    generator = _generator(tmp_path)
+    
+    def failing_build(episodes, jobs):
+        raise RuntimeError("生成失败")
+        yield
+    
+    def failing_sync():
+        raise OSError("同步失败")
+    
+    monkeypatch.setattr(generator, "_iter_built_scripts", failing_build)
+    monkeypatch.setattr(generator.script_writer, "end_batch", failing_sync)
+    
+    with pytest.raises(RuntimeError, match="生成失败"):
+        generator.generate_all_scripts(1, 2, jobs=1)
+
+
+def test_failed_batch_sync_raises_when_pipeline_succeeds(tmp_path, monkeypatch):
+    generator = _generator(tmp_path)
+    
+    def failing_sync():
+        raise OSError("同步失败")
+    
+    monkeypatch.setattr(generator, "_iter_built_scripts", lambda episodes, jobs: iter(()))
+    monkeypatch.setattr(generator.script_writer, "end_batch", failing_sync)
+    
+    with pytest.raises(OSError, match="同步失败"):
+        generator.generate_all_scripts(1, 2, jobs=1)
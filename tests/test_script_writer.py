@@ -0,0 +1,47 @@
+# 剧本文件写入器测试
+
+import os
+
+import pytest
+
+from data.script_writer import ScriptWriter
+
+
+def _writer(tmp_path):
+    return ScriptWriter(str(tmp_path / "out"), str(tmp_path / "hashes.json"), batch_size=16)
+
+
+def test_same_file_twice_in_batch_keeps_last_write(tmp_path):
+    writer = _writer(tmp_path)
+    writer.begin_batch()
+    assert writer.write("第1集.md", "初稿")
+    assert writer.write("第1集.md", "定稿")
+    writer.end_batch()
+    
+    out_dir = tmp_path / "out"
+    assert (out_dir / "第1集.md").read_text(encoding='utf-8') == "定稿"
+    assert sorted(os.listdir(out_dir)) == ["第1集.md"]
+    assert not writer.write("第1集.md", "定稿")
+
+
+def test_failed_replace_keeps_written_files_and_removes_temps(tmp_path, monkeypatch):
+    writer = _writer(tmp_path)
+    writer.begin_batch()
+    for episode in (1, 2, 3):
+        writer.write(f"第{episode}集.md", f"第{episode}集内容")
+    
+    real_replace = os.replace
+    
+    def replace(src, dst):
+        if dst.endswith("第2集.md"):
+            raise PermissionError("只读文件")
+        real_replace(src, dst)
+    
+    monkeypatch.setattr(os, "replace", replace)
+    with pytest.raises(OSError, match="第2集.md"):
+        writer.end_batch()
+    
+    out_dir = tmp_path / "out"
+    assert sorted(os.listdir(out_dir)) == ["第1集.md"]
+    assert not writer.pending
+    assert set(writer.hashes) == {"第1集.md"}
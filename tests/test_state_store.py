@@ -0,0 +1,53 @@
+# 状态存储测试
+
+import pytest
+
+from data.state_store import JsonStateStore
+
+
+def test_json_store_episode_index_survives_reload_and_compact(tmp_path):
+    state_file = str(tmp_path / "state.json")
+    store = JsonStateStore(state_file, compact_threshold=5)
+    store.load()
+    for episode in range(1, 9):
+        store.record_episode(episode, [f"事件{episode}-a", f"事件{episode}-b"])
+        store.record_entity("characters", "林风", episode, {"level": episode})
+        if episode % 2 == 0:
+            store.record_entity("items", "苍生笔", episode, {"owner": "林风"})
+    
+    reloaded = JsonStateStore(state_file, compact_threshold=5)
+    reloaded.load()
+    
+    for current in (store, reloaded):
+        assert current.get_events(4, 4) == [
+            {"episode": 4, "event": "事件4-a"},
+            {"episode": 4, "event": "事件4-b"}
+        ]
+        assert current.get_events(9, 9) == []
+        assert current.get_entities_at("characters", 6) == {"林风": {"level": 6}}
+        assert current.get_entities_at("items", 6) == {"苍生笔": {"owner": "林风"}}
+        assert current.get_entities_at("items", 5) == {}
+        assert len(current.get_events(3, 5)) == 6
+
+
+def test_json_store_failed_log_write_leaves_state_unchanged(tmp_path):
+    state_file = str(tmp_path / "state.json")
+    store = JsonStateStore(state_file, log_file=str(tmp_path / "missing" / "log.jsonl"))
+    store.load()
+    store.record_episode(1, ["事件1"])
+    # 日志路径被同名文件占用，目录无法创建
+    (tmp_path / "missing" / "log.jsonl").unlink()
+    (tmp_path / "missing").rmdir()
+    (tmp_path / "missing").write_text("")
+    
+    with pytest.raises(OSError):
+        store.record_episode(2, ["事件2"])
+    with pytest.raises(OSError):
+        store.record_entity("characters", "林风", 2, {"level": 2})
+    
+    assert store.get_current_episode() == 1
+    assert store.get_events() == [{"episode": 1, "event": "事件1"}]
+    assert store.get_entities_at("characters", 2) == {}
+    # 失败的事件没有记入去重索引，重试时仍会写入
+    store.log_file = str(tmp_path / "log.jsonl")
+    assert store.record_episode(2, ["事件2"]) == ["事件2"]
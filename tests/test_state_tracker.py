@@ -0,0 +1,51 @@
+# 状态跟踪器测试
+
+import os
+
+from data.data_manager import DataManager
+from generator.script_generator import ScriptGenerator
+from generator.state_tracker import StateTracker
+from parser import CharacterParser, OutlineParser, SceneParser, SettingParser
+from utils.config_manager import ConfigManager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_generation_writes_checkpoints_that_open_at_reads(tmp_path, monkeypatch):
+    # 文档路径相对于项目根目录，输出和状态文件写入临时目录
+    monkeypatch.chdir(ROOT)
+    config_manager = ConfigManager()
+    config = config_manager.config
+    config["paths"]["output_dir"] = str(tmp_path / "scripts")
+    config["state"] = {
+        "backend": "json",
+        "state_file": str(tmp_path / "state.json"),
+        "checkpoint_dir": str(tmp_path / "checkpoints")
+    }
+    config["cache"] = {
+        "build_manifest_file": str(tmp_path / "build_manifest.json"),
+        "script_hash_file": str(tmp_path / "script_hashes.json")
+    }
+    data_manager = DataManager()
+    data_manager.set_characters(CharacterParser().parse_file("doc/人物.md"))
+    data_manager.set_scenes(SceneParser().parse_file("doc/场景列表.md"))
+    data_manager.set_outlines(OutlineParser().parse_directory("doc/剧情大纲"))
+    data_manager.set_settings(SettingParser().parse_file("doc/设定.md"))
+    
+    generator = ScriptGenerator(config_manager, data_manager)
+    generator.generate_all_scripts(1, 3, jobs=1)
+    
+    # 重新打开时只读检查点，不加载完整状态历史
+    tracker = StateTracker(DataManager(), config_manager, episode=2)
+    assert tracker.checkpoint.episode == 2
+    assert not tracker.store_loaded
+    
+    outline = data_manager.get_outline(2)
+    assert tracker.get_events(2, 2) == [{"episode": 2, "event": outline["event_logic"]["result"]}]
+    assert [entry["episode"] for entry in tracker.get_events()] == [1, 2]
+    assert tracker.get_entity_state("characters", "陆念离", 2)["stage"] == "前期"
+    assert not tracker.store_loaded
+    
+    assert tracker.open_at(3)
+    assert [entry["episode"] for entry in tracker.get_events()] == [1, 2, 3]
+    assert not tracker.store_loaded